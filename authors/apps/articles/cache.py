@@ -0,0 +1,41 @@
+from authors.apps.core.cache import namespace
+
+from .models import Article, ArticleSlug
+from .serializers import CreateArticleAPIViewSerializer
+
+# the payloads of published articles, by article id
+published_articles = namespace('articles', 600, 'ARTICLES_CACHE_TIMEOUT')
+
+# the id of the article each slug, current or previous, leads to
+article_slugs = namespace('article_slugs', 3600, 'ARTICLES_SLUG_CACHE_TIMEOUT')
+
+# cached for slugs leading nowhere, as caches drop None values on reading
+# them back, and no article has it for an id
+NOWHERE = 0
+
+
+def get_published_article(article_id):
+    """ the payload of a published article, raises `Article.DoesNotExist` """
+    def load():
+        article = Article.objects.select_related('author__profile').get(
+            pk=article_id, published=True)
+        return dict(CreateArticleAPIViewSerializer(article).data)
+
+    return published_articles.get_or_set(article_id, load)
+
+
+def resolve_slug(slug):
+    """ the id of the article `slug` leads to, or None
+
+    Current slugs are looked up first, then the slugs articles had before
+    their titles changed. Slugs leading nowhere are cached too, as `NOWHERE`.
+    """
+    def load():
+        article_id = Article.objects.filter(slug=slug).values_list('pk', flat=True).first()
+        if article_id is None:
+            article_id = ArticleSlug.objects.filter(
+                slug=slug).values_list('article_id', flat=True).first()
+        return NOWHERE if article_id is None else article_id
+
+    article_id = article_slugs.get_or_set(slug, load)
+    return None if article_id == NOWHERE else article_id
@@ -0,0 +1,21 @@
+import re
+
+# the words of the routes next to `articles/<slug>`, which are never slugs
+RESERVED_SLUGS = ('all', 'import', 'me', 'search', 'single', 'trending')
+
+
+class ArticleSlugConverter:
+    """ a slug that is not one of `RESERVED_SLUGS`
+
+    Paths such as `articles/all` are left to reach the routes for them,
+    `articles/all/` by APPEND_SLASH, instead of being looked up as slugs.
+    """
+
+    regex = r'(?!(?:{})(?![-a-zA-Z0-9_]))[-a-zA-Z0-9_]+'.format(
+        '|'.join(map(re.escape, RESERVED_SLUGS)))
+
+    def to_python(self, value):
+        return value
+
+    def to_url(self, value):
+        return value
@@ -0,0 +1,155 @@
+"""
+Read counts of articles, written behind.
+
+Each process adds up the reads of articles in memory and writes them to
+`Article.view_count`, with one UPDATE per distinct number of reads, and to
+the day's `ArticleDailyStats`, every `ARTICLES_VIEW_FLUSH_INTERVAL` seconds
+or as soon as `ARTICLES_VIEW_FLUSH_EVENTS` reads are waiting. The writes are
+made by a thread of their own, never by the request that counted a read.
+A worker that crashes loses at most the reads it had not written yet, one
+that exits normally writes them first. Reads that cannot be written are
+kept for the next flush, up to `ARTICLES_VIEW_MAX_PENDING` articles.
+
+With `ARTICLES_VIEW_FLUSH_INTERVAL` set to None, as in tests, reads are only
+written by calling `flush()`.
+"""
+import atexit
+import os
+import threading
+import time
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from authors.apps.core import metrics
+from .models import Article
+from .rollups import add_stats
+
+# articles updated by each UPDATE, under SQLite's limit on parameters
+BATCH_SIZE = 500
+
+
+class ViewCounter:
+    """ the reads of articles this process has not written yet """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.flushes_at_exit = False
+        self._reset()
+
+    def _reset(self):
+        self.pid = os.getpid()
+        self.pending = Counter()
+        self.events = 0
+        self.flushed_at = time.monotonic()
+        self.flusher = None
+        self.wake = threading.Event()
+
+    def _check_fork(self):
+        # a worker forked from a process that already counted reads must
+        # not write the parent's reads again
+        if os.getpid() != self.pid:
+            self._reset()
+
+    def _interval(self):
+        return getattr(settings, 'ARTICLES_VIEW_FLUSH_INTERVAL', 5)
+
+    def _start_flusher(self):
+        if not self._interval() or (self.flusher and self.flusher.is_alive()):
+            return
+        if not self.flushes_at_exit:
+            # forked workers inherit the registration
+            atexit.register(self.flush)
+            self.flushes_at_exit = True
+        self.flusher = threading.Thread(
+            target=self._flush_every, name='article-view-flusher', daemon=True)
+        self.flusher.start()
+
+    def _flush_every(self):
+        # woken early once enough reads are waiting, and stopped when
+        # flushing in the background is turned off, which only tests do
+        while True:
+            self.wake.wait(self._interval())
+            self.wake.clear()
+            if not self._interval():
+                return
+            try:
+                self.flush()
+            finally:
+                # a connection kept for CONN_MAX_AGE would hold one of the
+                # worker's connections, which its request threads need
+                connection.close()
+
+    def add(self, article_id, views=1):
+        """ count `views` reads of an article """
+        with self.lock:
+            self._check_fork()
+            self.pending[article_id] += views
+            self.events += views
+            interval = self._interval()
+            due = self.events >= getattr(settings, 'ARTICLES_VIEW_FLUSH_EVENTS', 100) or \
+                bool(interval and time.monotonic() - self.flushed_at >= interval)
+            self._start_flusher()
+            if due and self.flusher is not None:
+                self.wake.set()
+        metrics.inc('article_views_total', views)
+
+    def flush(self):
+        """ write the reads waiting in this process, returning how many were written """
+        with self.lock:
+            self._check_fork()
+            pending, self.pending = self.pending, Counter()
+            self.events = 0
+            self.flushed_at = time.monotonic()
+        if not pending:
+            return 0
+
+        # articles read as many times share an UPDATE
+        by_views = defaultdict(list)
+        for article_id, views in pending.items():
+            by_views[views].append(article_id)
+
+        started = time.perf_counter()
+        try:
+            with transaction.atomic():
+                for views, article_ids in by_views.items():
+                    for start in range(0, len(article_ids), BATCH_SIZE):
+                        Article.objects.filter(pk__in=article_ids[start:start + BATCH_SIZE]).update(
+                            view_count=F('view_count') + views)
+                today = timezone.localdate()
+                add_stats({(article_id, today): {'views': views} for article_id, views in pending.items()})
+        except DatabaseError:
+            metrics.inc('article_view_flushes_total', result='failed')
+            self._keep(pending)
+            return 0
+
+        written = sum(pending.values())
+        metrics.observe('article_view_flush_duration_seconds', time.perf_counter() - started)
+        metrics.inc('article_view_flushes_total', result='ok')
+        metrics.inc('article_views_flushed_total', written)
+        return written
+
+    def _keep(self, pending):
+        limit = getattr(settings, 'ARTICLES_VIEW_MAX_PENDING', 10000)
+        dropped = 0
+        with self.lock:
+            for article_id, views in pending.items():
+                if article_id in self.pending or len(self.pending) < limit:
+                    self.pending[article_id] += views
+                    self.events += views
+                else:
+                    dropped += views
+        if dropped:
+            metrics.inc('article_views_dropped_total', dropped)
+
+    def clear(self):
+        with self.lock:
+            self.pending = Counter()
+            self.events = 0
+
+
+view_counter = ViewCounter()
+count_view = view_counter.add
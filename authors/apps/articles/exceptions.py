@@ -9,3 +9,8 @@ class ArticlesNotExist(APIException):
 class NoResultsMatch(APIException):
     status_code = 400
     default_detail = 'results matching search not found'
+
+
+class ArticleVersionConflict(APIException):
+    status_code = 409
+    default_detail = 'the article was changed since this version, fetch it again'
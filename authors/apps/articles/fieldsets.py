@@ -0,0 +1,64 @@
+from rest_framework import serializers
+
+# the columns each article field is read from, `tags` being prefetched
+COLUMNS = {
+    'id': ('id',),
+    'title': ('title',),
+    'body': ('body',),
+    'description': ('description',),
+    'author': ('author__username', 'author__profile__bio', 'author__profile__image'),
+    'slug': ('slug',),
+    'published': ('published',),
+    'created_at': ('created_at',),
+    'tags': (),
+    'version': ('version',),
+    'excerpt': ('excerpt',),
+    'word_count': ('word_count',),
+    'reading_time': ('reading_time',),
+    'view_count': ('view_count',),
+}
+
+# lists show the excerpt rather than the body, unless asked for it
+LIST_FIELDS = tuple(field for field in COLUMNS if field != 'body')
+
+
+def parse_fields(value, default):
+    """ the fields named by a `?fields=title,excerpt` parameter, in order """
+    if not value:
+        return default
+    fields = [field.strip() for field in value.split(',') if field.strip()]
+    unknown = [field for field in fields if field not in COLUMNS]
+    if unknown or not fields:
+        raise serializers.ValidationError({"fields": [
+            "Unknown fields: {}. Choose from {}.".format(
+                ', '.join(unknown) or 'none given', ', '.join(COLUMNS))]})
+    return tuple(dict.fromkeys(fields))
+
+
+def apply_fieldset(queryset, fields):
+    """ load only the columns and relations that `fields` are read from """
+    columns = {column for field in fields for column in COLUMNS[field]}
+    if 'author' in fields:
+        queryset = queryset.select_related('author__profile')
+    if 'tags' in fields:
+        queryset = queryset.prefetch_related('tags')
+    return queryset.only(*columns or ('id',))
+
+
+class SparseFieldsetMixin:
+    """
+    Lets a list view of articles return only the fields a client asks for
+    with `?fields=`, reading only the columns those fields need.
+    """
+
+    default_fields = LIST_FIELDS
+
+    def get_fieldset(self):
+        if not hasattr(self, '_fieldset'):
+            self._fieldset = parse_fields(
+                self.request.query_params.get('fields'), self.default_fields)
+        return self._fieldset
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs['fields'] = self.get_fieldset()
+        return super().get_serializer(*args, **kwargs)
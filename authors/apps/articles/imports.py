@@ -0,0 +1,255 @@
+"""
+Bulk imports of articles from NDJSON, one JSON object per line:
+
+    {"title": "...", "description": "...", "body": "...", "tags": ["..."],
+     "published": true, "slug": "kept-from-the-old-site", "author": "username"}
+
+`tags`, `published`, `slug` and `author` may be left out. Rows are
+validated and written a chunk at a time, each chunk with a handful of
+queries whatever its size. A row that fails is reported with its line
+number and the rest of the import goes on.
+
+Imported articles do not notify followers, and their signals are not
+sent, so their first revision and tags are written here.
+"""
+import json
+from itertools import islice
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import IntegrityError, transaction
+from rest_framework import serializers
+from taggit.models import Tag, TaggedItem
+
+from authors.apps.authentication.models import User
+from .cache import article_slugs
+from .converters import RESERVED_SLUGS
+from .models import Article, ArticleRevision, ArticleSlug
+from .revisions import encode, text_of
+from .serializers import new_slug
+
+# values looked up by each query, under SQLite's limit on parameters
+BATCH_SIZE = 500
+
+
+class ArticleImportSerializer(serializers.Serializer):
+    """ one row of an import, checked without touching the database """
+
+    title = serializers.CharField(max_length=150)
+    description = serializers.CharField(max_length=255)
+    body = serializers.CharField()
+    tags = serializers.ListField(
+        child=serializers.CharField(max_length=100), required=False, default=list)
+    published = serializers.BooleanField(default=False)
+    slug = serializers.SlugField(max_length=255, required=False)
+    author = serializers.CharField(max_length=255, required=False)
+
+
+class ImportReport:
+    """ the number of articles created and the errors of each failed line """
+
+    def __init__(self):
+        self.created = 0
+        self.errors = []
+
+    def fail(self, line, errors):
+        self.errors.append({'line': line, 'errors': errors})
+
+    def as_dict(self):
+        return {'created': self.created, 'failed': len(self.errors), 'errors': self.errors}
+
+
+def parse(lines):
+    """ `(line number, validated row, errors)` for each line that is not blank """
+    # building a serializer copies all its fields, so one checks every row
+    serializer = ArticleImportSerializer()
+    for number, line in enumerate(lines, 1):
+        try:
+            if isinstance(line, bytes):
+                line = line.decode('utf-8')
+            if not line.strip():
+                continue
+            row = json.loads(line)
+        except ValueError as error:
+            yield number, None, {'error': ['Invalid JSON: {}'.format(error)]}
+            continue
+
+        if not isinstance(row, dict):
+            yield number, None, {'error': ['Each line must be a JSON object.']}
+            continue
+        try:
+            row = serializer.run_validation(row)
+        except serializers.ValidationError as error:
+            yield number, None, error.detail
+            continue
+        yield number, row, None
+
+
+def import_articles(lines, author, chunk_size=None, may_choose_author=False):
+    """ create the articles of NDJSON `lines`, returning an `ImportReport`
+
+    Rows without an `author` belong to `author`. Rows naming another
+    author are only accepted when `may_choose_author` is true.
+    """
+    chunk_size = chunk_size or getattr(settings, 'ARTICLES_IMPORT_CHUNK_SIZE', 1000)
+    report = ImportReport()
+    rows = parse(lines)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return report
+
+        valid = []
+        for number, row, errors in chunk:
+            if errors:
+                report.fail(number, errors)
+            else:
+                valid.append((number, row))
+        valid = _with_authors(valid, author, may_choose_author, report)
+        valid = _with_slugs(valid, report)
+        report.created += _create_or_report(valid, report)
+
+
+def _with_authors(rows, author, may_choose_author, report):
+    named = {row['author'] for number, row in rows if row.get('author', author.username) != author.username}
+    if named and may_choose_author:
+        authors = {user.username: user for user in _in_batches(User.objects.all(), 'username__in', named)}
+    else:
+        authors = {}
+    authors[author.username] = author
+
+    accepted = []
+    for number, row in rows:
+        username = row.get('author', author.username)
+        if username not in authors:
+            report.fail(number, {'author': [
+                "No user is called {}.".format(username) if may_choose_author
+                else "You can only import articles as yourself."]})
+            continue
+        row['author'] = authors[username]
+        accepted.append((number, row))
+    return accepted
+
+
+def _in_batches(rows, lookup, values):
+    """ the `rows` whose `lookup` is one of `values`, looked up a batch at a time """
+    values = list(values)
+    for start in range(0, len(values), BATCH_SIZE):
+        yield from rows.filter(**{lookup: values[start:start + BATCH_SIZE]})
+
+
+def _taken(slugs):
+    """ those of `slugs` that articles have, or had before a title change """
+    return set(_in_batches(Article.objects.values_list('slug', flat=True), 'slug__in', slugs)) | \
+        set(_in_batches(ArticleSlug.objects.values_list('slug', flat=True), 'slug__in', slugs))
+
+
+def _with_slugs(rows, report):
+    # slugs kept from the old site must be free, and not given twice
+    taken = _taken([row['slug'] for number, row in rows if row.get('slug')])
+    accepted = []
+    for number, row in rows:
+        if row.get('slug') in taken:
+            report.fail(number, {'slug': ["An article with this slug already exists."]})
+            continue
+        if row.get('slug') in RESERVED_SLUGS:
+            report.fail(number, {'slug': ["This slug is the name of a route."]})
+            continue
+        if row.get('slug'):
+            taken.add(row['slug'])
+        accepted.append((number, row))
+
+    # generated slugs have a random suffix, the rare clash gets another one
+    generated = [row for number, row in accepted if not row.get('slug')]
+    while generated:
+        for row in generated:
+            row['slug'] = new_slug(row['title'])
+        clashes = _taken([row['slug'] for row in generated]) | taken
+        seen = set()
+        retry = []
+        for row in generated:
+            if row['slug'] in clashes or row['slug'] in seen:
+                retry.append(row)
+            seen.add(row['slug'])
+        taken.update(seen)
+        generated = retry
+    return accepted
+
+
+def _create_or_report(rows, report):
+    """ create `rows`, returning how many were created
+
+    A slug given to another article after `_with_slugs` checked it fails
+    the whole chunk, whose rows are then checked again, those with a taken
+    slug reported and the others created.
+    """
+    while rows:
+        try:
+            _create(rows)
+            return len(rows)
+        except IntegrityError:
+            taken = _taken([row['slug'] for number, row in rows])
+            if not taken:
+                raise
+        for number, row in rows:
+            if row['slug'] in taken:
+                report.fail(number, {'slug': ["An article with this slug already exists."]})
+        rows = [(number, row) for number, row in rows if row['slug'] not in taken]
+    return 0
+
+
+def _create(rows):
+    articles = []
+    for number, row in rows:
+        article = Article(
+            title=row['title'], description=row['description'], body=row['body'],
+            slug=row['slug'], published=row['published'], author=row['author'])
+        article.update_text_fields()
+        articles.append(article)
+    slugs = [article.slug for article in articles]
+
+    with transaction.atomic():
+        Article.objects.bulk_create(articles)
+        # only some databases set the primary keys of bulk created rows
+        ids = dict(_in_batches(Article.objects.values_list('slug', 'pk'), 'slug__in', slugs))
+        for article in articles:
+            article.pk = ids[article.slug]
+
+        ArticleRevision.objects.bulk_create(
+            ArticleRevision(
+                article_id=article.pk, version=article.version, snapshot=True,
+                data=encode(text_of(article)))
+            for article in articles)
+        _tag(zip(articles, (row['tags'] for number, row in rows)))
+
+    # slugs looked up before they existed are cached as leading nowhere
+    article_slugs.delete_many(slugs)
+
+
+def _tag(tagged):
+    tagged = [(article, set(names)) for article, names in tagged if names]
+    names = set().union(*(names for article, names in tagged))
+    if not names:
+        return
+
+    tags = dict(_in_batches(Tag.objects.values_list('name', 'pk'), 'name__in', names))
+    missing = names - set(tags)
+    if missing:
+        slugs = {name: Tag().slugify(name) for name in missing}
+        taken = set(_in_batches(Tag.objects.values_list('slug', flat=True), 'slug__in', slugs.values()))
+        fresh, clashing = {}, []
+        for name, slug in slugs.items():
+            if slug in taken or slug in fresh:
+                clashing.append(name)
+            else:
+                fresh[slug] = Tag(name=name, slug=slug)
+        Tag.objects.bulk_create(fresh.values())
+        for name in clashing:
+            # taggit finds a free slug for these
+            Tag.objects.create(name=name)
+        tags.update(_in_batches(Tag.objects.values_list('name', 'pk'), 'name__in', missing))
+
+    content_type = ContentType.objects.get_for_model(Article)
+    TaggedItem.objects.bulk_create(
+        TaggedItem(content_type=content_type, object_id=article.pk, tag_id=tags[name])
+        for article, names in tagged for name in names)
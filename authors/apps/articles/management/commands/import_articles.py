@@ -0,0 +1,54 @@
+import json
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from authors.apps.authentication.models import User
+from ...imports import import_articles
+
+
+class Command(BaseCommand):
+    help = (
+        "Import articles from an NDJSON file, one article per line, as "
+        "accepted by POST /api/articles/import. Lines that fail are reported "
+        "and the rest are imported."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="the NDJSON file, or - for standard input")
+        parser.add_argument(
+            '--author', required=True,
+            help='the username of the author of rows that do not name one')
+        parser.add_argument(
+            '--chunk-size', type=int, help='rows validated and written together')
+        parser.add_argument(
+            '--errors', help='write the errors of failed lines to this JSON file')
+
+    def handle(self, *args, **options):
+        try:
+            author = User.objects.get(username=options['author'])
+        except User.DoesNotExist:
+            raise CommandError("No user is called {}.".format(options['author']))
+        if options['chunk_size'] is not None and options['chunk_size'] <= 0:
+            raise CommandError("--chunk-size must be positive.")
+
+        source = sys.stdin if options['path'] == '-' else open(options['path'], encoding='utf-8')
+        started = time.perf_counter()
+        try:
+            report = import_articles(
+                source, author, options['chunk_size'], may_choose_author=True)
+        finally:
+            if source is not sys.stdin:
+                source.close()
+        elapsed = time.perf_counter() - started
+
+        for error in report.errors[:20]:
+            self.stderr.write("line {}: {}".format(error['line'], json.dumps(error['errors'])))
+        self.stdout.write("Imported {} articles in {:.1f} s ({:.0f} a minute), {} lines failed.".format(
+            report.created, elapsed, report.created * 60 / max(elapsed, 1e-9), len(report.errors)))
+
+        if options['errors']:
+            with open(options['errors'], 'w') as output:
+                json.dump(report.errors, output, indent=2)
+            self.stdout.write("Wrote {}.".format(options['errors']))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from ...trending import refresh_trending
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the rankings of trending articles, overall and for each "
+        "tag, from article scores. Run it periodically."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--size', type=int,
+            help='articles kept in each ranking (default ARTICLES_TRENDING_SIZE)')
+
+    def handle(self, *args, **options):
+        if options['size'] is not None and options['size'] <= 0:
+            raise CommandError("--size must be a positive number.")
+
+        ranked = refresh_trending(options['size'])
+        self.stdout.write(self.style.SUCCESS(
+            "Ranked {} trending article(s).".format(ranked)))
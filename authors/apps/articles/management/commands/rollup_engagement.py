@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from ...rollups import roll_up
+
+
+class Command(BaseCommand):
+    help = (
+        "Add up the likes, favourites, ratings and comments recorded since "
+        "the last run into the daily engagement of each article. Run it "
+        "periodically."
+    )
+
+    def handle(self, *args, **options):
+        changed = roll_up()
+        self.stdout.write(self.style.SUCCESS(
+            "Rolled up the engagement of {} article day(s).".format(changed)))
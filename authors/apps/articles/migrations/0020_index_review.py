@@ -0,0 +1,90 @@
+# Generated by Django 2.0.6 on 2026-10-18 12:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0019_merge_20180817_0642'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='article',
+            name='body',
+            field=models.TextField(),
+        ),
+        migrations.AlterField(
+            model_name='article',
+            name='description',
+            field=models.CharField(max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='article',
+            name='title',
+            field=models.CharField(max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='articlefavourites',
+            name='article',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, to='articles.Article'),
+        ),
+        migrations.AlterField(
+            model_name='articlefavourites',
+            name='article_favourite',
+            field=models.BooleanField(default=None),
+        ),
+        migrations.AlterField(
+            model_name='articlelikes',
+            name='article',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, to='articles.Article'),
+        ),
+        migrations.AlterField(
+            model_name='articlelikes',
+            name='article_like',
+            field=models.BooleanField(default=None),
+        ),
+        migrations.AlterField(
+            model_name='childcomment',
+            name='body',
+            field=models.CharField(max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='comments',
+            name='body',
+            field=models.CharField(max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='rating',
+            name='article_id',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='articles.Article'),
+        ),
+        migrations.AlterField(
+            model_name='rating',
+            name='rating',
+            field=models.IntegerField(),
+        ),
+        migrations.AlterField(
+            model_name='rating',
+            name='review',
+            field=models.CharField(blank=True, max_length=255, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['published', '-created_at'], name='article_published_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='articlefavourites',
+            index=models.Index(fields=['article', 'author'], name='articlefav_article_author_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='articlelikes',
+            index=models.Index(fields=['article', 'author'], name='articlelike_article_author_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='rating',
+            index=models.Index(fields=['article_id', 'author'], name='rating_article_author_idx'),
+        ),
+    ]
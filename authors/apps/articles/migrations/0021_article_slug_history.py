@@ -0,0 +1,23 @@
+# Generated by Django 2.0.6 on 2026-10-18 23:34
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0020_index_review'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArticleSlug',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('slug', models.SlugField(max_length=255, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('article', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='previous_slugs', to='articles.Article')),
+            ],
+        ),
+    ]
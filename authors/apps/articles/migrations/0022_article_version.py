@@ -0,0 +1,34 @@
+# Generated by Django 2.0.6 on 2026-10-18 23:39
+
+from django.db import migrations, models
+
+from authors.apps.articles.models import content_hash
+
+
+def hash_contents(apps, schema_editor):
+    Article = apps.get_model('articles', 'Article')
+    articles = Article.objects.only('title', 'description', 'body')
+    for article in articles.iterator():
+        Article.objects.filter(pk=article.pk).update(content_hash=content_hash(
+            article.title, article.description, article.body))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0021_article_slug_history'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='content_hash',
+            field=models.CharField(default='', editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='version',
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+        migrations.RunPython(hash_contents, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 2.0.6 on 2026-10-18 23:43
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+from authors.apps.articles.revisions import encode
+
+
+def snapshot_articles(apps, schema_editor):
+    # the history of existing articles starts with their current text
+    Article = apps.get_model('articles', 'Article')
+    ArticleRevision = apps.get_model('articles', 'ArticleRevision')
+    for article in Article.objects.iterator():
+        ArticleRevision.objects.create(
+            article_id=article.pk, version=article.version, snapshot=True,
+            data=encode({
+                'title': article.title, 'description': article.description,
+                'body': article.body}))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0022_article_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArticleRevision',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveIntegerField()),
+                ('snapshot', models.BooleanField(default=False)),
+                ('data', models.BinaryField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('article', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='revisions', to='articles.Article')),
+            ],
+        ),
+        migrations.AlterUniqueTogether(
+            name='articlerevision',
+            unique_together={('article', 'version')},
+        ),
+        migrations.RunPython(snapshot_articles, migrations.RunPython.noop),
+    ]
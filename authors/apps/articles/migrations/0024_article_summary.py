@@ -0,0 +1,37 @@
+# Generated by Django 2.0.6 on 2026-10-18 23:47
+
+from django.db import migrations, models
+
+from authors.apps.articles.models import summarise
+
+
+def summarise_articles(apps, schema_editor):
+    Article = apps.get_model('articles', 'Article')
+    for article in Article.objects.only('body').iterator():
+        Article.objects.filter(pk=article.pk).update(**summarise(article.body))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0023_article_revisions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='excerpt',
+            field=models.CharField(default='', editable=False, max_length=200),
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='reading_time',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='word_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(summarise_articles, migrations.RunPython.noop),
+    ]
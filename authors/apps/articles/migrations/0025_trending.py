@@ -0,0 +1,37 @@
+# Generated by Django 2.0.6 on 2026-10-19 09:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0024_article_summary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArticleScore',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField(default=0)),
+                ('scored_at', models.DateTimeField(db_index=True)),
+                ('article', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='score', to='articles.Article')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='TrendingArticle',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tag', models.CharField(blank=True, default='', max_length=100)),
+                ('rank', models.PositiveIntegerField()),
+                ('score', models.FloatField()),
+                ('article', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='trending', to='articles.Article')),
+            ],
+        ),
+        migrations.AlterUniqueTogether(
+            name='trendingarticle',
+            unique_together={('tag', 'rank')},
+        ),
+    ]
@@ -1,20 +1,54 @@
+import hashlib
+import json
+import math
 from datetime import datetime, timedelta
 from ..authentication.models import User
 
-from django.db import models
+from django.db import models, transaction
+from django.utils.html import strip_tags
+from django.utils.text import Truncator
 from taggit.managers import TaggableManager
 
+from .exceptions import ArticleVersionConflict
+
+# the fields the content hash of an article is computed from
+CONTENT_FIELDS = ('title', 'description', 'body')
+
+
+def content_hash(title, description, body):
+    """ a digest of an article's text, equal for equal text """
+    content = json.dumps([title, description, body]).encode('utf-8')
+    return hashlib.sha256(content).hexdigest()
+
+
+# the fields computed from an article's body whenever its text changes
+SUMMARY_FIELDS = ('excerpt', 'word_count', 'reading_time')
+
+EXCERPT_LENGTH = 200
+WORDS_PER_MINUTE = 200
+
+
+def summarise(body):
+    """ the excerpt, word count and reading time in minutes of a body """
+    text = ' '.join(strip_tags(body).split())
+    word_count = len(text.split())
+    return {
+        'excerpt': Truncator(text).chars(EXCERPT_LENGTH),
+        'word_count': word_count,
+        'reading_time': math.ceil(word_count / WORDS_PER_MINUTE),
+    }
+
 
 class Article(models.Model):
 
     # title is the article titlie to be published
-    title = models.CharField(db_index=True, max_length=255)
+    title = models.CharField(max_length=255)
 
     # body contains the information an author is trying to put across
-    body = models.TextField(db_index=True)
+    body = models.TextField()
 
     # description contains what the publication is all about
-    description = models.CharField(db_index=True, max_length=255)
+    description = models.CharField(max_length=255)
 
     # this field makes a publication searchable
     # it is got off a title but should never be the same
@@ -35,22 +69,107 @@ class Article(models.Model):
     # tage_field = models.ManyToManyField()
     tags = TaggableManager(blank=True)
 
+    # the digest of the title, description and body, kept by `save`
+    content_hash = models.CharField(max_length=64, default='', editable=False)
+
+    # a teaser of the body for lists, which then never load bodies, and
+    # its length, all kept by `save`
+    excerpt = models.CharField(max_length=EXCERPT_LENGTH, default='', editable=False)
+    word_count = models.PositiveIntegerField(default=0, editable=False)
+    reading_time = models.PositiveIntegerField(default=0, editable=False)
+
+    # raised by one on every save, edits made from an older version are
+    # rejected rather than overwriting the changes made since, and so are
+    # saves of an article that was saved by someone else since it was loaded
+    version = models.PositiveIntegerField(default=1, editable=False)
+
+    # times the article was read, written behind by `counters`
+    view_count = models.PositiveIntegerField(default=0, editable=False)
+
     objects = models.Manager()
 
+    def update_text_fields(self):
+        """ recompute the content hash, and the summary when the text changed
+
+        Returns whether the text changed. `save` calls it, rows written with
+        `bulk_create` must call it first.
+        """
+        previous_hash = self.content_hash
+        self.content_hash = content_hash(self.title, self.description, self.body)
+        changed = self._state.adding or self.content_hash != previous_hash
+        if changed:
+            for field, value in summarise(self.body).items():
+                setattr(self, field, value)
+        return changed
+
+    def save(self, *args, **kwargs):
+        # read by the signal that records the article's revisions
+        self._text_changed = self.update_text_fields()
+        loaded_version = None
+        if not self._state.adding:
+            # the row is only written over the version it was loaded at,
+            # see `_do_update`
+            loaded_version = self._loaded_version = self.version
+            self.version += 1
+
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            update_fields = set(update_fields) | {'content_hash', 'version', 'updated_at'}
+            if 'body' in update_fields:
+                update_fields.update(SUMMARY_FIELDS)
+            kwargs['update_fields'] = update_fields
+        elif not self._state.adding:
+            # only `counters` writes the read count, a save must not put back
+            # the count the article was loaded with
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'view_count']
+        try:
+            # a conflict rolls back this savepoint only, leaving the
+            # caller's transaction usable, and the revision recorded by the
+            # post_save signal is written along with the row
+            with transaction.atomic():
+                super().save(*args, **kwargs)
+        except Exception:
+            # nothing was written, not even the version
+            if loaded_version is not None:
+                self.version = loaded_version
+            raise
+        finally:
+            self._loaded_version = None
+
+    def _do_update(self, base_qs, using, pk_val, values, update_fields, forced_update):
+        loaded_version = getattr(self, '_loaded_version', None)
+        if loaded_version is None:
+            return super()._do_update(base_qs, using, pk_val, values, update_fields, forced_update)
+        updated = super()._do_update(
+            base_qs.filter(version=loaded_version), using, pk_val, values, update_fields, forced_update)
+        if not updated:
+            raise ArticleVersionConflict()
+        return updated
+
+    class Meta:
+        # the public feed lists published articles, newest first
+        indexes = [
+            models.Index(
+                fields=['published', '-created_at'],
+                name='article_published_created_idx'),
+        ]
+
 
 class Rating(models.Model):
 
     # this contains the rating level a given to an article
-    rating = models.IntegerField(db_index=True)
+    rating = models.IntegerField()
 
     # This contains the message given based on a user insight
     #  of an article on review, it can be left empty and is optional
-    review = models.CharField(
-        db_index=True, max_length=255, null=True, blank=True)
+    review = models.CharField(max_length=255, null=True, blank=True)
 
     # this field enables us identify which review belongs to which article
-    # it is a foreign key from articles
-    article_id = models.ForeignKey(Article, on_delete=models.CASCADE)
+    # it is a foreign key from articles, looked up through the index below
+    article_id = models.ForeignKey(
+        Article, on_delete=models.CASCADE, db_index=False)
 
     # this enables us know which user rated the article
     author = models.ForeignKey(User, on_delete=models.CASCADE)
@@ -63,11 +182,19 @@ class Rating(models.Model):
 
     objects = models.Manager()
 
+    class Meta:
+        # an article's ratings and whether a user has rated it already
+        indexes = [
+            models.Index(
+                fields=['article_id', 'author'],
+                name='rating_article_author_idx'),
+        ]
+
 
 class Comments(models.Model):
 
     # this contains the comment text to an article
-    body = models.CharField(db_index=True, max_length=255)
+    body = models.CharField(max_length=255)
 
     # this field enables us identify which comment belongs to which article
     # it is a foreign key from articles
@@ -88,7 +215,7 @@ class Comments(models.Model):
 class ChildComment(models.Model):
 
     # this contains the comment text to an article
-    body = models.CharField(db_index=True, max_length=255)
+    body = models.CharField(max_length=255)
 
     # this field enables us identify which comment belongs to which article
     # it is a foreign key from articles
@@ -111,12 +238,13 @@ class ChildComment(models.Model):
 
 class ArticleLikes(models.Model):
 
-    # id of the article to be created
+    # id of the article to be created, looked up through the index below
     article = models.ForeignKey(
-        Article, on_delete=models.CASCADE, null=True, blank=True)
+        Article, on_delete=models.CASCADE, null=True, blank=True,
+        db_index=False)
 
     # this takes the value of the like by a user
-    article_like = models.BooleanField(db_index=True, default=None)
+    article_like = models.BooleanField(default=None)
 
     # this takes in th user id of the user who has liked
     author = models.ForeignKey(User, on_delete=models.CASCADE)
@@ -129,15 +257,24 @@ class ArticleLikes(models.Model):
 
     objects = models.Manager()
 
+    class Meta:
+        # a user's like of an article is always looked up by both
+        indexes = [
+            models.Index(
+                fields=['article', 'author'],
+                name='articlelike_article_author_idx'),
+        ]
+
 
 class ArticleFavourites(models.Model):
 
-    # id of the article to be favourited
+    # id of the article to be favourited, looked up through the index below
     article = models.ForeignKey(
-        Article, on_delete=models.CASCADE, null=True, blank=True)
+        Article, on_delete=models.CASCADE, null=True, blank=True,
+        db_index=False)
 
     # this takes the value of the favourite by a user
-    article_favourite = models.BooleanField(db_index=True, default=None)
+    article_favourite = models.BooleanField(default=None)
 
     # this takes in th user id of the user who has favourited the article
     author = models.ForeignKey(User, on_delete=models.CASCADE)
@@ -146,3 +283,142 @@ class ArticleFavourites(models.Model):
     article_favourited_at = models.DateTimeField(auto_now_add=True)
 
     objects = models.Manager()
+
+    class Meta:
+        # a user's favourite of an article is always looked up by both
+        indexes = [
+            models.Index(
+                fields=['article', 'author'],
+                name='articlefav_article_author_idx'),
+        ]
+
+
+class ArticleSlug(models.Model):
+    """
+    A slug an article had before its title changed. Links using it are
+    redirected to the article's current slug.
+    """
+
+    # the slug the article no longer has, unique like current slugs
+    slug = models.SlugField(max_length=255, unique=True)
+
+    # the article the slug used to lead to
+    article = models.ForeignKey(
+        Article, on_delete=models.CASCADE, related_name='previous_slugs')
+
+    # when the article stopped using the slug
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = models.Manager()
+
+
+class ArticleRevision(models.Model):
+    """
+    The title, description and body of an article at one of its versions,
+    kept whole (a snapshot) or as the changes made to the revision before
+    it, compressed. See `authors.apps.articles.revisions`.
+    """
+
+    article = models.ForeignKey(
+        Article, on_delete=models.CASCADE, related_name='revisions')
+
+    # the version the article had once saved with this text
+    version = models.PositiveIntegerField()
+
+    # whether `data` holds the whole text rather than changes
+    snapshot = models.BooleanField(default=False)
+
+    # zlib compressed JSON
+    data = models.BinaryField()
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = models.Manager()
+
+    class Meta:
+        # revisions are always read by article, in version order
+        unique_together = ('article', 'version')
+
+
+class ArticleScore(models.Model):
+    """
+    How much attention an article has been getting, each like, favourite,
+    rating and comment adding points that halve every
+    `ARTICLES_TRENDING_HALF_LIFE` hours. See `authors.apps.articles.trending`.
+    """
+
+    article = models.OneToOneField(
+        Article, on_delete=models.CASCADE, related_name='score')
+
+    # the points of the article as of `scored_at`
+    score = models.FloatField(default=0)
+
+    # when the score was last changed, it has decayed since
+    scored_at = models.DateTimeField(db_index=True)
+
+    objects = models.Manager()
+
+
+class TrendingArticle(models.Model):
+    """
+    A place in the ranking of trending articles, overall or for a tag,
+    rebuilt periodically from article scores by `manage.py refresh_trending`.
+    """
+
+    # the tag ranked, empty for the ranking of all articles
+    tag = models.CharField(max_length=100, blank=True, default='')
+
+    rank = models.PositiveIntegerField()
+
+    article = models.ForeignKey(
+        Article, on_delete=models.CASCADE, related_name='trending')
+
+    # the article's score when the ranking was built
+    score = models.FloatField()
+
+    objects = models.Manager()
+
+    class Meta:
+        # rankings are read by tag, in rank order
+        unique_together = ('tag', 'rank')
+
+
+class ArticleDailyStats(models.Model):
+    """
+    The engagement of an article over one day (UTC), added up from likes,
+    favourites, ratings and comments by `manage.py rollup_engagement`, and
+    from reads as they are written. See `authors.apps.articles.rollups`.
+    """
+
+    article = models.ForeignKey(
+        Article, on_delete=models.CASCADE, related_name='daily_stats')
+
+    day = models.DateField()
+
+    likes = models.PositiveIntegerField(default=0)
+    dislikes = models.PositiveIntegerField(default=0)
+    favourites = models.PositiveIntegerField(default=0)
+
+    # the number of ratings and their stars added up, for the average
+    ratings = models.PositiveIntegerField(default=0)
+    rating_sum = models.PositiveIntegerField(default=0)
+
+    # comments and replies
+    comments = models.PositiveIntegerField(default=0)
+    views = models.PositiveIntegerField(default=0)
+
+    objects = models.Manager()
+
+    class Meta:
+        # an article's stats are read over a range of days
+        unique_together = ('article', 'day')
+
+
+class RollupWatermark(models.Model):
+    """ the time up to which the events of a rollup have been added up """
+
+    name = models.CharField(max_length=50, unique=True)
+
+    rolled_up_to = models.DateTimeField()
+
+    objects = models.Manager()
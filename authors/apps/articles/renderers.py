@@ -74,3 +74,17 @@ class ListArticlesJSONRenderer(JSONRenderer):
         return json.dumps({
             "articles": data,
         })
+
+
+class ListCommentsJSONRenderer(JSONRenderer):
+    charset = 'utf-8'
+
+    def render(self, data, media_type=None, renderer_context=None):
+        errors = data.get('errors', None)
+
+        if errors is not None:
+            return super(ListCommentsJSONRenderer, self).render(data)
+
+        return json.dumps({
+            "comments": data,
+        })
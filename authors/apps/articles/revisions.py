@@ -0,0 +1,123 @@
+"""
+The revision history of articles' text.
+
+Every save that changes an article's title, description or body records a
+revision. Most revisions hold only the changes from the revision before
+them, as word level copy and insert operations. Every
+`ARTICLE_REVISION_SNAPSHOT_INTERVAL`-th revision, and any revision whose
+changes would take more room than the text itself, holds the whole text,
+so rebuilding a version reads at most that many rows.
+"""
+import difflib
+import json
+import re
+import zlib
+
+from django.conf import settings
+from django.db.models import Subquery
+from django.db.models.functions import Length
+
+from .models import CONTENT_FIELDS, Article, ArticleRevision
+
+# words with the whitespace that follows them, joined back into the text
+TOKEN = re.compile(r'\S+\s*|\s+')
+
+
+def encode(value):
+    return zlib.compress(json.dumps(value, separators=(',', ':')).encode('utf-8'))
+
+
+def decode(data):
+    return json.loads(zlib.decompress(bytes(data)).decode('utf-8'))
+
+
+def text_of(article):
+    return {field: getattr(article, field) for field in CONTENT_FIELDS}
+
+
+def diff(old, new):
+    """ the operations turning each field of `old` into that of `new`
+
+    A field's operations are `[start, end]` to copy those words of the old
+    text and strings to insert. Unchanged fields are left out.
+    """
+    changes = {}
+    for field in CONTENT_FIELDS:
+        if old[field] == new[field]:
+            continue
+        before, after = TOKEN.findall(old[field]), TOKEN.findall(new[field])
+        matcher = difflib.SequenceMatcher(None, before, after, autojunk=False)
+        operations = []
+        for tag, start, end, new_start, new_end in matcher.get_opcodes():
+            if tag == 'equal':
+                operations.append([start, end])
+            elif tag in ('replace', 'insert'):
+                operations.append(''.join(after[new_start:new_end]))
+        changes[field] = operations
+    return changes
+
+
+def patch(text, changes):
+    """ apply the operations made by `diff` to `text` """
+    text = dict(text)
+    for field, operations in changes.items():
+        words = TOKEN.findall(text[field])
+        text[field] = ''.join(
+            operation if isinstance(operation, str)
+            else ''.join(words[operation[0]:operation[1]])
+            for operation in operations)
+    return text
+
+
+def _chain(article_id, version=None):
+    """ the revisions from the last snapshot up to `version`, in order """
+    revisions = ArticleRevision.objects.filter(article_id=article_id)
+    if version is not None:
+        revisions = revisions.filter(version__lte=version)
+    snapshot = revisions.filter(snapshot=True).order_by('-version').values('version')[:1]
+    return list(revisions.filter(version__gte=Subquery(snapshot)).order_by('version'))
+
+
+def _rebuild(chain):
+    text = decode(chain[0].data)
+    for revision in chain[1:]:
+        text = patch(text, decode(revision.data))
+    return text
+
+
+def record_revision(article):
+    """ record the text of `article` as of its current version
+
+    Called in the transaction that saved the article, whose UPDATE keeps
+    the row locked, so the version read back is the one that save wrote.
+    """
+    version = Article.objects.filter(pk=article.pk).values_list('version', flat=True).get()
+    text = text_of(article)
+    data, snapshot = encode(text), True
+
+    chain = _chain(article.pk)
+    interval = getattr(settings, 'ARTICLE_REVISION_SNAPSHOT_INTERVAL', 20)
+    if chain and len(chain) < interval:
+        changes = encode(diff(_rebuild(chain), text))
+        if len(changes) < len(data):
+            data, snapshot = changes, False
+
+    ArticleRevision.objects.create(
+        article_id=article.pk, version=version, data=data, snapshot=snapshot)
+
+
+def list_revisions(article_id):
+    """ the version, time and stored size of each revision of an article """
+    return list(
+        ArticleRevision.objects.filter(article_id=article_id).order_by('version')
+        .annotate(size=Length('data')).values('version', 'created_at', 'snapshot', 'size'))
+
+
+def get_revision(article_id, version):
+    """ the title, description and body of an article at `version`, or None """
+    chain = _chain(article_id, version)
+    if not chain or chain[-1].version != version:
+        return None
+    text = _rebuild(chain)
+    text.update(version=version, created_at=chain[-1].created_at)
+    return text
@@ -0,0 +1,160 @@
+"""
+Daily engagement of articles, for their authors' analytics.
+
+`roll_up`, run periodically by `manage.py rollup_engagement`, adds up the
+likes, favourites, ratings and comments recorded since its watermark into
+one row per article and day, then moves the watermark on. Events are
+counted as they were first recorded, a like later changed or removed is
+not taken back. Reads are added as they are written by `counters`.
+
+The analytics endpoint reads these rows only, never the events.
+"""
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import (
+    Article, ArticleDailyStats, ArticleFavourites, ArticleLikes, ChildComment, Comments,
+    Rating, RollupWatermark)
+
+WATERMARK = 'article_engagement'
+
+# each kind of event: its model, the field naming its article, the time it
+# was recorded at, and what it adds to the stats of its article and day
+SOURCES = (
+    (ArticleLikes, 'article', 'article_liked_at', {
+        'likes': Count('id', filter=Q(article_like=True)),
+        'dislikes': Count('id', filter=Q(article_like=False))}),
+    (ArticleFavourites, 'article', 'article_favourited_at', {'favourites': Count('id')}),
+    (Rating, 'article_id', 'created_at', {'ratings': Count('id'), 'rating_sum': Sum('rating')}),
+    (Comments, 'article_id', 'created_at', {'comments': Count('id')}),
+    (ChildComment, 'article_id', 'created_at', {'comments': Count('id')}),
+)
+
+STATS = ('likes', 'dislikes', 'favourites', 'ratings', 'rating_sum', 'comments', 'views')
+
+# articles looked up by each query, under SQLite's limit on parameters
+BATCH_SIZE = 500
+
+
+def _batches(items):
+    items = list(items)
+    for start in range(0, len(items), BATCH_SIZE):
+        yield items[start:start + BATCH_SIZE]
+
+
+def add_stats(totals):
+    """ add `totals`, counts by `(article id, day)`, to the daily stats
+
+    Rows with the same day and counts are updated together, missing rows
+    of articles that still exist are created. Rows another process created
+    in between are added to one at a time.
+    """
+    by_day = defaultdict(dict)
+    for (article_id, day), counts in totals.items():
+        counts = {field: value for field, value in counts.items() if value}
+        if article_id is not None and counts:
+            by_day[day][article_id] = counts
+
+    for day, counts in by_day.items():
+        existing = set()
+        for batch in _batches(counts):
+            existing.update(ArticleDailyStats.objects.filter(
+                day=day, article_id__in=batch).values_list('article_id', flat=True))
+
+        updates = defaultdict(list)
+        for article_id in existing:
+            updates[tuple(sorted(counts[article_id].items()))].append(article_id)
+        for change, article_ids in updates.items():
+            for batch in _batches(article_ids):
+                ArticleDailyStats.objects.filter(day=day, article_id__in=batch).update(
+                    **{field: F(field) + value for field, value in change})
+
+        _create_stats(day, counts, set(counts) - existing)
+
+
+def _create_stats(day, counts, missing):
+    created = []
+    for batch in _batches(missing):
+        created.extend(
+            ArticleDailyStats(article_id=article_id, day=day, **counts[article_id])
+            for article_id in Article.objects.filter(pk__in=batch).values_list('pk', flat=True))
+    try:
+        with transaction.atomic():
+            ArticleDailyStats.objects.bulk_create(created)
+    except IntegrityError:
+        # another process created some of the rows since they were looked up
+        for stats in created:
+            _add_to_row(stats.article_id, day, counts[stats.article_id])
+
+
+def _add_to_row(article_id, day, counts):
+    stats, created = ArticleDailyStats.objects.get_or_create(
+        article_id=article_id, day=day, defaults=counts)
+    if not created:
+        ArticleDailyStats.objects.filter(pk=stats.pk).update(
+            **{field: F(field) + value for field, value in counts.items()})
+
+
+def roll_up(now=None):
+    """ add up the events since the watermark, returning the article days changed
+
+    Events of the last `ARTICLES_ROLLUP_LAG` seconds are left for the next
+    run, so that those still being committed are not skipped. A run that
+    fails leaves the watermark where it was.
+    """
+    now = now or timezone.now()
+    end = now - timedelta(seconds=getattr(settings, 'ARTICLES_ROLLUP_LAG', 60))
+
+    with transaction.atomic():
+        watermark, created = RollupWatermark.objects.select_for_update().get_or_create(
+            name=WATERMARK,
+            defaults={'rolled_up_to': datetime(1970, 1, 1, tzinfo=timezone.utc)})
+        if end <= watermark.rolled_up_to:
+            return 0
+
+        totals = defaultdict(Counter)
+        for model, article, recorded_at, aggregates in SOURCES:
+            events = model.objects.filter(**{
+                recorded_at + '__gt': watermark.rolled_up_to, recorded_at + '__lte': end})
+            rows = events.values(
+                rollup_article=F(article), rollup_day=TruncDate(recorded_at)
+            ).annotate(**aggregates).order_by()
+            for row in rows:
+                key = (row.pop('rollup_article'), row.pop('rollup_day'))
+                totals[key].update(row)
+
+        add_stats(totals)
+        watermark.rolled_up_to = end
+        watermark.save()
+    return len(totals)
+
+
+def daily_stats(article_id, first, last):
+    """ the stats of an article for each day from `first` to `last`, and their totals """
+    rows = {
+        row['day']: row for row in ArticleDailyStats.objects.filter(
+            article_id=article_id, day__gte=first, day__lte=last).values('day', *STATS)}
+
+    days = []
+    totals = dict.fromkeys(STATS, 0)
+    for offset in range((last - first).days + 1):
+        day = first + timedelta(days=offset)
+        stats = rows.get(day) or dict.fromkeys(STATS, 0)
+        stats = {field: stats[field] for field in STATS}
+        for field in STATS:
+            totals[field] += stats[field]
+        days.append(dict(_with_average(stats), day=day))
+    return days, _with_average(totals)
+
+
+def _with_average(stats):
+    stats = dict(stats)
+    ratings, rating_sum = stats['ratings'], stats.pop('rating_sum')
+    stats['rating_average'] = round(rating_sum / ratings, 2) if ratings else None
+    return stats
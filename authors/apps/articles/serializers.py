@@ -1,18 +1,26 @@
+import uuid
+
 from django.contrib.auth import authenticate
+from django.db import transaction
+from django.template.defaultfilters import slugify
 
 from rest_framework import serializers
+from rest_framework.exceptions import NotFound, PermissionDenied
 
 from ..authentication.models import User
 
 from taggit_serializer.serializers import TagListSerializerField, TaggitSerializer
 from .models import (
-    Article, Rating, Comments, ChildComment, ArticleLikes,
+    CONTENT_FIELDS, content_hash, Article, Rating, Comments, ChildComment, ArticleLikes,
     ArticleFavourites as ArticleFs
 )
-from ..notifications.models import Notifications
+from .exceptions import ArticleVersionConflict
+from ..notifications.fanout import notify_about_article
 from ..profiles.models import Profile
 import re
 from authors.apps.profiles.serializers import ProfileSerializer
+from authors.apps.profiles.snapshots import get_profile_snapshot
+from authors.apps.core import metrics
 
 
 class CreateArticleAPIViewSerializer(TaggitSerializer, serializers.ModelSerializer):
@@ -21,6 +29,13 @@ class CreateArticleAPIViewSerializer(TaggitSerializer, serializers.ModelSerializ
     author = serializers.SerializerMethodField()
     user_id = User.pk
 
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        # a sparse fieldset, see `fieldsets.SparseFieldsetMixin`
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
     def get_author(self, article):
         user = {
             "username": article.author.username,
@@ -36,7 +51,8 @@ class CreateArticleAPIViewSerializer(TaggitSerializer, serializers.ModelSerializ
         # or response, including fields specified explicitly above.
         # return a success message on succeesful registration
         fields = ['id', 'title', 'body', 'description',
-                  'author', 'slug', 'published', 'created_at', 'tags']
+                  'author', 'slug', 'published', 'created_at', 'tags', 'version',
+                  'excerpt', 'word_count', 'reading_time', 'view_count']
 
     def validate_title(self, title_var):
         if len(title_var) > 150:
@@ -56,13 +72,16 @@ class CreateArticleAPIViewSerializer(TaggitSerializer, serializers.ModelSerializ
 class UpdateArticleAPIViewSerializer(serializers.ModelSerializer):
     user_id = User.pk
 
+    # the version the edit was made from, checked like that of a PATCH
+    version = serializers.IntegerField(min_value=1, required=False, write_only=True)
+
     class Meta:
         model = Article
         # List all of the fields that could possibly be included in a request
         # or response, including fields specified explicitly above.
         # return a success message on succeesful registration
         fields = ['id', 'title', 'body', 'description',
-                  'author', 'slug', 'published', 'created_at', 'tags']
+                  'author', 'slug', 'published', 'created_at', 'tags', 'version']
 
     def validate_title(self, title_var):
         if len(title_var) > 150:
@@ -78,52 +97,51 @@ class UpdateArticleAPIViewSerializer(serializers.ModelSerializer):
             )
         return description_var
 
-    def update_article(self, article_id, data, user_id):
-        try:
-            article_instance = Article.objects.get(pk=article_id)
-        except:  # noqa: E722
-            raise serializers.ValidationError(
-                "Article with id " + str(article_id) + " was not found."
-            )
+    def update_article(self, article_id, data, user):
+        version = data.pop("version", None)
 
-        # get username using userid
-        # this helps us call the notifications class method that
-        # will generate notifications of a published article to a user's following
-        username = User.objects.filter(pk=user_id).values("username")[
-            0]["username"]
+        # locked like the article of a PATCH, so that edits are applied one
+        # after the other
+        with transaction.atomic():
+            try:
+                article_instance = Article.objects.select_for_update().get(pk=article_id)
+            except Article.DoesNotExist:
+                raise serializers.ValidationError(
+                    "Article with id " + str(article_id) + " was not found."
+                )
+            if version is not None and article_instance.version != int(version):
+                raise ArticleVersionConflict()
 
-        if article_instance.title == data["title"]:
-            data.pop("slug", None)
+            if article_instance.title == data["title"]:
+                data.pop("slug", None)
 
-        user_followers = []
+            user_followers = []
 
-        if article_instance.published is False and \
-                data["published"]:
-            user_followers = self.notifications(username, article_id)
-            for follower_id in user_followers:
-                Notifications.objects.create(article_id=Article.objects.get(
-                    pk=article_id), notification_title=article_instance.title,
-                    notification_body=article_instance.body,
-                    notification_owner=User.objects.get(pk=follower_id))
+            if article_instance.published is False and \
+                    data["published"]:
+                user_followers = self.notify_followers(article_instance, user)
 
-        for (key, value) in data.items():
-            setattr(article_instance, key, value)
-        article_instance.save()
+            for (key, value) in data.items():
+                setattr(article_instance, key, value)
+            article_instance.save()
 
         return len(user_followers)
 
+    def notify_followers(self, article_instance, user):
+        """ tell the author's followers about an article being published """
+        user_followers = self.notifications(user.username, article_instance.pk)
+        metrics.observe('notification_fanout_size', len(user_followers))
+        notify_about_article(article_instance, user_followers)
+        return user_followers
+
     def notifications(self, username, followee_id):
         list_of_followers = []
 
-        try:
-            profile = Profile.objects.select_related('user').get(
-                user__username=username
-            )
-        except:  # noqa: E722
-            pass
+        # resolve the author's profile id through the snapshot cache
+        profile = get_profile_snapshot(username)
 
         user_followers = Profile.follows.through.objects.filter(
-            to_profile_id=profile.id)
+            to_profile_id=profile['id'])
         for a_follower in user_followers:
             list_of_followers.append(
                 str(a_follower.from_profile_id)
@@ -134,6 +152,66 @@ class UpdateArticleAPIViewSerializer(serializers.ModelSerializer):
         return list_of_followers
 
 
+class PatchArticleAPIViewSerializer(UpdateArticleAPIViewSerializer):
+    """
+    Applies a partial edit of an article, such as an editor's autosave.
+
+    Only the columns whose values change are written, nothing is written
+    when nothing changes, and an edit made from an older `version` than the
+    article's is rejected.
+    """
+
+    version = serializers.IntegerField(min_value=1)
+
+    class Meta:
+        model = Article
+        fields = ['title', 'body', 'description', 'published', 'version']
+
+    def patch_article(self, article_id, user):
+        """ apply the validated edit, returning the article and whether it was saved """
+        data = dict(self.validated_data)
+        version = data.pop('version')
+
+        with transaction.atomic():
+            try:
+                article = Article.objects.select_for_update(of=('self',)).select_related(
+                    'author__profile').get(pk=article_id)
+            except Article.DoesNotExist:
+                raise NotFound("Article with id " + str(article_id) + " was not found.")
+            if article.author_id != user.pk:
+                raise PermissionDenied("You can only edit your own articles.")
+            if article.version != version:
+                raise ArticleVersionConflict()
+
+            changed = self.changed_fields(article, data)
+            if not changed:
+                return article, False
+
+            publishing = changed.get('published') and not article.published
+            if 'title' in changed:
+                changed['slug'] = new_slug(changed['title'])
+            for key, value in changed.items():
+                setattr(article, key, value)
+            if publishing:
+                self.notify_followers(article, user)
+            article.save(update_fields=list(changed))
+        return article, True
+
+    def changed_fields(self, article, data):
+        """ the fields of `data` that differ from the article's """
+        text = {field: data.get(field, getattr(article, field)) for field in CONTENT_FIELDS}
+        if content_hash(**text) == article.content_hash:
+            # the text is the same, only the other fields may differ
+            data = {key: value for key, value in data.items() if key not in CONTENT_FIELDS}
+        return {key: value for key, value in data.items() if getattr(article, key) != value}
+
+
+def new_slug(title):
+    """ a slug made from `title`, with a random suffix keeping it unique """
+    slug = slugify(title).replace("_", "-")
+    return slug + "-" + str(uuid.uuid4()).split("-")[-1]
+
+
 class RatingArticleAPIViewSerializer(serializers.ModelSerializer):
 
     rating = serializers.CharField()
@@ -158,10 +236,8 @@ class RatingArticleAPIViewSerializer(serializers.ModelSerializer):
         user_id = data.get('author', None)
         article_id = data.get('article_id', None)
 
-        # get user id of author of article
-        user_to_rate = article_id.author
-
-        if user_to_rate == user_id:
+        # compare ids so that the article's author is not loaded
+        if article_id.author_id == user_id.pk:
             raise serializers.ValidationError(
                 "You cannot rate your own article"
             )
@@ -270,6 +346,38 @@ class ChildCommentSerializer(serializers.ModelSerializer):
         return body_var
 
 
+class CommentReplySerializer(serializers.Serializer):
+    """ serializes a threaded comment read with `.values()` and its author """
+
+    # the columns read for every comment, the author comes in through a join
+    comment_fields = (
+        'id', 'body', 'created_at', 'updated_at',
+        'author__username', 'author__profile__image'
+    )
+
+    id = serializers.IntegerField()
+    body = serializers.CharField()
+    created_at = serializers.DateTimeField()
+    updated_at = serializers.DateTimeField()
+    author = serializers.SerializerMethodField()
+
+    def get_author(self, comment):
+        return {
+            "username": comment["author__username"],
+            "image": comment["author__profile__image"] or ""
+        }
+
+
+class CommentThreadSerializer(CommentReplySerializer):
+    """ serializes a top level comment with the first few of its replies """
+
+    replies = CommentReplySerializer(many=True)
+    replies_count = serializers.IntegerField()
+
+    # pass this to the replies endpoint as `after` to load more replies
+    replies_cursor = serializers.IntegerField(allow_null=True)
+
+
 class LikeArticleAPIViewSerializer(serializers.ModelSerializer):
 
     article_like = serializers.BooleanField()
@@ -355,10 +463,11 @@ class LikeArticleAPIViewSerializer(serializers.ModelSerializer):
                 "You need to first like or dislike the article")
         else:
             item = self.get_data_items(data)
-            like_update = ArticleLikes.objects.filter(article_id=item['article_id'],
-                                                      author_id=item['author']
-                                                      )
-            like_update.update(article_like=item['article_like'])
+            # saved one by one so that the article's trending score follows
+            for like in ArticleLikes.objects.filter(article_id=item['article_id'],
+                                                    author_id=item['author']):
+                like.article_like = item['article_like']
+                like.save(update_fields=['article_like', 'like_updated_at'])
             return {
                 "article_like": item['article_like'],
                 "author": item['author'],
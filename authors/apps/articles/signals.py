@@ -0,0 +1,141 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from authors.apps.authentication.models import User
+from authors.apps.profiles.models import Profile
+
+from .cache import article_slugs, published_articles
+from .models import Article, ArticleFavourites, ArticleLikes, ArticleSlug, ChildComment, Comments, Rating
+from .revisions import record_revision
+from .trending import adjust_score, decay, like_points, rating_points, weight
+
+
+@receiver(pre_save, sender=Article)
+def remember_previous_slug(sender, instance, *args, **kwargs):
+    """ note the slug an article had before a save that may change it """
+    instance._previous_slug = None
+    if instance.pk:
+        instance._previous_slug = Article.objects.filter(
+            pk=instance.pk).values_list('slug', flat=True).first()
+
+
+@receiver(post_save, sender=Article)
+def record_slug_change(sender, instance, *args, **kwargs):
+    """ keep the previous slug of an article, so that links using it still work """
+    previous = getattr(instance, '_previous_slug', None)
+    if not previous or previous == instance.slug:
+        return
+    ArticleSlug.objects.update_or_create(slug=previous, defaults={'article': instance})
+    # an article given back a slug it had before uses it as its current one
+    ArticleSlug.objects.filter(slug=instance.slug).delete()
+
+
+@receiver(post_save, sender=Article)
+def record_text_change(sender, instance, *args, **kwargs):
+    """ add a revision to the history of an article whose text changed """
+    if getattr(instance, '_text_changed', False):
+        record_revision(instance)
+
+
+@receiver(post_save, sender=Article)
+@receiver(post_delete, sender=Article)
+def invalidate_article(sender, instance, *args, **kwargs):
+    """ drop the cached payload and slug of an article whenever it changes """
+    published_articles.delete(instance.pk)
+    article_slugs.delete(instance.slug)
+
+
+@receiver(m2m_changed, sender=Article.tags.through)
+def invalidate_article_tags(sender, instance, action, *args, **kwargs):
+    """ drop the cached payload of an article when its tags change """
+    if action.startswith('post_') and isinstance(instance, Article):
+        published_articles.delete(instance.pk)
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_save, sender=User)
+def invalidate_author(sender, instance, created, *args, **kwargs):
+    """ drop the cached articles of an author whose profile or username changed
+
+    Payloads embed their author's username, bio and image.
+    """
+    if created:
+        return
+    if sender is User and instance.username == getattr(instance, '_previous_username', None):
+        return
+    # following and unfollowing save profiles too, leaving payloads as they were
+    if sender is Profile and (instance.bio, instance.image) == getattr(instance, '_previous_profile', None):
+        return
+    author_id = instance.pk if sender is User else instance.user_id
+    published_articles.delete_many(
+        Article.objects.filter(author_id=author_id).values_list('pk', flat=True))
+
+
+@receiver(pre_save, sender=ArticleLikes)
+def remember_previous_like(sender, instance, *args, **kwargs):
+    """ note whether a like was one before a save that may change it """
+    instance._previous_like = None
+    if instance.pk:
+        instance._previous_like = ArticleLikes.objects.filter(
+            pk=instance.pk).values_list('article_like', 'like_updated_at').first()
+
+
+@receiver(post_save, sender=ArticleLikes)
+def score_like(sender, instance, created, *args, **kwargs):
+    """ add a like or dislike to its article's score, or swap one for the other """
+    points = like_points(instance.article_like)
+    previous = getattr(instance, '_previous_like', None)
+    if not created and previous:
+        if previous[0] == instance.article_like:
+            return
+        points -= decay(like_points(previous[0]), previous[1], instance.like_updated_at)
+    adjust_score(instance.article_id, points)
+
+
+@receiver(post_delete, sender=ArticleLikes)
+def unscore_like(sender, instance, *args, **kwargs):
+    adjust_score(
+        instance.article_id, -like_points(instance.article_like),
+        instance.like_updated_at, create=False)
+
+
+@receiver(post_save, sender=ArticleFavourites)
+def score_favourite(sender, instance, created, *args, **kwargs):
+    if created and instance.article_favourite:
+        adjust_score(instance.article_id, weight('favourite'))
+
+
+@receiver(post_delete, sender=ArticleFavourites)
+def unscore_favourite(sender, instance, *args, **kwargs):
+    if instance.article_favourite:
+        adjust_score(
+            instance.article_id, -weight('favourite'),
+            instance.article_favourited_at, create=False)
+
+
+@receiver(post_save, sender=Rating)
+def score_rating(sender, instance, created, *args, **kwargs):
+    if created:
+        adjust_score(instance.article_id_id, rating_points(instance.rating))
+
+
+@receiver(post_delete, sender=Rating)
+def unscore_rating(sender, instance, *args, **kwargs):
+    adjust_score(
+        instance.article_id_id, -rating_points(instance.rating),
+        instance.created_at, create=False)
+
+
+@receiver(post_save, sender=Comments)
+@receiver(post_save, sender=ChildComment)
+def score_comment(sender, instance, created, *args, **kwargs):
+    """ add comments and replies to their article's score """
+    if created:
+        adjust_score(instance.article_id_id, weight('comment'))
+
+
+@receiver(post_delete, sender=Comments)
+@receiver(post_delete, sender=ChildComment)
+def unscore_comment(sender, instance, *args, **kwargs):
+    adjust_score(
+        instance.article_id_id, -weight('comment'), instance.created_at, create=False)
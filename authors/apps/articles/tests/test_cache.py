@@ -0,0 +1,73 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+
+from authors.apps.authentication.models import User
+from ..counters import view_counter
+from ..models import Article
+
+
+class TestArticleCache(TestCase):
+    """ tests for caching published articles """
+
+    def setUp(self):
+        cache.clear()
+        # reads of articles are counted, and left to other tests otherwise
+        self.addCleanup(view_counter.clear)
+        self.client = Client()
+        self.user = User.objects.create_user(
+            'Aurthurs', 'haven.authors@gmail.com', 'jakejake@20AA')
+        self.article = Article.objects.create(
+            title='cached', body='body', description='description',
+            slug='cached-1', published=True, author=self.user)
+        self.path = '/api/articles/single/{}'.format(self.article.pk)
+
+    def fetch(self):
+        response = self.client.get(self.path)
+        self.assertEqual(response.status_code, 200)
+        return response.json()['articles']
+
+    def test_served_from_cache(self):
+        """ test if a published article is read from the database once """
+        self.fetch()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.fetch()['title'], 'cached')
+
+    def test_dropped_when_saved(self):
+        """ test if an article is served fresh once it changes """
+        self.fetch()
+        self.article.title = 'changed'
+        self.article.save()
+        self.assertEqual(self.fetch()['title'], 'changed')
+
+        self.article.published = False
+        self.article.save()
+        self.assertEqual(self.client.get(self.path).status_code, 404)
+
+    def test_dropped_when_tagged(self):
+        """ test if an article is served fresh once its tags change """
+        self.fetch()
+        self.article.tags.add('python')
+        self.assertEqual(list(self.fetch()['tags']), ['python'])
+
+    def test_dropped_when_author_changes(self):
+        """ test if an article is served fresh once its author's profile changes """
+        self.fetch()
+        self.user.profile.bio = 'a new bio'
+        self.user.profile.save()
+        self.assertEqual(self.fetch()['author']['bio'], 'a new bio')
+
+        self.user.username = 'Renamed'
+        self.user.save()
+        self.assertEqual(self.fetch()['author']['username'], 'Renamed')
+
+    def test_kept_when_author_followed(self):
+        """ test if a follow, which saves the author's profile, keeps their articles cached """
+        self.fetch()
+        follower = User.objects.create_user(
+            'follower', 'follower@example.com', 'jakejake@20AA')
+        follower.profile.follow(self.user.profile)
+        follower.profile.save()
+        self.user.profile.save()
+
+        with self.assertNumQueries(0):
+            self.fetch()
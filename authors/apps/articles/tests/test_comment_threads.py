@@ -0,0 +1,100 @@
+from django.test.utils import override_settings
+
+from authors.apps.authentication.models import User
+from ..models import Article, ChildComment, Comments
+from .base import BaseTest, json
+
+
+@override_settings(COMMENT_REPLIES_PREVIEW=2)
+class CommentThreadsTest(BaseTest):
+    """ tests for listing an article's comments with their replies """
+
+    def setUp(self):
+        super(CommentThreadsTest, self).setUp()
+        self.test_client.post(
+            "/api/articles/", **self.user_logged_in,
+            data=json.dumps(self.article_to_create),
+            content_type='application/json')
+        self.article = Article.objects.get()
+        self.author = User.objects.get(username='Aurthurs')
+
+    def comment(self, body, parent=None):
+        if parent is None:
+            return Comments.objects.create(
+                body=body, article_id=self.article, author=self.author)
+        return ChildComment.objects.create(
+            body=body, article_id=self.article, parent_id=parent,
+            author=self.author)
+
+    def list_comments(self, **params):
+        return self.test_client.get(
+            "/api/articles/{}/comment/".format(self.article.id), params)
+
+    def test_lists_comments_with_reply_previews(self):
+        """ each comment comes with its first replies and a cursor to the rest """
+        first = self.comment("first")
+        self.comment("second")
+        for body in ("a", "b", "c"):
+            self.comment(body, parent=first)
+
+        response = self.list_comments()
+
+        self.assertEqual(response.status_code, 200)
+        comments = response.json()['comments']
+        self.assertEqual(comments['count'], 2)
+        thread = comments['results'][0]
+        self.assertEqual(thread['body'], "first")
+        self.assertEqual(thread['author']['username'], "Aurthurs")
+        self.assertEqual([reply['body'] for reply in thread['replies']], ["a", "b"])
+        self.assertEqual(thread['replies_count'], 3)
+        self.assertEqual(thread['replies_cursor'], thread['replies'][-1]['id'])
+        self.assertEqual(comments['results'][1]['replies'], [])
+        self.assertIsNone(comments['results'][1]['replies_cursor'])
+
+    def test_listing_queries_do_not_grow_with_the_thread(self):
+        """ the page, its count and every reply are read in three queries """
+        for number in range(5):
+            parent = self.comment("comment {}".format(number))
+            for reply in range(3):
+                self.comment("reply {}".format(reply), parent=parent)
+
+        with self.assertNumQueries(3):
+            response = self.list_comments()
+        self.assertEqual(len(response.json()['comments']['results']), 5)
+
+    def test_listing_comments_of_missing_article(self):
+        """ listing the comments of an article that does not exist """
+        response = self.test_client.get("/api/articles/404/comment/")
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_loads_more_replies_after_cursor(self):
+        """ the replies endpoint continues from the preview's cursor """
+        parent = self.comment("parent")
+        for body in ("a", "b", "c", "d"):
+            self.comment(body, parent=parent)
+        cursor = self.list_comments().json()['comments']['results'][0]['replies_cursor']
+
+        response = self.test_client.get(
+            "/api/articles/{}/comment/{}/replies/".format(self.article.id, parent.id),
+            {'after': cursor, 'limit': 1})
+
+        self.assertEqual(response.status_code, 200)
+        replies = response.json()['comments']
+        self.assertEqual([reply['body'] for reply in replies['results']], ["c"])
+
+        response = self.test_client.get(
+            "/api/articles/{}/comment/{}/replies/".format(self.article.id, parent.id),
+            {'after': replies['replies_cursor']})
+        replies = response.json()['comments']
+        self.assertEqual([reply['body'] for reply in replies['results']], ["d"])
+        self.assertIsNone(replies['replies_cursor'])
+
+    def test_replies_with_invalid_cursor(self):
+        """ a cursor that is not a number is rejected """
+        parent = self.comment("parent")
+        response = self.test_client.get(
+            "/api/articles/{}/comment/{}/replies/".format(self.article.id, parent.id),
+            {'after': 'abc'})
+
+        self.assertEqual(response.status_code, 400)
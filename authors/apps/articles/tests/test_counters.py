@@ -0,0 +1,127 @@
+import threading
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import DatabaseError, connection
+from django.db.models.query import QuerySet
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+
+from authors.apps.authentication.models import User
+from authors.apps.core import metrics
+from ..counters import ViewCounter, view_counter
+from ..models import Article
+
+
+class TestViewCounter(TestCase):
+    """ tests for article read counts written behind """
+
+    def setUp(self):
+        cache.clear()
+        metrics.registry.clear()
+        view_counter.clear()
+        self.addCleanup(view_counter.clear)
+        self.client = Client()
+        author = User.objects.create_user(
+            'Aurthurs', 'haven.authors@gmail.com', 'jakejake@20AA')
+        self.articles = [
+            Article.objects.create(
+                title='article {}'.format(number), body='body', description='description',
+                slug='article-{}'.format(number), published=True, author=author)
+            for number in range(3)]
+
+    def view_counts(self):
+        return list(Article.objects.order_by('pk').values_list('view_count', flat=True))
+
+    def metric(self, name, **labels):
+        return metrics.registry.collect().get(metrics._key(name, labels), 0)
+
+    def test_reads_counted(self):
+        """ test if reading an article by id or slug counts a read """
+        self.client.get('/api/articles/single/{}'.format(self.articles[0].pk))
+        self.client.get('/api/articles/article-0')
+        self.client.get('/api/articles/single/999')
+        self.assertEqual(self.view_counts(), [0, 0, 0])
+
+        self.assertEqual(view_counter.flush(), 2)
+        self.assertEqual(self.view_counts(), [2, 0, 0])
+
+    def test_reads_buffered(self):
+        """ test if reads wait in memory and are written in one UPDATE per count """
+        with self.settings(ARTICLES_VIEW_FLUSH_EVENTS=10):
+            for article, views in zip(self.articles, (2, 2, 1)):
+                for _ in range(views):
+                    view_counter.add(article.pk)
+            self.assertEqual(self.view_counts(), [0, 0, 0])
+
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(view_counter.flush(), 5)
+
+        updates = [query for query in queries.captured_queries if query['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 2)
+        self.assertEqual(self.view_counts(), [2, 2, 1])
+        self.assertEqual(self.metric('article_views_flushed_total'), 5)
+        self.assertEqual(self.metric('article_view_flushes_total', result='ok'), 1)
+
+    def test_flush_after_events(self):
+        """ test if the flusher is woken to write reads once enough of them are waiting """
+        flushed = threading.Event()
+        with self.settings(ARTICLES_VIEW_FLUSH_INTERVAL=60, ARTICLES_VIEW_FLUSH_EVENTS=3), \
+                mock.patch.object(view_counter, 'flush', side_effect=lambda: flushed.set()):
+            view_counter.add(self.articles[0].pk)
+            view_counter.add(self.articles[1].pk)
+            self.assertFalse(flushed.wait(0.1))
+            view_counter.add(self.articles[0].pk)
+
+            self.assertTrue(flushed.wait(5))
+            self.assertIsNot(view_counter.flusher, threading.current_thread())
+
+        # reads are left to the test, stop the flusher
+        view_counter.clear()
+        view_counter.wake.set()
+        view_counter.flusher.join(5)
+        self.assertFalse(view_counter.flusher.is_alive())
+        self.assertEqual(self.view_counts(), [0, 0, 0])
+
+    def test_no_flusher(self):
+        """ test if reads are left for explicit flushes when the flusher is turned off """
+        counter = ViewCounter()
+        with self.settings(ARTICLES_VIEW_FLUSH_EVENTS=1):
+            counter.add(self.articles[0].pk)
+
+        self.assertIsNone(counter.flusher)
+        self.assertFalse(counter.flushes_at_exit)
+        self.assertEqual(self.view_counts(), [0, 0, 0])
+
+    def test_failed_flush_kept(self):
+        """ test if reads that fail to be written are kept, up to a limit """
+        with self.settings(ARTICLES_VIEW_FLUSH_EVENTS=10, ARTICLES_VIEW_MAX_PENDING=2):
+            for article in self.articles:
+                view_counter.add(article.pk)
+            with mock.patch.object(QuerySet, 'update', side_effect=DatabaseError):
+                self.assertEqual(view_counter.flush(), 0)
+
+            self.assertEqual(self.metric('article_view_flushes_total', result='failed'), 1)
+            self.assertEqual(self.metric('article_views_dropped_total'), 1)
+            self.assertEqual(view_counter.flush(), 2)
+
+    def test_save_keeps_count(self):
+        """ test if saving an article loaded before reads were written keeps them """
+        article = Article.objects.get(pk=self.articles[0].pk)
+        view_counter.add(article.pk)
+        view_counter.flush()
+
+        article.title = 'renamed'
+        article.save()
+
+        self.assertEqual(self.view_counts(), [1, 0, 0])
+
+    def test_forked_worker(self):
+        """ test if a forked worker does not write its parent's reads """
+        with self.settings(ARTICLES_VIEW_FLUSH_EVENTS=10):
+            view_counter.add(self.articles[0].pk)
+            with mock.patch('os.getpid', return_value=view_counter.pid + 1):
+                view_counter.add(self.articles[1].pk)
+                view_counter.flush()
+
+        self.assertEqual(self.view_counts(), [0, 1, 0])
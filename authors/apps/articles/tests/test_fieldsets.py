@@ -0,0 +1,69 @@
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+
+from authors.apps.authentication.models import User
+from ..models import Article
+
+BODY = '<p>{}</p>'.format(' '.join(['measured words'] * 2000))
+
+
+class TestSparseFieldsets(TestCase):
+    """ tests for choosing list fields and for stored excerpts """
+
+    def setUp(self):
+        self.client = Client()
+        author = User.objects.create_user(
+            'Aurthurs', 'haven.authors@gmail.com', 'jakejake@20AA')
+        for number in range(5):
+            article = Article.objects.create(
+                title='article {}'.format(number), body=BODY, description='description',
+                slug='article-{}'.format(number), published=True, author=author)
+            article.tags.add('lists')
+
+    def get(self, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/articles/all/', params)
+        self.queries = [query['sql'] for query in queries.captured_queries]
+        return response
+
+    def test_summary_computed_on_save(self):
+        """ test if the excerpt, word count and reading time follow the body """
+        article = Article.objects.first()
+
+        self.assertEqual(article.word_count, 4000)
+        self.assertEqual(article.reading_time, 20)
+        self.assertTrue(article.excerpt.startswith('measured words measured'))
+        self.assertLessEqual(len(article.excerpt), 200)
+
+        article.body = 'short'
+        article.save(update_fields=['body'])
+        article.refresh_from_db()
+        self.assertEqual((article.excerpt, article.word_count, article.reading_time), ('short', 1, 1))
+
+    def test_lists_leave_bodies_out(self):
+        """ test if lists neither return nor read article bodies by default """
+        response = self.get()
+        results = response.json()['articles']['results']
+
+        self.assertEqual(len(results), 5)
+        self.assertNotIn('body', results[0])
+        self.assertEqual(results[0]['tags'], ['lists'])
+        self.assertEqual(results[0]['author']['username'], 'Aurthurs')
+        self.assertFalse(any('"body"' in query for query in self.queries))
+        # the existence check, count, page, and tags, whatever the page size
+        self.assertEqual(len(self.queries), 4)
+
+    def test_fields_parameter(self):
+        """ test if `?fields=` picks the fields returned """
+        full = self.get(fields='title,body')
+        self.assertEqual(set(full.json()['articles']['results'][0]), {'title', 'body'})
+
+        teaser = self.get(fields='title,excerpt')
+        self.assertEqual(set(teaser.json()['articles']['results'][0]), {'title', 'excerpt'})
+        self.assertLess(len(teaser.content) * 10, len(full.content))
+
+    def test_unknown_fields(self):
+        """ test if asking for fields articles do not have is an error """
+        response = self.get(fields='title,password')
+        self.assertEqual(response.status_code, 400)
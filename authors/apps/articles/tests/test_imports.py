@@ -0,0 +1,149 @@
+import json
+import os
+import re
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from taggit.models import Tag
+
+from authors.apps.authentication.models import User
+from .. import imports
+from ..imports import import_articles
+from ..models import Article, ArticleRevision
+
+
+def row(number, **fields):
+    article = {
+        'title': 'imported {}'.format(number), 'description': 'description',
+        'body': 'body of article {}'.format(number), 'tags': ['imported']}
+    article.update(fields)
+    return json.dumps(article)
+
+
+class TestImportArticles(TestCase):
+    """ tests for bulk imports of articles from NDJSON """
+
+    def setUp(self):
+        self.client = Client()
+        self.author = User.objects.create_user(
+            'Aurthurs', 'haven.authors@gmail.com', 'jakejake@20AA')
+        self.other = User.objects.create_user(
+            'other', 'other@example.com', 'jakejake@20AA')
+
+    def post(self, lines, user=None):
+        return self.client.post(
+            '/api/articles/import', '\n'.join(lines) + '\n',
+            content_type='application/x-ndjson',
+            HTTP_AUTHORIZATION='Token ' + (user or self.author).token)
+
+    def test_imports_valid_rows(self):
+        """ test if valid rows are imported and bad lines reported """
+        lines = [row(number) for number in range(5)]
+        lines[1] = '{not json'
+        lines[3] = json.dumps({'title': 'no body'})
+        response = self.post(lines)
+
+        self.assertEqual(response.status_code, 200)
+        report = response.json()
+        self.assertEqual((report['created'], report['failed']), (3, 2))
+        self.assertEqual([error['line'] for error in report['errors']], [2, 4])
+        self.assertIn('body', report['errors'][1]['errors'])
+
+        article = Article.objects.get(title='imported 4')
+        self.assertEqual(article.author, self.author)
+        self.assertTrue(article.slug.startswith('imported-4-'))
+        self.assertEqual(article.word_count, 4)
+        self.assertEqual(list(article.tags.names()), ['imported'])
+        self.assertEqual(ArticleRevision.objects.filter(article=article).count(), 1)
+
+    def test_chunked_queries(self):
+        """ test if a chunk is written with the same queries whatever its size """
+        ContentType.objects.get_for_model(Article)
+        with CaptureQueriesContext(connection) as small:
+            import_articles([row(number) for number in range(5)], self.author)
+        with CaptureQueriesContext(connection) as large:
+            import_articles([row(number, tags=['more']) for number in range(5, 50)], self.author)
+
+        self.assertEqual(len(small), len(large))
+        self.assertEqual(Article.objects.count(), 50)
+        self.assertEqual(Tag.objects.count(), 2)
+
+    def test_large_chunk(self):
+        """ test if a chunk of more rows than SQLite binds in a query is looked up in batches """
+        lines = [row(number, tags=['tag {}'.format(number)]) for number in range(1200)]
+        with CaptureQueriesContext(connection) as queries:
+            report = import_articles(lines, self.author, chunk_size=1200)
+
+        self.assertEqual((report.created, report.errors), (1200, []))
+        self.assertEqual(Tag.objects.count(), 1200)
+        for query in queries.captured_queries:
+            for values in re.findall(r' IN \(([^)]*)\)', query['sql']):
+                self.assertLessEqual(values.count(',') + 1, 999)
+
+    def test_provided_slugs(self):
+        """ test if given slugs are kept, and taken ones rejected """
+        report = import_articles(
+            [row(1, slug='kept-slug'), row(2, slug='kept-slug')], self.author)
+
+        self.assertEqual(report.created, 1)
+        self.assertEqual(report.errors[0]['line'], 2)
+        self.assertTrue(Article.objects.filter(slug='kept-slug').exists())
+
+        report = import_articles([row(3, slug='kept-slug'), row(4, slug='trending')], self.author)
+        self.assertEqual((report.created, len(report.errors)), (0, 2))
+
+    def test_slug_taken_meanwhile(self):
+        """ test if a slug taken after it was checked fails its row, not the import """
+        def check_then_take(rows, report):
+            rows = with_slugs(rows, report)
+            Article.objects.create(
+                title='raced', body='body', description='description',
+                slug='kept-slug', author=self.other)
+            return rows
+
+        with_slugs = imports._with_slugs
+        with mock.patch.object(imports, '_with_slugs', side_effect=check_then_take):
+            report = import_articles([row(1, slug='kept-slug'), row(2)], self.author)
+
+        self.assertEqual(report.created, 1)
+        self.assertEqual([error['line'] for error in report.errors], [1])
+        self.assertEqual(Article.objects.get(slug='kept-slug').author, self.other)
+        self.assertTrue(Article.objects.filter(title='imported 2').exists())
+
+    def test_other_authors(self):
+        """ test if only staff may import articles for other authors """
+        response = self.post([row(1, author='other')])
+        self.assertEqual(response.json()['failed'], 1)
+
+        self.author.is_staff = True
+        self.author.save()
+        response = self.post([row(1, author='other'), row(2, author='nobody')])
+
+        self.assertEqual((response.json()['created'], response.json()['failed']), (1, 1))
+        self.assertEqual(Article.objects.get().author, self.other)
+
+    def test_requires_login(self):
+        """ test if anonymous users cannot import articles """
+        response = self.client.post(
+            '/api/articles/import', row(1), content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, 401)
+
+    def test_command(self):
+        """ test if the management command imports a file """
+        handle, path = tempfile.mkstemp(suffix='.ndjson')
+        with os.fdopen(handle, 'w') as source:
+            source.write('\n'.join([row(1), row(2, author='other'), '[]']))
+        self.addCleanup(os.remove, path)
+        output, errors = StringIO(), StringIO()
+
+        call_command('import_articles', path, '--author=Aurthurs', stdout=output, stderr=errors)
+
+        self.assertIn('Imported 2 articles', output.getvalue())
+        self.assertIn('line 3', errors.getvalue())
+        self.assertEqual(Article.objects.filter(author=self.other).count(), 1)
@@ -0,0 +1,104 @@
+import json
+
+from django.core.cache import cache
+from django.test import Client, TestCase
+
+from authors.apps.authentication.models import User
+from ..exceptions import ArticleVersionConflict
+from ..models import Article, ArticleSlug
+
+
+class TestPatchArticle(TestCase):
+    """ tests for partial, versioned article edits """
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.author = self.create_user('Aurthurs', 'haven.authors@gmail.com')
+        self.article = Article.objects.create(
+            title='draft', body='body', description='description',
+            slug='draft-1a2b', author=self.author)
+
+    def create_user(self, username, email):
+        user = User.objects.create_user(username, email, 'jakejake@20AA')
+        user.is_verified = True
+        user.save()
+        return user
+
+    def patch(self, user=None, **article):
+        return self.client.patch(
+            '/api/articles/{}'.format(self.article.pk), json.dumps({"article": article}),
+            content_type='application/json',
+            HTTP_AUTHORIZATION='Token ' + (user or self.author).token)
+
+    def test_writes_changed_columns(self):
+        """ test if an edit writes only the columns it changes, and bumps the version """
+        response = self.patch(body='a new body', title='draft', version=1)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['article']['version'], 2)
+        self.article.refresh_from_db()
+        self.assertEqual((self.article.body, self.article.slug), ('a new body', 'draft-1a2b'))
+
+    def test_unchanged_is_not_written(self):
+        """ test if an edit that changes nothing is not saved """
+        response = self.patch(body='body', description='description', version=1)
+
+        self.assertEqual(response.status_code, 200)
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.version, 1)
+
+    def test_stale_version_conflicts(self):
+        """ test if an edit from an older version is rejected """
+        self.assertEqual(self.patch(body='first edit', version=1).status_code, 200)
+
+        response = self.patch(body='second edit', version=1)
+
+        self.assertEqual(response.status_code, 409)
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.body, 'first edit')
+
+    def test_stale_save_conflicts(self):
+        """ test if saving an article saved by someone else since it was loaded fails """
+        first, second = Article.objects.get(pk=self.article.pk), Article.objects.get(pk=self.article.pk)
+        first.body = 'first edit'
+        first.save()
+
+        second.body = 'second edit'
+        with self.assertRaises(ArticleVersionConflict):
+            second.save()
+
+        self.assertEqual(second.version, 1)
+        self.article.refresh_from_db()
+        self.assertEqual((self.article.body, self.article.version), ('first edit', 2))
+
+    def test_put_checks_version(self):
+        """ test if a full edit from an older version is rejected too """
+        def put(**article):
+            article.update(title='draft', description='description', published=False)
+            return self.client.put(
+                '/api/articles/{}'.format(self.article.pk), json.dumps({"article": article}),
+                content_type='application/json', HTTP_AUTHORIZATION='Token ' + self.author.token)
+
+        self.assertEqual(self.patch(body='first edit', version=1).status_code, 200)
+
+        self.assertEqual(put(body='second edit', version=1).status_code, 409)
+        self.assertEqual(put(body='second edit', version=2).status_code, 201)
+        self.article.refresh_from_db()
+        self.assertEqual((self.article.body, self.article.version), ('second edit', 3))
+
+    def test_new_title_gets_new_slug(self):
+        """ test if a new title gives a new slug and keeps the old one """
+        response = self.patch(title='final title', version=1)
+
+        self.assertTrue(response.json()['article']['slug'].startswith('final-title-'))
+        self.assertTrue(ArticleSlug.objects.filter(slug='draft-1a2b').exists())
+
+    def test_version_required(self):
+        """ test if an edit must say which version it was made from """
+        self.assertEqual(self.patch(body='a new body').status_code, 400)
+
+    def test_only_author(self):
+        """ test if only the author of an article may edit it """
+        reader = self.create_user('reader', 'reader@example.com')
+        self.assertEqual(self.patch(reader, body='mine now', version=1).status_code, 403)
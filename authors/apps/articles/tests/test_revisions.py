@@ -0,0 +1,105 @@
+from unittest import mock
+
+from django.db import IntegrityError
+from django.test import Client, TestCase, override_settings
+
+from authors.apps.authentication.models import User
+from ..exceptions import ArticleVersionConflict
+from ..models import Article, ArticleRevision
+from ..revisions import diff, get_revision, patch
+
+BODY = ' '.join('word{}'.format(number) for number in range(2000))
+
+
+class TestRevisions(TestCase):
+    """ tests for the delta compressed history of articles """
+
+    def setUp(self):
+        self.client = Client()
+        self.author = User.objects.create_user(
+            'Aurthurs', 'haven.authors@gmail.com', 'jakejake@20AA')
+        self.article = Article.objects.create(
+            title='history', body=BODY, description='description',
+            slug='history-1a2b', author=self.author)
+
+    def edit(self, **fields):
+        for field, value in fields.items():
+            setattr(self.article, field, value)
+        self.article.save()
+        return self.article.version
+
+    def test_recorded_with_the_article(self):
+        """ test if an article and its revision are written together, or not at all """
+        stale = Article.objects.get(pk=self.article.pk)
+        version = self.edit(title='first edit')
+        stale.title = 'second edit'
+        with self.assertRaises(ArticleVersionConflict):
+            stale.save()
+
+        with mock.patch.object(ArticleRevision.objects, 'create', side_effect=IntegrityError):
+            with self.assertRaises(IntegrityError):
+                self.edit(title='third edit')
+        self.assertEqual(self.article.version, version)
+
+        self.assertEqual(
+            list(Article.objects.values_list('title', 'version')), [('first edit', version)])
+        self.assertEqual(
+            list(ArticleRevision.objects.order_by('version').values_list('version', flat=True)), [1, version])
+
+    def test_diff_and_patch(self):
+        """ test if patching with a diff gives back the new text """
+        old = {'title': 'a title', 'description': '', 'body': 'one two  three\nfour'}
+        new = {'title': 'a title', 'description': 'added', 'body': 'one 2 three\nfour five'}
+
+        changes = diff(old, new)
+
+        self.assertNotIn('title', changes)
+        self.assertEqual(patch(old, changes), new)
+
+    def test_rebuilds_every_version(self):
+        """ test if any version is rebuilt from snapshots and changes """
+        texts = {self.article.version: BODY}
+        with override_settings(ARTICLE_REVISION_SNAPSHOT_INTERVAL=3):
+            for number in range(7):
+                body = texts[self.article.version].replace(
+                    'word{} '.format(number * 10), 'edit{} '.format(number))
+                texts[self.edit(body=body)] = body
+
+        for version, body in texts.items():
+            self.assertEqual(get_revision(self.article.pk, version)['body'], body)
+        snapshots = ArticleRevision.objects.filter(snapshot=True).count()
+        self.assertEqual(snapshots, 3)
+
+    def test_storage_follows_edits(self):
+        """ test if small edits are stored as small changes, and no text change stores nothing """
+        self.edit(body=BODY + ' one more word')
+        self.edit(published=True)
+
+        revisions = ArticleRevision.objects.order_by('version')
+        self.assertEqual(revisions.count(), 2)
+        snapshot, change = revisions
+        self.assertTrue(snapshot.snapshot)
+        self.assertFalse(change.snapshot)
+        self.assertLess(len(change.data), 100)
+
+    def test_endpoints(self):
+        """ test if the author can list revisions and read one """
+        version = self.edit(title='new history')
+        headers = {'HTTP_AUTHORIZATION': 'Token ' + self.author.token}
+        path = '/api/articles/{}/revisions/'.format(self.article.pk)
+
+        response = self.client.get(path, **headers)
+        self.assertEqual(
+            [revision['version'] for revision in response.json()['revisions']], [1, version])
+
+        response = self.client.get(path + '1', **headers)
+        self.assertEqual(response.json()['revision']['title'], 'history')
+        self.assertEqual(self.client.get(path + '99', **headers).status_code, 404)
+
+    def test_only_author(self):
+        """ test if other users cannot read an article's history """
+        reader = User.objects.create_user('reader', 'reader@example.com', 'jakejake@20AA')
+        response = self.client.get(
+            '/api/articles/{}/revisions/'.format(self.article.pk),
+            HTTP_AUTHORIZATION='Token ' + reader.token)
+        self.assertEqual(response.status_code, 403)
@@ -0,0 +1,127 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.utils import timezone
+
+from authors.apps.authentication.models import User
+from ..counters import view_counter
+from ..models import (
+    Article, ArticleDailyStats, ArticleFavourites, ArticleLikes, ChildComment, Comments, Rating)
+from ..rollups import add_stats, roll_up
+
+
+class TestEngagementRollups(TestCase):
+    """ tests for daily engagement rollups and the analytics read from them """
+
+    def setUp(self):
+        view_counter.clear()
+        self.addCleanup(view_counter.clear)
+        self.client = Client()
+        self.author = User.objects.create_user(
+            'Aurthurs', 'haven.authors@gmail.com', 'jakejake@20AA')
+        self.readers = [
+            User.objects.create_user('reader{}'.format(number), 'reader{}@example.com'.format(number),
+                                     'jakejake@20AA')
+            for number in range(2)]
+        self.article = Article.objects.create(
+            title='article', body='body', description='description',
+            slug='article', published=True, author=self.author)
+
+    def engage(self):
+        first, second = self.readers
+        ArticleLikes.objects.create(article=self.article, author=first, article_like=True)
+        ArticleLikes.objects.create(article=self.article, author=second, article_like=False)
+        ArticleFavourites.objects.create(article=self.article, author=first, article_favourite=True)
+        Rating.objects.create(article_id=self.article, author=first, rating=5)
+        Rating.objects.create(article_id=self.article, author=second, rating=2)
+        comment = Comments.objects.create(article_id=self.article, author=first, body='nice')
+        ChildComment.objects.create(
+            article_id=self.article, parent_id=comment, author=second, body='agreed')
+
+    def later(self):
+        # past the lag left for events still being committed
+        return timezone.now() + timedelta(seconds=120)
+
+    def test_rollup(self):
+        """ test if events are added up by article and day """
+        self.engage()
+
+        self.assertEqual(roll_up(self.later()), 1)
+
+        stats = ArticleDailyStats.objects.get(article=self.article, day=timezone.localdate())
+        self.assertEqual(
+            (stats.likes, stats.dislikes, stats.favourites, stats.ratings, stats.rating_sum, stats.comments),
+            (1, 1, 1, 2, 7, 2))
+
+    def test_watermark(self):
+        """ test if each event is added up once, and recent ones are left for later """
+        self.engage()
+        self.assertEqual(roll_up(timezone.now()), 0)
+        self.assertFalse(ArticleDailyStats.objects.exists())
+
+        with self.settings(ARTICLES_ROLLUP_LAG=0):
+            roll_up()
+            Comments.objects.create(article_id=self.article, author=self.author, body='thanks')
+            roll_up()
+
+        stats = ArticleDailyStats.objects.get()
+        self.assertEqual((stats.likes, stats.comments), (1, 3))
+
+    def test_reads_rolled_up(self):
+        """ test if reads are added to the day's stats as they are written """
+        view_counter.add(self.article.pk, 3)
+        view_counter.flush()
+        view_counter.add(self.article.pk, 2)
+        view_counter.flush()
+
+        self.assertEqual(ArticleDailyStats.objects.get().views, 5)
+
+    def test_row_created_meanwhile(self):
+        """ test if stats are added to a row another process created after the lookup """
+        today = timezone.localdate()
+        ArticleDailyStats.objects.create(article=self.article, day=today, views=2)
+        # the row is missed by the lookup, as if it was created right after it
+        lookups = [ArticleDailyStats.objects.none()]
+        real_filter = ArticleDailyStats.objects.filter
+
+        def filter(*args, **kwargs):
+            return lookups.pop() if lookups else real_filter(*args, **kwargs)
+
+        with mock.patch.object(ArticleDailyStats.objects, 'filter', side_effect=filter):
+            add_stats({(self.article.pk, today): {'views': 3, 'likes': 1}})
+
+        stats = ArticleDailyStats.objects.get()
+        self.assertEqual((stats.views, stats.likes), (5, 1))
+
+    def test_analytics(self):
+        """ test if authors read their article's days from the rollups """
+        self.engage()
+        call_command('rollup_engagement', stdout=StringIO())
+        roll_up(self.later())
+        today = timezone.localdate()
+
+        with self.assertNumQueries(3):
+            response = self.client.get(
+                '/api/articles/{}/analytics'.format(self.article.pk),
+                {'from': str(today - timedelta(days=6))},
+                HTTP_AUTHORIZATION='Token ' + self.author.token)
+
+        analytics = response.json()['analytics']
+        self.assertEqual(len(analytics['days']), 7)
+        self.assertEqual(analytics['days'][-1]['likes'], 1)
+        self.assertEqual(analytics['days'][0]['likes'], 0)
+        self.assertEqual(analytics['totals']['rating_average'], 3.5)
+        self.assertEqual(analytics['totals']['comments'], 2)
+
+    def test_analytics_errors(self):
+        """ test if only the author reads analytics, over a valid range """
+        url = '/api/articles/{}/analytics'.format(self.article.pk)
+        response = self.client.get(url, HTTP_AUTHORIZATION='Token ' + self.readers[0].token)
+        self.assertEqual(response.status_code, 403)
+
+        for params in ({'from': 'yesterday'}, {'from': '2018-02-30'}, {'from': '2018-01-02', 'to': '2018-01-01'}):
+            response = self.client.get(url, params, HTTP_AUTHORIZATION='Token ' + self.author.token)
+            self.assertEqual(response.status_code, 400)
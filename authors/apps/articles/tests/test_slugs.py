@@ -0,0 +1,80 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+
+from authors.apps.authentication.models import User
+from ..counters import view_counter
+from ..models import Article, ArticleSlug
+
+
+class TestArticleSlugs(TestCase):
+    """ tests for fetching articles by their current and previous slugs """
+
+    def setUp(self):
+        cache.clear()
+        # reads of articles are counted, and left to other tests otherwise
+        self.addCleanup(view_counter.clear)
+        self.client = Client()
+        self.user = User.objects.create_user(
+            'Aurthurs', 'haven.authors@gmail.com', 'jakejake@20AA')
+        self.article = Article.objects.create(
+            title='first title', body='body', description='description',
+            slug='first-title-1a2b', published=True, author=self.user)
+
+    def rename(self, slug):
+        self.article.slug = slug
+        self.article.save()
+
+    def test_fetch_by_slug(self):
+        """ test if a published article is found by its slug, cached """
+        response = self.client.get('/api/articles/first-title-1a2b')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['articles']['id'], self.article.pk)
+        self.assertEqual(
+            response['Link'], '<http://testserver/api/articles/first-title-1a2b>; rel="canonical"')
+        self.assertIn('public', response['Cache-Control'])
+
+        with self.assertNumQueries(0):
+            self.client.get('/api/articles/first-title-1a2b')
+
+    def test_previous_slug_redirects(self):
+        """ test if a slug the article had before is permanently redirected """
+        self.client.get('/api/articles/first-title-1a2b')
+        self.rename('second-title-3c4d')
+
+        response = self.client.get('/api/articles/first-title-1a2b')
+        self.assertEqual(response.status_code, 301)
+        self.assertEqual(response['Location'], 'http://testserver/api/articles/second-title-3c4d')
+        self.assertEqual(self.client.get(response['Location']).status_code, 200)
+
+    def test_slug_given_back(self):
+        """ test if an article renamed back to a previous slug serves it again """
+        self.rename('second-title-3c4d')
+        self.rename('first-title-1a2b')
+
+        self.assertEqual(
+            self.client.get('/api/articles/first-title-1a2b').status_code, 200)
+        self.assertEqual(
+            list(ArticleSlug.objects.values_list('slug', flat=True)), ['second-title-3c4d'])
+
+    def test_unknown_or_unpublished(self):
+        """ test if unknown slugs and unpublished articles are not found """
+        self.assertEqual(self.client.get('/api/articles/no-such-slug').status_code, 404)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get('/api/articles/no-such-slug').status_code, 404)
+
+        self.article.published = False
+        self.article.save()
+        self.assertEqual(self.client.get('/api/articles/first-title-1a2b').status_code, 404)
+
+    def test_other_routes_unchanged(self):
+        """ test if routes that look like slugs still reach their own views """
+        self.assertEqual(self.client.get('/api/articles/search?title=first').status_code, 200)
+        for route in ('all', 'me'):
+            response = self.client.get('/api/articles/{}'.format(route))
+            self.assertEqual(response.status_code, 301)
+            self.assertEqual(response['Location'], '/api/articles/{}/'.format(route))
+
+    def test_slug_starting_with_route(self):
+        """ test if slugs that only start with the word of a route are still slugs """
+        self.rename('all-about-it')
+        self.assertEqual(self.client.get('/api/articles/all-about-it').status_code, 200)
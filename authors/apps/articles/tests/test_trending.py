@@ -0,0 +1,104 @@
+import json
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.utils import timezone
+
+from authors.apps.authentication.models import User
+from ..models import (
+    Article, ArticleFavourites, ArticleLikes, ArticleScore, Comments, Rating, TrendingArticle)
+from ..trending import refresh_trending
+
+
+class TestTrendingArticles(TestCase):
+    """ tests for article scores and the rankings built from them """
+
+    def setUp(self):
+        self.client = Client()
+        self.author = User.objects.create_user(
+            'Aurthurs', 'haven.authors@gmail.com', 'jakejake@20AA')
+        self.reader = User.objects.create_user(
+            'reader', 'reader@example.com', 'jakejake@20AA')
+        self.articles = []
+        for number in range(3):
+            article = Article.objects.create(
+                title='article {}'.format(number), body='body', description='description',
+                slug='article-{}'.format(number), published=True, author=self.author)
+            article.tags.add('even' if number % 2 == 0 else 'odd')
+            self.articles.append(article)
+
+    def score(self, article):
+        return ArticleScore.objects.get(article=article).score
+
+    def test_events_score_articles(self):
+        """ test if likes, favourites, ratings and comments add to scores as they happen """
+        article = self.articles[0]
+        ArticleLikes.objects.create(article=article, author=self.reader, article_like=True)
+        ArticleFavourites.objects.create(article=article, author=self.reader, article_favourite=True)
+        Rating.objects.create(article_id=article, author=self.reader, rating='5')
+        comment = Comments.objects.create(article_id=article, author=self.reader, body='nice')
+
+        self.assertAlmostEqual(self.score(article), 1 + 2 + 1 + 1, places=3)
+
+        comment.delete()
+        self.assertAlmostEqual(self.score(article), 4, places=3)
+
+    def test_like_becomes_dislike(self):
+        """ test if changing a like to a dislike takes the like back """
+        article = self.articles[0]
+        ArticleLikes.objects.create(article=article, author=self.reader, article_like=True)
+
+        response = self.client.put(
+            '/api/articles/{}/likes/'.format(article.pk),
+            json.dumps({'article': {'article_like': False}}), content_type='application/json',
+            HTTP_AUTHORIZATION='Token ' + self.reader.token)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertAlmostEqual(self.score(article), -1, places=3)
+
+    def test_scores_decay(self):
+        """ test if points halve every half-life """
+        with self.settings(ARTICLES_TRENDING_HALF_LIFE=1):
+            ArticleScore.objects.create(
+                article=self.articles[0], score=8, scored_at=timezone.now() - timedelta(hours=2))
+            ArticleLikes.objects.create(
+                article=self.articles[0], author=self.reader, article_like=True)
+
+        self.assertAlmostEqual(self.score(self.articles[0]), 2 + 1, places=3)
+
+    def test_rankings(self):
+        """ test if rankings order articles by decayed score, overall and by tag """
+        now = timezone.now()
+        for article, score, hours in zip(self.articles, (10, 4, 16), (0, 0, 48)):
+            ArticleScore.objects.create(
+                article=article, score=score, scored_at=now - timedelta(hours=hours))
+
+        self.assertEqual(refresh_trending(now=now), 3)
+        ranking = TrendingArticle.objects.filter(tag='').order_by('rank')
+        self.assertEqual([row.article for row in ranking], [self.articles[0], self.articles[2], self.articles[1]])
+        self.assertEqual(TrendingArticle.objects.filter(tag='odd').count(), 1)
+
+    def test_trending_endpoint(self):
+        """ test if the endpoint lists the last rankings built """
+        ArticleLikes.objects.create(article=self.articles[1], author=self.reader, article_like=True)
+        ArticleFavourites.objects.create(article=self.articles[2], author=self.reader, article_favourite=True)
+        out = StringIO()
+        call_command('refresh_trending', stdout=out)
+        self.assertIn('Ranked 2', out.getvalue())
+
+        response = self.client.get('/api/articles/trending')
+        titles = [article['title'] for article in response.json()['articles']['results']]
+        self.assertEqual(titles, ['article 2', 'article 1'])
+
+        response = self.client.get('/api/articles/trending', {'tag': 'odd', 'fields': 'slug'})
+        self.assertEqual(response.json()['articles']['results'], [{'slug': 'article-1'}])
+
+    def test_old_scores_dropped(self):
+        """ test if scores left unchanged for long are removed when ranking """
+        ArticleScore.objects.create(
+            article=self.articles[0], score=100, scored_at=timezone.now() - timedelta(days=30))
+
+        self.assertEqual(refresh_trending(), 0)
+        self.assertFalse(ArticleScore.objects.exists())
@@ -1,5 +1,6 @@
 from django.test import Client
 from django.test import TestCase
+from ...articles.counters import view_counter
 from ...articles.models import Article
 from authors.apps.authentication.models import User
 from ...notifications.models import Notifications
@@ -291,7 +292,8 @@ class BaseTest(TestCase):
             "/api/profiles/{}/follow/".format("Aurthurs"), **headers, content_type='application/json')
 
     def tearDown(self):
-        pass
+        # reads of articles are counted, and left to other tests otherwise
+        view_counter.clear()
 
 
 class TestArticles(BaseTest):
@@ -0,0 +1,114 @@
+"""
+Trending articles.
+
+Every like, dislike, favourite, rating and comment adds points to its
+article's score as it happens, and points halve every
+`ARTICLES_TRENDING_HALF_LIFE` hours. A score is only decayed when it is
+next changed, so it is stored with the time it was last changed.
+
+`refresh_trending`, run periodically by `manage.py refresh_trending`,
+decays every score to the same moment and stores the top articles overall
+and for each tag, which is all the trending endpoint reads.
+"""
+import heapq
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Article, ArticleScore, TrendingArticle
+
+# scores left unchanged for this many half-lives are worth under a
+# thousandth of what they were, and are dropped
+HORIZON = 10
+
+DEFAULT_WEIGHTS = {'like': 1, 'dislike': -1, 'favourite': 2, 'comment': 1, 'rating': 0.5}
+
+
+def half_life():
+    return timedelta(hours=getattr(settings, 'ARTICLES_TRENDING_HALF_LIFE', 24))
+
+
+def weight(event):
+    return getattr(settings, 'ARTICLES_TRENDING_WEIGHTS', DEFAULT_WEIGHTS).get(event, 0)
+
+
+def decay(score, since, now):
+    """ what `score` as of `since` is worth at `now` """
+    return score * 0.5 ** ((now - since) / half_life())
+
+
+def like_points(article_like):
+    if article_like is None:
+        return 0
+    return weight('like' if article_like else 'dislike')
+
+
+def rating_points(rating):
+    # three stars is neutral, more or fewer count for or against the article
+    return weight('rating') * (int(rating) - 3)
+
+
+def adjust_score(article_id, points, earned_at=None, create=True):
+    """ add `points` earned at `earned_at` (now by default) to an article's score
+
+    Points are taken back by adding them negated with the time they were
+    earned, only what is left of them is taken. With `create` false an
+    article without a score is left alone, as when it is being deleted.
+    """
+    now = timezone.now()
+    if earned_at is not None:
+        points = decay(points, earned_at, now)
+    if not points:
+        return
+
+    with transaction.atomic():
+        scores = ArticleScore.objects.select_for_update()
+        if create:
+            score, created = scores.get_or_create(
+                article_id=article_id, defaults={'scored_at': now})
+        else:
+            score = scores.filter(article_id=article_id).first()
+            if score is None:
+                return
+        score.score = decay(score.score, score.scored_at, now) + points
+        score.scored_at = now
+        score.save(update_fields=['score', 'scored_at'])
+
+
+def refresh_trending(size=None, now=None):
+    """ rebuild the rankings of trending articles, returning how many were ranked """
+    now = now or timezone.now()
+    size = size or getattr(settings, 'ARTICLES_TRENDING_SIZE', 100)
+    ArticleScore.objects.filter(scored_at__lt=now - half_life() * HORIZON).delete()
+
+    scores = ArticleScore.objects.filter(article__published=True)
+    current = {}
+    for article_id, score, scored_at in scores.values_list('article_id', 'score', 'scored_at'):
+        score = decay(score, scored_at, now)
+        if score > 0:
+            current[article_id] = score
+
+    rankings = defaultdict(list)
+    rankings[''] = list(current)
+    tagged = Article.tags.through.objects.filter(
+        content_type=ContentType.objects.get_for_model(Article),
+        object_id__in=scores.values('article_id'))
+    for article_id, tag in tagged.values_list('object_id', 'tag__name'):
+        if article_id in current:
+            rankings[tag].append(article_id)
+
+    ranked = []
+    for tag, article_ids in rankings.items():
+        top = heapq.nlargest(size, article_ids, key=lambda article_id: (current[article_id], article_id))
+        ranked.extend(
+            TrendingArticle(tag=tag, rank=rank, article_id=article_id, score=current[article_id])
+            for rank, article_id in enumerate(top, 1))
+
+    with transaction.atomic():
+        TrendingArticle.objects.all().delete()
+        TrendingArticle.objects.bulk_create(ranked)
+    return len(current)
@@ -1,11 +1,16 @@
-from django.urls import path
+from django.urls import path, register_converter
 
+from .converters import ArticleSlugConverter
 from .views import (
     CreateArticleAPIView, RateArticleAPIView, CommentArticleAPIView,
     LikeArticleAPIView, FavouriteArticleAPIView, ListAuthArticlesAPIView,
-    ListArticlesAPIView, ArticlesSearchFeed, ListArticleAPIView
+    ListArticlesAPIView, ArticlesSearchFeed, ListArticleAPIView,
+    CommentRepliesAPIView, ArticleBySlugAPIView, ArticleRevisionsAPIView,
+    ImportArticlesAPIView, TrendingArticlesAPIView, ArticleAnalyticsAPIView
 )
 
+register_converter(ArticleSlugConverter, 'article_slug')
+
 urlpatterns = [
     path('articles/', CreateArticleAPIView.as_view()),
     path('articles/<int:article_id>', CreateArticleAPIView.as_view()),
@@ -13,6 +18,8 @@ urlpatterns = [
     path('articles/all/', ListArticlesAPIView.as_view()),
     path('articles/single/<int:article_id>', ListArticleAPIView.as_view()),
     path('articles/<int:article_id>/comment/', CommentArticleAPIView.as_view()),
+    path('articles/<int:article_id>/comment/<int:parent_id>/replies/',
+         CommentRepliesAPIView.as_view()),
     path('articles/<int:article_id>/rating/', RateArticleAPIView.as_view()),
     path('articles/<int:article_id>/favourite/',
          FavouriteArticleAPIView.as_view()),
@@ -21,5 +28,14 @@ urlpatterns = [
     path('articles/<int:article_id>/favourite/',
          FavouriteArticleAPIView.as_view()),
 
-    path('articles/search', ArticlesSearchFeed.as_view())
+    path('articles/search', ArticlesSearchFeed.as_view()),
+    path('articles/import', ImportArticlesAPIView.as_view()),
+    path('articles/trending', TrendingArticlesAPIView.as_view()),
+    path('articles/<int:article_id>/revisions/', ArticleRevisionsAPIView.as_view()),
+    path('articles/<int:article_id>/revisions/<int:version>',
+         ArticleRevisionsAPIView.as_view()),
+    path('articles/<int:article_id>/analytics', ArticleAnalyticsAPIView.as_view()),
+
+    # last, so that the routes above are never taken for slugs
+    path('articles/<article_slug:slug>', ArticleBySlugAPIView.as_view()),
 ]
@@ -3,21 +3,32 @@ from rest_framework.generics import (RetrieveAPIView,
                                      RetrieveUpdateAPIView, CreateAPIView,
                                      RetrieveUpdateDestroyAPIView, ListAPIView
                                      )
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAuthenticated, IsAuthenticatedOrReadOnly
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from django.conf import settings
+from django.http import HttpResponsePermanentRedirect
 from django.template.defaultfilters import slugify
+from django.utils import timezone
+from django.utils.dateparse import parse_date
 import uuid
+from datetime import timedelta
 from ..authentication.backends import JWTAuthentication
 from ..authentication.models import User
 from .exceptions import NoResultsMatch
 from . models import Rating as DbRating, Article, Comments as DbComments, ChildComment as DbChildComment
 
+from .cache import get_published_article, resolve_slug
+from .counters import count_view
 from .exceptions import ArticlesNotExist
+from .fieldsets import SparseFieldsetMixin, apply_fieldset
+from .imports import import_articles
+from .revisions import get_revision, list_revisions
+from .rollups import daily_stats
 from .renderers import (
     ArticlesJSONRenderer, CommentJSONRenderer, RatingJSONRenderer,
-    ListArticlesJSONRenderer
+    ListArticlesJSONRenderer, ListCommentsJSONRenderer
 )
 
 from .serializers import (
@@ -25,7 +36,9 @@ from .serializers import (
     CommentArticleAPIViewSerializer, ChildCommentSerializer,
     LikeArticleAPIViewSerializer, FavouriteArticleAPIViewSerializer,
     UpdateArticleAPIViewSerializer, UpdateCommentAPIViewSerializer,
-    UpdateChildCommentAPIViewSerializer
+    PatchArticleAPIViewSerializer,
+    UpdateChildCommentAPIViewSerializer, CommentReplySerializer,
+    CommentThreadSerializer
 )
 import re
 
@@ -98,13 +111,12 @@ class CreateArticleAPIView(RetrieveUpdateAPIView):
         serializer = serializer_class(data=article)
         serializer.is_valid(raise_exception=True)
 
-        # create an instance of user model class from user id
-        # gotten from the token paresd to the route token
-        article["author"] = User.objects.get(pk=user_data[1])
+        # the user the token was decoded to is the article's author
+        article["author"] = user_data[0]
 
         # call the update_article class method in serializers
         # this updates the article content but also does a couple of validations
-        serializer.update_article(article_id, article, user_data[1])
+        serializer.update_article(article_id, article, user_data[0])
 
         # create a data variable that contains all data to be sent back on success
         data = serializer.data
@@ -112,6 +124,28 @@ class CreateArticleAPIView(RetrieveUpdateAPIView):
 
         return Response(data, status=status.HTTP_201_CREATED)
 
+    def patch(self, request, article_id):
+        """
+        This class method is used to edit part of a users article, from the
+        version of it the user last fetched
+        """
+        article = request.data.get('article', {})
+        user_data = JWTAuthentication().authenticate(request)
+
+        serializer = PatchArticleAPIViewSerializer(data=article, partial=True)
+        serializer.is_valid(raise_exception=True)
+        if 'version' not in serializer.validated_data:
+            raise exceptions.ValidationError(
+                {"version": ["The version of the article being edited is required."]})
+
+        instance, saved = serializer.patch_article(article_id, user_data[0])
+
+        data = self.serializer_class(instance).data
+        data["message"] = "Article updated successfully." if saved else \
+            "Article is unchanged."
+
+        return Response(data, status=status.HTTP_200_OK)
+
     def get(self, request, article_id):
         """
         This class method is used to fetch a users article by id
@@ -149,7 +183,7 @@ class CreateArticleAPIView(RetrieveUpdateAPIView):
         return Response({"message": "article was deleted successully"}, status=status.HTTP_200_OK)
 
 
-class ListAuthArticlesAPIView(ListAPIView):
+class ListAuthArticlesAPIView(SparseFieldsetMixin, ListAPIView):
 
     permission_classes = (IsAuthenticated,)
     renderer_classes = (ListArticlesJSONRenderer,)
@@ -159,12 +193,12 @@ class ListAuthArticlesAPIView(ListAPIView):
 
         user_data = JWTAuthentication().authenticate(self.request)
         articles = Article.objects.filter(author=user_data[0].id,)
-        if len(articles) == 0:
+        if not articles.exists():
             raise ArticlesNotExist
-        return articles
+        return apply_fieldset(articles, self.get_fieldset())
 
 
-class ListArticlesAPIView(ListAPIView):
+class ListArticlesAPIView(SparseFieldsetMixin, ListAPIView):
 
     permission_classes = (AllowAny,)
     renderer_classes = (ListArticlesJSONRenderer,)
@@ -174,9 +208,9 @@ class ListArticlesAPIView(ListAPIView):
 
         articles = Article.objects.filter(published=True)
 
-        if len(articles) == 0:
+        if not articles.exists():
             raise ArticlesNotExist
-        return articles
+        return apply_fieldset(articles, self.get_fieldset())
 
 
 class ListArticleAPIView(RetrieveAPIView):
@@ -187,17 +221,141 @@ class ListArticleAPIView(RetrieveAPIView):
 
     def get(self, request, article_id):
 
-        # create an instance of article model class from article id
-        # gotten from the url paresd.
+        # published articles are cached until they or their author change
         try:
-            article = Article.objects.get(pk=article_id, published=True)
+            data = get_published_article(article_id)
         except Article.DoesNotExist:
             return Response({"error": "This article doesnot exist"},
                             status=status.HTTP_404_NOT_FOUND)
 
-        serializer = self.serializer_class(article)
+        count_view(article_id)
+        return canonical(request, Response(data, status=status.HTTP_200_OK), data['slug'])
 
-        return Response(serializer.data, status=status.HTTP_200_OK)
+
+class ArticleBySlugAPIView(APIView):
+    """
+    Fetches a published article by its slug. Slugs the article had before
+    its title changed are permanently redirected to its current one.
+    """
+
+    permission_classes = (AllowAny,)
+    renderer_classes = (ListArticlesJSONRenderer,)
+
+    def get(self, request, slug):
+        article_id = resolve_slug(slug)
+        try:
+            if article_id is None:
+                raise Article.DoesNotExist
+            data = get_published_article(article_id)
+        except Article.DoesNotExist:
+            return Response({"error": "This article doesnot exist"},
+                            status=status.HTTP_404_NOT_FOUND)
+
+        if data['slug'] != slug:
+            return HttpResponsePermanentRedirect(canonical_url(request, data['slug']))
+        count_view(article_id)
+        return canonical(request, Response(data, status=status.HTTP_200_OK), slug)
+
+
+class ArticleRevisionsAPIView(APIView):
+    """
+    Lists the revisions of an article's text, or returns the text at one of
+    its versions. Only the article's author may read its history.
+    """
+
+    permission_classes = (IsAuthenticated,)
+
+    def get(self, request, article_id, version=None):
+        try:
+            article = Article.objects.only('author_id').get(pk=article_id)
+        except Article.DoesNotExist:
+            return Response({"error": "This article doesnot exist"},
+                            status=status.HTTP_404_NOT_FOUND)
+        if article.author_id != request.user.pk:
+            raise exceptions.PermissionDenied(
+                "Only the author of an article can read its history.")
+
+        if version is None:
+            return Response({"revisions": list_revisions(article_id)}, status=status.HTTP_200_OK)
+
+        revision = get_revision(article_id, version)
+        if revision is None:
+            return Response({"error": "This revision doesnot exist"},
+                            status=status.HTTP_404_NOT_FOUND)
+        return Response({"revision": revision}, status=status.HTTP_200_OK)
+
+
+class ArticleAnalyticsAPIView(APIView):
+    """
+    The likes, favourites, ratings, comments and reads of an article for
+    each day from `?from=` to `?to=` (the last 30 days by default), read
+    from the daily rollups. Only the article's author may read them.
+    """
+
+    permission_classes = (IsAuthenticated,)
+
+    def get(self, request, article_id):
+        try:
+            article = Article.objects.only('author_id').get(pk=article_id)
+        except Article.DoesNotExist:
+            return Response({"error": "This article doesnot exist"},
+                            status=status.HTTP_404_NOT_FOUND)
+        if article.author_id != request.user.pk:
+            raise exceptions.PermissionDenied(
+                "Only the author of an article can read its analytics.")
+
+        last = self.date_param('to', timezone.localdate())
+        first = self.date_param('from', last - timedelta(days=29))
+        max_days = getattr(settings, 'ARTICLES_ANALYTICS_MAX_DAYS', 366)
+        if first > last or (last - first).days >= max_days:
+            raise exceptions.ValidationError({"from": [
+                "Choose a range of 1 to {} days ending on or after `from`.".format(max_days)]})
+
+        days, totals = daily_stats(article_id, first, last)
+        return Response({"analytics": {
+            "article_id": article_id, "from": first, "to": last,
+            "days": days, "totals": totals}}, status=status.HTTP_200_OK)
+
+    def date_param(self, name, default):
+        value = self.request.query_params.get(name)
+        if not value:
+            return default
+        try:
+            day = parse_date(value)
+        except ValueError:
+            day = None
+        if day is None:
+            raise exceptions.ValidationError({name: ["Use a date such as 2018-07-31."]})
+        return day
+
+
+class ImportArticlesAPIView(APIView):
+    """
+    Creates articles from an NDJSON request body, one article per line,
+    read as it arrives. Answers with the number created and the errors of
+    each line that was not imported. Staff may import articles for other
+    authors.
+    """
+
+    permission_classes = (IsAuthenticated,)
+
+    def post(self, request):
+        stream = request.stream
+        lines = iter(stream.readline, b'') if stream is not None else []
+        report = import_articles(lines, request.user, may_choose_author=request.user.is_staff)
+        return Response(report.as_dict(), status=status.HTTP_200_OK)
+
+
+def canonical_url(request, slug):
+    return request.build_absolute_uri('/api/articles/{}'.format(slug))
+
+
+def canonical(request, response, slug):
+    """ mark `response` as an article found at its slug, which caches may keep """
+    response['Link'] = '<{}>; rel="canonical"'.format(canonical_url(request, slug))
+    response['Cache-Control'] = 'public, max-age={}'.format(
+        getattr(settings, 'ARTICLES_MAX_AGE', 60))
+    return response
 
 
 class RateArticleAPIView(RetrieveUpdateAPIView):
@@ -251,7 +409,7 @@ class RateArticleAPIView(RetrieveUpdateAPIView):
 
 
 class CommentArticleAPIView(CreateAPIView):
-    permission_classes = (IsAuthenticated,)
+    permission_classes = (IsAuthenticatedOrReadOnly,)
     renderer_classes = (CommentJSONRenderer,)
 
     # serailizer class to be used for parent comment
@@ -262,6 +420,54 @@ class CommentArticleAPIView(CreateAPIView):
     # A child comment is a thread to a main comment
     serializer_class_b = ChildCommentSerializer
 
+    def get_renderers(self):
+        # listing returns many comments, everything else a single one
+        if self.request.method == 'GET':
+            return [ListCommentsJSONRenderer()]
+        return super(CommentArticleAPIView, self).get_renderers()
+
+    def get(self, request, article_id):
+        """
+        List the comments on an article, a page of top level comments at a
+        time, each with the first few of its replies.
+
+        The page of top level comments and their authors is one query
+        (plus the count), and every reply to that page is fetched by one
+        more, so the number of queries does not grow with the thread.
+        """
+        comment_fields = CommentReplySerializer.comment_fields
+
+        parents = DbComments.objects.filter(article_id=article_id).order_by(
+            'created_at', 'id').values(*comment_fields)
+
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(parents, request, view=self)
+
+        if not page and not Article.objects.filter(pk=article_id).exists():
+            return Response({"error": "This article doesnot exist"},
+                            status=status.HTTP_404_NOT_FOUND)
+
+        # fetch the replies of every comment on the page at once
+        replies = {comment["id"]: [] for comment in page}
+        child_comments = DbChildComment.objects.filter(
+            parent_id__in=list(replies)).order_by('id').values(
+                'parent_id', *comment_fields)
+        for reply in child_comments:
+            replies[reply["parent_id"]].append(reply)
+
+        preview = settings.COMMENT_REPLIES_PREVIEW
+        for comment in page:
+            thread = replies[comment["id"]]
+            comment["replies"] = thread[:preview]
+            comment["replies_count"] = len(thread)
+            comment["replies_cursor"] = None
+            if len(thread) > preview:
+                comment["replies_cursor"] = thread[preview - 1]["id"] if preview else 0
+
+        serializer = CommentThreadSerializer(page, many=True)
+
+        return paginator.get_paginated_response(serializer.data)
+
     def post(self, request, article_id):
         comment = request.data.get('comment', {})
 
@@ -412,6 +618,40 @@ class CommentArticleAPIView(CreateAPIView):
         return Response(comment, status=status.HTTP_200_OK)
 
 
+class CommentRepliesAPIView(APIView):
+    """
+    Load more replies to a comment, continuing after the `replies_cursor`
+    returned with the comment.
+    """
+    permission_classes = (AllowAny,)
+    renderer_classes = (ListCommentsJSONRenderer,)
+
+    def get(self, request, article_id, parent_id):
+        try:
+            after = int(request.query_params.get('after', 0))
+            limit = int(request.query_params.get(
+                'limit', settings.REST_FRAMEWORK['PAGE_SIZE']))
+        except ValueError:
+            return Response({"error": "after and limit must be numbers"},
+                            status=status.HTTP_400_BAD_REQUEST)
+        limit = max(1, min(limit, 100))
+
+        # read one reply more than asked for to know if there are more
+        replies = list(DbChildComment.objects.filter(
+            article_id=article_id, parent_id=parent_id, id__gt=after
+        ).order_by('id').values(*CommentReplySerializer.comment_fields)[:limit + 1])
+
+        replies_cursor = None
+        if len(replies) > limit:
+            replies = replies[:limit]
+            replies_cursor = replies[-1]["id"]
+
+        return Response({
+            "results": CommentReplySerializer(replies, many=True).data,
+            "replies_cursor": replies_cursor
+        }, status=status.HTTP_200_OK)
+
+
 class LikeArticleAPIView(RetrieveUpdateDestroyAPIView):
     permission_classes = (IsAuthenticated,)
     renderer_classes = (ArticlesJSONRenderer,)
@@ -549,7 +789,7 @@ class FavouriteArticleAPIView(CreateAPIView):
         return Response(result, status=status.HTTP_200_OK)
 
 
-class ArticlesSearchFeed(ListAPIView):
+class ArticlesSearchFeed(SparseFieldsetMixin, ListAPIView):
 
     serializer_class = CreateArticleAPIViewSerializer
     renderer_classes = (ListArticlesJSONRenderer,)
@@ -568,14 +808,26 @@ class ArticlesSearchFeed(ListAPIView):
 
         tag = self.request.query_params.get('tag', None)
         if tag is not None:
-            new_q = []
-            for article in queryset:
-                for a_tag in article.tags.all():
-                    if str(a_tag) == tag:
-                        new_q.append(article)
-            queryset = new_q
-
-        if len(queryset) <= 0:
+            queryset = queryset.filter(tags__name=tag)
+
+        if not queryset.exists():
             raise NoResultsMatch
 
-        return queryset
+        return apply_fieldset(queryset, self.get_fieldset())
+
+
+class TrendingArticlesAPIView(SparseFieldsetMixin, ListAPIView):
+    """
+    Lists the articles trending overall, or for the tag given by `?tag=`,
+    from the rankings last built by `manage.py refresh_trending`.
+    """
+
+    permission_classes = (AllowAny,)
+    serializer_class = CreateArticleAPIViewSerializer
+    renderer_classes = (ListArticlesJSONRenderer,)
+
+    def get_queryset(self):
+        tag = self.request.query_params.get('tag', '')
+        articles = Article.objects.filter(
+            published=True, trending__tag=tag).order_by('trending__rank')
+        return apply_fieldset(articles, self.get_fieldset())
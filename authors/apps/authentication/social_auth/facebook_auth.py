@@ -1,14 +1,18 @@
-# import facebook library
-import facebook
+from django.conf import settings
 
 
 class FacebookValidate:
 
     @staticmethod
     def validate(auth_token):
+        # imported on first use, like the Google client
+        import facebook
+
         try:
             # create an instance of the facebook
-            graph = facebook.GraphAPI(access_token=auth_token, version="2.7")
+            graph = facebook.GraphAPI(
+                access_token=auth_token, version="2.7",
+                timeout=getattr(settings, 'SOCIAL_AUTH_TIMEOUT', 10))
 
             # fetch user info i.e. name, email and picture
             profile = graph.request('/me?fields=id,name,email,picture')
@@ -1,19 +1,43 @@
-from google.oauth2 import id_token
-from google.auth.transport import requests
+import functools
 import os
 
+from django.conf import settings
+
+_session = None
+
 # (Receive token by HTTPS POST)
 # ...
 
 
+def session():
+    """ the session every verification uses, created on first use
+
+    One session keeps the connection Google's certificates are fetched
+    over alive between requests.
+    """
+    global _session
+    if _session is None:
+        import requests as http
+        _session = http.Session()
+    return _session
+
+
 class google_auth:
 
     @staticmethod
     def validate(auth_token):
+        # google-auth is slow to import, so workers import it on first use
+        from google.oauth2 import id_token
+        from google.auth.transport import requests
+
         try:
+            transport = functools.partial(
+                requests.Request(session()),
+                timeout=getattr(settings, 'SOCIAL_AUTH_TIMEOUT', 10))
+
             # Specify the CLIENT_ID of the app that accesses the backend:
             idinfo = id_token.verify_oauth2_token(
-                auth_token, requests.Request(), os.getenv('GOOGLE_CLIENT_ID'))
+                auth_token, transport, os.getenv('GOOGLE_CLIENT_ID'))
 
             # ID token is valid. Get the user's Google Account ID from the decoded token.
             return idinfo
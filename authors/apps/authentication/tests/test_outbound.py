@@ -0,0 +1,57 @@
+import json
+import time
+from unittest import mock
+
+from django.test import Client, TestCase
+
+from authors.apps.core.bench import LocalSMTP, offline_services
+from ..models import User
+
+DELAY = 0.3
+
+
+class TestOutboundCalls(TestCase):
+    """ tests for overlapping SMTP with validation """
+
+    def setUp(self):
+        self.client = Client()
+        self.user = {"user": {
+            "username": "slowupstream", "email": "slow.upstream@example.com",
+            "password": "Upstream@2018", "callbackurl": "http://localhost/"}}
+
+    def post(self, path, data):
+        return self.client.post(path, json.dumps(data), content_type='application/json')
+
+    def register(self, username, upstream_delay):
+        self.user['user'].update(
+            username=username, email='{}@example.com'.format(username))
+        with offline_services(upstream_delay=upstream_delay):
+            started = time.perf_counter()
+            response = self.post('/api/users/', self.user)
+            elapsed = time.perf_counter() - started
+
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(User.objects.filter(username=username).exists())
+        return elapsed
+
+    def test_registration_overlaps_smtp_and_mx_lookup(self):
+        """ test if registering waits on SMTP and the MX lookup at the same time """
+        fast = self.register('fastupstream', 0)
+        slow = self.register('slowupstream', DELAY)
+
+        # one after the other would add at least twice the delay
+        self.assertLess(slow - fast, DELAY * 1.5)
+
+    def test_connection_closed_when_invalid(self):
+        """ test if the SMTP connection is closed when validation fails """
+        self.user['user']['password'] = 'short'
+        with offline_services(), mock.patch.object(LocalSMTP, 'quit') as quit:
+            response = self.post('/api/users/', self.user)
+            # the connection is opened on another thread
+            for _ in range(50):
+                if quit.called:
+                    break
+                time.sleep(0.01)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertTrue(quit.called)
@@ -13,10 +13,20 @@ from .serializers import (
     GoogleSocialAuthAPIViewSerializer, FacebookSocialAuthAPIViewSerializer,
     VerificationSerializer, ResetPasswordSerializer, UpdatePasswordSerializer
 )
+from ..core import outbound
 from ..email.email import Mailer, TokenGenerator, datetime, timedelta, os
 from .models import User
 
 
+def validate(serializer, connecting):
+    """ validate a serializer, closing the SMTP connection being opened if it fails """
+    try:
+        serializer.is_valid(raise_exception=True)
+    except Exception:
+        outbound.discard(connecting, lambda server: server.quit())
+        raise
+
+
 class RegistrationAPIView(APIView):
     # Allow any user (authenticated or not) to hit this endpoint.
     permission_classes = (AllowAny,)
@@ -28,11 +38,15 @@ class RegistrationAPIView(APIView):
     def post(self, request):
         user = request.data.get('user', {})
 
+        # open the SMTP connection while validation looks up the MX record
+        # of the email's domain, rather than one after the other
+        connecting = outbound.submit(self.send_user_email.get_smtp_connection)
+
         # The create serializer, validate serializer, save serializer pattern
         # below is common and you will see it a lot throughout this course and
         # your own work later on. Get familiar with it.
         serializer = self.serializer_class(data=user)
-        serializer.is_valid(raise_exception=True)
+        validate(serializer, connecting)
 
         # These are the values about the user that we need to send an email
         subject = "Confirm your account"
@@ -64,7 +78,7 @@ class RegistrationAPIView(APIView):
         # message was sent successfully.
         is_email_sent = self.send_user_email.send(
             serializer.validated_data["email"], subject, template_name,
-            context)
+            context, server=connecting.result())
 
         if is_email_sent:
             serializer.save()
@@ -154,11 +168,13 @@ class ResetPasswordAPIView(APIView):
 
     def post(self, request):
         user = request.data.get('user', {})
+        connecting = outbound.submit(self.send_user_email.get_smtp_connection)
+
         # The create serializer, validate serializer, save serializer pattern
         # below is common and you will see it a lot throughout this course and
         # your own work later on. Get familiar with it.
         serializer = self.serializer_class(data=user)
-        serializer.is_valid(raise_exception=True)
+        validate(serializer, connecting)
 
         # These are the values about the user that we need to send an email
         subject = "Reset password"
@@ -182,7 +198,8 @@ class ResetPasswordAPIView(APIView):
         # Check if an email was sent successfully and return statuses
         # accordingly.
         is_email_sent = self.send_user_email.send(
-            serializer.data['email'], subject, template_name, context)
+            serializer.data['email'], subject, template_name, context,
+            server=connecting.result())
 
         if is_email_sent:
             message = {"message": "A password reset link has been sent " +
@@ -0,0 +1,7 @@
+from django.db.backends.postgresql import base
+
+from ...connections import PersistentConnectionMixin
+
+
+class DatabaseWrapper(PersistentConnectionMixin, base.DatabaseWrapper):
+    """ the Postgres backend, with bounded and health checked persistent connections """
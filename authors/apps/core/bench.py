@@ -0,0 +1,439 @@
+import functools
+import json
+import math
+import re
+import smtplib
+import time
+from contextlib import ExitStack, contextmanager
+from unittest import mock
+
+from django.contrib.auth.hashers import make_password
+from django.db import close_old_connections, connection, connections, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLResolver, get_resolver
+
+PASSWORD = 'Benchmark@2018'
+
+# path converters in a route, e.g. `<int:article_id>`
+ROUTE_PARAMETER = re.compile(r'<(?:\w+:)?(\w+)>')
+
+
+class LocalSMTP:
+    """ an SMTP server stand-in that accepts and drops every message """
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def ehlo(self, *args, **kwargs):
+        return 250, b'ok'
+
+    def starttls(self, *args, **kwargs):
+        return 220, b'ok'
+
+    def login(self, *args, **kwargs):
+        return 235, b'ok'
+
+    def sendmail(self, *args, **kwargs):
+        return {}
+
+    def quit(self):
+        pass
+
+    close = quit
+
+
+class LocalGraphAPI:
+    """ a Facebook Graph API stand-in that knows one user per token """
+
+    def __init__(self, access_token=None, **kwargs):
+        self.access_token = access_token
+
+    def request(self, path, *args, **kwargs):
+        return {
+            'id': 'facebook-{}'.format(self.access_token),
+            'name': 'facebook_{}'.format(self.access_token),
+            'email': '{}@facebook.example.com'.format(self.access_token),
+        }
+
+
+def verify_google_token(token, *args, **kwargs):
+    return {
+        'sub': 'google-{}'.format(token),
+        'name': 'google_{}'.format(token),
+        'email': '{}@google.example.com'.format(token),
+    }
+
+
+def _slow(function, delay):
+    """ `function`, answering after `delay` seconds like a remote service would """
+    if not delay:
+        return function
+
+    @functools.wraps(function)
+    def slow(*args, **kwargs):
+        time.sleep(delay)
+        return function(*args, **kwargs)
+    return slow
+
+
+@contextmanager
+def offline_services(upstream_delay=0):
+    """ replace SMTP, the MX lookup and the social providers with local stand-ins
+
+    Each stand-in takes `upstream_delay` seconds to answer, the way a slow
+    provider would: SMTP to connect, the MX lookup, and each social token
+    verification.
+    """
+    from authors.apps.email.email import Mailer
+
+    with ExitStack() as stack:
+        stack.enter_context(mock.patch.object(
+            smtplib, 'SMTP', _slow(LocalSMTP, upstream_delay)))
+        stack.enter_context(mock.patch.multiple(
+            Mailer, host_domain='localhost', sender_domain='localhost',
+            sender_email='bench@example.com', sender_password=PASSWORD))
+        stack.enter_context(mock.patch(
+            'authors.apps.email.email.validate_email',
+            _slow(lambda *args, **kwargs: True, upstream_delay)))
+        stack.enter_context(mock.patch(
+            'google.oauth2.id_token.verify_oauth2_token',
+            _slow(verify_google_token, upstream_delay)))
+        stack.enter_context(mock.patch(
+            'facebook.GraphAPI', _slow(LocalGraphAPI, upstream_delay)))
+        yield
+
+
+def seed(users=20, articles=50):
+    """ create a small, connected dataset and return what requests need of it """
+    from authors.apps.articles.models import (
+        Article, ArticleLikes, ChildComment, Comments, Rating)
+    from authors.apps.authentication.models import User
+    from authors.apps.email.email import TokenGenerator
+    from authors.apps.notifications.models import Notifications
+
+    # hashing is slow on purpose, every user shares the one hash
+    password = make_password(PASSWORD)
+    people = []
+    for number in range(max(users, 3)):
+        user = User(
+            username='bench_user_{}'.format(number),
+            email='bench_user_{}@example.com'.format(number),
+            password=password, is_verified=True)
+        # saved one at a time so that their profiles are created
+        user.save()
+        people.append(user)
+
+    author, reader, unverified = people[0], people[1], people[-1]
+    User.objects.filter(pk=unverified.pk).update(is_verified=False)
+
+    # everybody but the reader follows the author, so that the reader can
+    # follow the author during the benchmark
+    for number, person in enumerate(people[1:]):
+        if person != reader:
+            person.profile.follow(author.profile)
+        person.profile.follow(people[1 + (number + 1) % (len(people) - 1)].profile)
+
+    text = 'lorem ipsum dolor sit amet consectetur adipiscing elit '
+    for number in range(articles):
+        article = Article.objects.create(
+            title='bench article {}'.format(number),
+            slug='bench-article-{}'.format(number),
+            body=text * 40, description=text, published=True,
+            author=people[number % len(people)])
+        article.tags.add('bench', 'tag{}'.format(number % 10))
+
+    article = Article.objects.filter(author=author).first()
+    comments = Comments.objects.bulk_create([
+        Comments(body=text, article_id=article, author=person)
+        for person in people])
+    comment = Comments.objects.filter(article_id=article).first()
+    ChildComment.objects.bulk_create([
+        ChildComment(body=text, article_id=article, parent_id=comment, author=person)
+        for person in people])
+    Rating.objects.bulk_create([
+        Rating(rating=number % 5 + 1, article_id=article, author=person)
+        for number, person in enumerate(people[2:])])
+    ArticleLikes.objects.bulk_create([
+        ArticleLikes(article=article, article_like=True, author=person)
+        for person in people[2:]])
+    Notifications.objects.bulk_create([
+        Notifications(
+            article_id=article, notification_title=text,
+            notification_body=text, notification_owner=author)
+        for _ in range(len(comments))])
+
+    tokens = TokenGenerator()
+    return {
+        'author': author,
+        'reader': reader,
+        'article_id': article.pk,
+        'slug': article.slug,
+        'version': article.version,
+        'parent_id': comment.pk,
+        'username': author.username,
+        'notification_ids': list(Notifications.objects.filter(
+            notification_owner=author).values_list('id', flat=True)[:5]),
+        'verify_token': tokens.make_custom_token({
+            'username': unverified.username, 'email': unverified.email,
+            'callbackurl': 'http://localhost/'}),
+        'reset_token': tokens.make_custom_token({
+            'username': author.username, 'email': author.email,
+            'exp': int(time.time()) + 3600}),
+    }
+
+
+def bench_request(method='get', data=None, user='author', params=None, **kwargs):
+    """ one request to benchmark on a route, `kwargs` fill its path """
+    return {
+        'method': method, 'data': data, 'user': user, 'params': params,
+        'kwargs': kwargs,
+    }
+
+
+def scenarios(context):
+    """ the requests made to each route, routes missing here are fetched with GET """
+    article = {
+        "article": {
+            "title": "Benchmarking the API", "description": "How fast is it?",
+            "body": "Measure, then measure again.", "tags": ["bench"]
+        }
+    }
+    anonymous = None
+
+    return {
+        'api/user/': [
+            bench_request(),
+            bench_request('put', {"user": {"bio": "I benchmark things"}}),
+        ],
+        'api/users/': [bench_request('post', {"user": {
+            "username": "bench_signup", "email": "bench_signup@example.com",
+            "password": PASSWORD, "callbackurl": "http://localhost/"}}, anonymous)],
+        'api/users/login/': [bench_request('post', {"user": {
+            "email": context['author'].email, "password": PASSWORD}}, anonymous)],
+        'api/auth/google/': [bench_request(
+            'post', {"user": {"auth_token": "bench"}}, anonymous)],
+        'api/auth/facebook/': [bench_request(
+            'post', {"user": {"auth_token": "bench"}}, anonymous)],
+        'api/activate/<str:token>': [bench_request(
+            user=anonymous, token=context['verify_token'])],
+        'api/user/reset_password/': [bench_request('post', {"user": {
+            "email": context['author'].email,
+            "callbackurl": "http://localhost/"}}, anonymous)],
+        'api/user/new_password/<str:token>/': [bench_request(
+            'post', {"user": {"new_password": PASSWORD}}, anonymous,
+            token=context['reset_token'])],
+        'api/articles/': [bench_request('post', article)],
+        'api/articles/<int:article_id>': [
+            bench_request(), bench_request('put', article), bench_request('delete'),
+        ],
+        'api/articles/all/': [bench_request(user=anonymous)],
+        'api/articles/single/<int:article_id>': [bench_request(user=anonymous)],
+        'api/articles/<int:article_id>/comment/': [
+            bench_request(user=anonymous),
+            bench_request('post', {"comment": {"body": "Nicely measured"}}),
+        ],
+        'api/articles/<int:article_id>/comment/<int:parent_id>/replies/': [
+            bench_request(user=anonymous)],
+        'api/articles/<int:article_id>/rating/': [bench_request(
+            'post', {"rating": {"rating": 4, "review": "fast"}}, 'reader')],
+        'api/articles/<int:article_id>/favourite/': [bench_request(
+            'post', {"article": {"article_favourite": True}}, 'reader')],
+        'api/articles/<int:article_id>/likes/': [bench_request(
+            'post', {"article": {"article_like": True}}, 'reader')],
+        'api/articles/<slug:slug>': [bench_request(user=anonymous)],
+        'api/articles/search': [bench_request(
+            user=anonymous, params={'title': 'bench article'})],
+        'api/profiles/<username>/': [bench_request(user=anonymous)],
+        'api/profiles/<username>/follow/': [bench_request('post', user='reader')],
+        'api/notifications/': [
+            bench_request(),
+            bench_request('put', {"notification": {
+                "notifications": context['notification_ids']}}),
+        ],
+    }
+
+
+def iter_routes(patterns=None, prefix=''):
+    """ every route of the URLconf as `(route, pattern)`, admin excluded """
+    patterns = get_resolver().url_patterns if patterns is None else patterns
+    for pattern in patterns:
+        route = prefix + str(pattern.pattern)
+        if route.startswith('admin/'):
+            continue
+        if isinstance(pattern, URLResolver):
+            yield from iter_routes(pattern.url_patterns, route)
+        else:
+            yield route, pattern
+
+
+def _path(route, context, kwargs):
+    values = dict(context, **kwargs)
+    return '/' + ROUTE_PARAMETER.sub(lambda match: str(values[match.group(1)]), route)
+
+
+def _send(client, path, spec, headers):
+    method = spec['method']
+    if method == 'get':
+        return client.get(path, spec['params'] or {}, **headers)
+    return client.generic(
+        method.upper(), path, json.dumps(spec['data'] or {}),
+        content_type='application/json', **headers)
+
+
+def _size(response):
+    # only the first chunk of a stream is read, streams stay open otherwise
+    if response.streaming:
+        size = len(next(iter(response.streaming_content), b''))
+        response.close()
+        return size
+    return len(response.content)
+
+
+def percentile(values, percent):
+    """ the nearest-rank percentile of a list of numbers """
+    ordered = sorted(values)
+    rank = max(int(math.ceil(percent / 100.0 * len(ordered))), 1)
+    return ordered[rank - 1]
+
+
+def measure(client, path, spec, headers, iterations, warmup):
+    timings, queries, size, status = [], 0, 0, None
+    cpu = 0.0
+
+    for iteration in range(warmup + iterations):
+        # every request is rolled back so that each one sees the same data
+        with transaction.atomic(), CaptureQueriesContext(connection) as captured:
+            started, cpu_started = time.perf_counter(), time.process_time()
+            try:
+                response = _send(client, path, spec, headers)
+                status, size = response.status_code, _size(response)
+            except Exception:
+                status, size = 500, 0
+            elapsed = time.perf_counter() - started
+            cpu_elapsed = time.process_time() - cpu_started
+            transaction.set_rollback(True)
+
+        if iteration >= warmup:
+            timings.append(elapsed * 1000)
+            cpu += cpu_elapsed * 1000
+            queries = max(queries, len(captured))
+
+    return {
+        'status': status,
+        'p50_ms': round(percentile(timings, 50), 3),
+        'p95_ms': round(percentile(timings, 95), 3),
+        'p99_ms': round(percentile(timings, 99), 3),
+        'queries': queries,
+        'bytes': size,
+        # the share of the time the worker computed rather than waited
+        'cpu_percent': round(100 * cpu / sum(timings), 1) if sum(timings) else 0.0,
+    }
+
+
+def run_benchmark(context, iterations=30, warmup=3, only=None, upstream_delay=0):
+    """ benchmark every route against a seeded database
+
+    Returns the results by endpoint, an endpoint being a method and route.
+    `only` limits the run to the routes containing that text, and
+    `upstream_delay` slows the stand-ins of the other services down.
+    """
+    client = Client()
+    tokens = {
+        'author': context['author'].token,
+        'reader': context['reader'].token,
+    }
+    routes = scenarios(context)
+
+    results = {}
+    with offline_services(upstream_delay):
+        seen = set()
+        for route, pattern in iter_routes():
+            # a route defined twice is only ever served by its first view
+            if route in seen or (only and only not in route):
+                continue
+            seen.add(route)
+
+            for spec in routes.get(route, [bench_request()]):
+                headers = {}
+                if spec['user'] is not None:
+                    headers['HTTP_AUTHORIZATION'] = 'Token ' + tokens[spec['user']]
+                path = _path(route, context, spec['kwargs'])
+                endpoint = '{} /{}'.format(spec['method'].upper(), route)
+                results[endpoint] = measure(
+                    client, path, spec, headers, iterations, warmup)
+
+    return {
+        'iterations': iterations, 'upstream_delay_ms': upstream_delay * 1000,
+        'endpoints': results,
+    }
+
+
+def compare(results, baseline, threshold=0.2, min_delta_ms=1.0):
+    """ the regressions of `results` against a baseline run
+
+    An endpoint regresses when its p95 latency grows by more than
+    `threshold` (a fraction) and by more than `min_delta_ms`, so that
+    jitter on the fastest endpoints is not reported, or when it makes more
+    queries than before. Returns `(endpoint, metric, baseline, current)`
+    tuples.
+    """
+    regressions = []
+    for endpoint, current in sorted(results['endpoints'].items()):
+        previous = baseline.get('endpoints', {}).get(endpoint)
+        if previous is None:
+            continue
+        growth = current['p95_ms'] - previous['p95_ms']
+        if growth > previous['p95_ms'] * threshold and growth > min_delta_ms:
+            regressions.append(
+                (endpoint, 'p95_ms', previous['p95_ms'], current['p95_ms']))
+        if current['queries'] > previous['queries']:
+            regressions.append(
+                (endpoint, 'queries', previous['queries'], current['queries']))
+    return regressions
+
+
+def benchmark_connections(path, requests=50, alias='default', headers=None):
+    """ time connection setup with and without persistent connections
+
+    GETs `path` `requests` times in each mode, opening and closing
+    connections around each request the way the request signals of a
+    server do. Returns, by mode, the connections opened, the time spent
+    opening them per request and the request latency, in milliseconds.
+    """
+    connection = connections[alias]
+    client = Client()
+    original_connect = connection.connect
+    original_max_age = connection.settings_dict['CONN_MAX_AGE']
+    results = {}
+
+    for mode, max_age in (('per request', 0), ('persistent', 600)):
+        connect_times, request_times = [], []
+
+        def timed_connect():
+            started = time.perf_counter()
+            original_connect()
+            connect_times.append(time.perf_counter() - started)
+
+        connection.close()
+        connection.settings_dict['CONN_MAX_AGE'] = max_age
+        connection.connect = timed_connect
+        try:
+            for _ in range(requests):
+                started = time.perf_counter()
+                close_old_connections()
+                client.get(path, **(headers or {}))
+                close_old_connections()
+                request_times.append(time.perf_counter() - started)
+        finally:
+            del connection.connect
+            connection.settings_dict['CONN_MAX_AGE'] = original_max_age
+            connection.close()
+
+        results[mode] = {
+            'connections': len(connect_times),
+            'connect_ms_per_request': round(sum(connect_times) * 1000 / requests, 3),
+            'p50_ms': round(percentile(request_times, 50) * 1000, 3),
+            'p95_ms': round(percentile(request_times, 95) * 1000, 3),
+        }
+    return results
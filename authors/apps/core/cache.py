@@ -0,0 +1,235 @@
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+
+from . import metrics
+
+# keys every cache backend accepts as they are, memcached being the strictest
+SAFE_KEY = re.compile(r'^[A-Za-z0-9_.:-]{1,200}$')
+
+MISSING = object()
+
+
+def _options():
+    options = {'BACKEND': 'default', 'LOCAL_SIZE': 1024, 'LOCAL_TIMEOUT': 5}
+    options.update(getattr(settings, 'APP_CACHE', {}))
+    return options
+
+
+class LocalTier:
+    """
+    A least recently used dictionary of at most `LOCAL_SIZE` entries, each
+    dropped once its timeout has passed. It is kept by each process, in
+    front of the shared cache, so values read again and again within a few
+    seconds cost no round trip.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return MISSING
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self.entries[key]
+                return MISSING
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, timeout):
+        size = _options()['LOCAL_SIZE']
+        if not size or timeout <= 0:
+            return
+        with self.lock:
+            self.entries[key] = (time.monotonic() + timeout, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > size:
+                self.entries.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+local = LocalTier()
+
+
+class Namespace:
+    """
+    Cache-aside access to one kind of value, such as profile snapshots.
+
+    Lookups try this process's `LocalTier` first, then the shared cache
+    named by `APP_CACHE['BACKEND']`. Values are kept locally for at most
+    `APP_CACHE['LOCAL_TIMEOUT']` seconds, so a value changed by another
+    process may be served stale for that long. Values are shared between
+    callers and must not be modified.
+
+    Every key holds the namespace's version, and `invalidate` bumps it,
+    which drops all of the namespace's values at once.
+    """
+
+    def __init__(self, name, timeout=300, timeout_setting=None):
+        self.name = name
+        self.default_timeout = timeout
+        self.timeout_setting = timeout_setting
+        self.lock = threading.Lock()
+        self.stats = {'local_hit': 0, 'shared_hit': 0, 'miss': 0}
+
+    @property
+    def shared(self):
+        return caches[_options()['BACKEND']]
+
+    def timeout(self, timeout=None):
+        if timeout is not None:
+            return timeout
+        if self.timeout_setting:
+            return getattr(settings, self.timeout_setting, self.default_timeout)
+        return self.default_timeout
+
+    def _version_key(self):
+        return 'cache:{}:version'.format(self.name)
+
+    def version(self):
+        key = self._version_key()
+        version = local.get(key)
+        if version is MISSING:
+            version = self.shared.get(key, 1)
+            local.set(key, version, _options()['LOCAL_TIMEOUT'])
+        return version
+
+    def make_key(self, key, version=None):
+        key = str(key)
+        if not SAFE_KEY.match(key):
+            # usernames and the like may hold spaces and other characters
+            # that some backends reject
+            key = hashlib.md5(key.encode('utf-8')).hexdigest()
+        return 'cache:{}:{}:{}'.format(
+            self.name, self.version() if version is None else version, key)
+
+    def _count(self, result, amount):
+        if not amount:
+            return
+        with self.lock:
+            self.stats[result] += amount
+        metrics.inc('cache_requests_total', amount, cache=self.name, result=result)
+
+    def _local_timeout(self, timeout):
+        local_timeout = _options()['LOCAL_TIMEOUT']
+        return local_timeout if timeout is None else min(local_timeout, timeout)
+
+    def get_many(self, keys):
+        """ a dictionary of the given keys that are cached, to their values """
+        version = self.version()
+        keys = {self.make_key(key, version): key for key in keys}
+        found = {}
+        for full_key, key in keys.items():
+            value = local.get(full_key)
+            if value is not MISSING:
+                found[key] = value
+        self._count('local_hit', len(found))
+
+        remaining = [full_key for full_key, key in keys.items() if key not in found]
+        shared = self.shared.get_many(remaining) if remaining else {}
+        local_timeout = self._local_timeout(self.timeout())
+        for full_key, value in shared.items():
+            local.set(full_key, value, local_timeout)
+            found[keys[full_key]] = value
+        self._count('shared_hit', len(shared))
+        self._count('miss', len(remaining) - len(shared))
+        return found
+
+    def get(self, key, default=None):
+        return self.get_many([key]).get(key, default)
+
+    def set_many(self, values, timeout=None):
+        timeout = self.timeout(timeout)
+        version = self.version()
+        values = {self.make_key(key, version): value for key, value in values.items()}
+        self.shared.set_many(values, timeout)
+        local_timeout = self._local_timeout(timeout)
+        for full_key, value in values.items():
+            local.set(full_key, value, local_timeout)
+
+    def set(self, key, value, timeout=None):
+        self.set_many({key: value}, timeout)
+
+    def delete_many(self, keys):
+        version = self.version()
+        keys = [self.make_key(key, version) for key in keys]
+        self.shared.delete_many(keys)
+        for key in keys:
+            local.delete(key)
+
+    def delete(self, key):
+        self.delete_many([key])
+
+    def get_or_set(self, key, load, timeout=None):
+        """ the cached value of `key`, or the result of `load()`, then cached """
+        value = self.get(key, MISSING)
+        if value is MISSING:
+            value = load()
+            self.set(key, value, timeout)
+        return value
+
+    def get_many_or_load(self, keys, load, timeout=None):
+        """ like `get_many`, with the keys that are not cached loaded at once
+
+        `load` is called with the set of missing keys and returns a
+        dictionary of those it found, which are cached. Keys it leaves out
+        are left out of the result too.
+        """
+        found = self.get_many(keys)
+        missing = set(keys) - set(found)
+        if missing:
+            loaded = load(missing)
+            if loaded:
+                self.set_many(loaded, timeout)
+                found.update(loaded)
+        return found
+
+    def invalidate(self):
+        """ drop every value of this namespace, in every process """
+        key = self._version_key()
+        self.shared.add(key, 1, None)
+        try:
+            self.shared.incr(key)
+        except ValueError:
+            # evicted since it was added
+            self.shared.set(key, 2, None)
+        # other processes see the new version once their local copy expires
+        local.delete(key)
+
+
+_namespaces = {}
+_namespaces_lock = threading.Lock()
+
+
+def namespace(name, timeout=300, timeout_setting=None):
+    """ the `Namespace` called `name`, created on first use
+
+    `timeout` is the number of seconds values are cached for, read from the
+    `timeout_setting` setting when it is given and set.
+    """
+    with _namespaces_lock:
+        if name not in _namespaces:
+            _namespaces[name] = Namespace(name, timeout, timeout_setting)
+        return _namespaces[name]
+
+
+def stats():
+    """ the hits and misses of each namespace in this process """
+    with _namespaces_lock:
+        return {name: dict(space.stats) for name, space in _namespaces.items()}
@@ -0,0 +1,93 @@
+import random
+import threading
+import time
+
+from django.db import OperationalError
+
+from . import metrics
+
+_slots = {}
+_slots_lock = threading.Lock()
+
+
+def _slot(alias, size):
+    """ the semaphore counting the open connections to `alias` in this process """
+    with _slots_lock:
+        if alias not in _slots:
+            _slots[alias] = threading.BoundedSemaphore(size)
+        return _slots[alias]
+
+
+class PersistentConnectionMixin:
+    """
+    Keeps persistent connections (`CONN_MAX_AGE`) healthy and within
+    bounds, configured by the `POOL` dictionary of the database settings:
+
+    - `MAX_CONNECTIONS`: connections a worker may hold open at once, each
+      thread holding one. A thread that finds them all taken waits up to
+      `TIMEOUT` seconds (10 by default) for one to be closed.
+    - `HEALTH_CHECK_AFTER`: seconds a connection may sit unused before it
+      is pinged at the start of the next request (30 by default).
+    - `LIFETIME_JITTER`: share of `CONN_MAX_AGE` taken off at random from
+      each connection's lifetime (0.1 by default), so that workers started
+      together do not all reconnect together.
+
+    Django already closes a connection once it is `CONN_MAX_AGE` seconds
+    old, which recycles it, and drops connections that raised errors.
+    """
+
+    def _pool(self, name, default):
+        return self.settings_dict.get('POOL', {}).get(name, default)
+
+    def _acquire_slot(self):
+        size = self._pool('MAX_CONNECTIONS', None)
+        if not size or getattr(self, 'holds_slot', False):
+            return
+        if not _slot(self.alias, size).acquire(timeout=self._pool('TIMEOUT', 10)):
+            raise OperationalError(
+                "All {} connections to '{}' of this worker are in use.".format(
+                    size, self.alias))
+        self.holds_slot = True
+
+    def _release_slot(self):
+        if getattr(self, 'holds_slot', False):
+            self.holds_slot = False
+            _slot(self.alias, self._pool('MAX_CONNECTIONS', None)).release()
+
+    def connect(self):
+        self._acquire_slot()
+        started = time.perf_counter()
+        try:
+            super().connect()
+        except Exception:
+            self._release_slot()
+            raise
+        metrics.observe(
+            'db_connect_duration_seconds', time.perf_counter() - started,
+            database=self.alias)
+
+        if self.close_at is not None:
+            jitter = self._pool('LIFETIME_JITTER', 0.1)
+            self.close_at -= random.uniform(0, jitter * self.settings_dict['CONN_MAX_AGE'])
+        self.checked_at = time.monotonic()
+
+    def close(self):
+        try:
+            super().close()
+        finally:
+            # a connection closed inside a transaction stays open until
+            # the transaction ends
+            if self.connection is None:
+                self._release_slot()
+
+    def close_if_unusable_or_obsolete(self):
+        super().close_if_unusable_or_obsolete()
+        if self.connection is None or self.in_atomic_block:
+            return
+
+        now = time.monotonic()
+        idle = now - getattr(self, 'checked_at', now)
+        if idle > self._pool('HEALTH_CHECK_AFTER', 30) and not self.is_usable():
+            self.close()
+            return
+        self.checked_at = now
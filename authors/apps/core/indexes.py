@@ -0,0 +1,216 @@
+import re
+import time
+from collections import namedtuple
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+# a query the API runs on every request of some view, `columns` being the
+# columns an index needs to lead with to serve it. Partial indexes are
+# reported by introspection without their condition, so the ones known to
+# serve a query are named in `covered_by`.
+QueryShape = namedtuple('QueryShape', 'name model columns queryset covered_by')
+
+# index names in the plans of SQLite and Postgres
+USED_INDEX = re.compile(
+    r'(?:USING (?:COVERING )?INDEX|Index (?:Only )?Scan(?: Backward)? using'
+    r'|Bitmap Index Scan on) "?(\w+)"?')
+
+
+def query_shapes():
+    """ the filters used by the views, with placeholder values """
+    from authors.apps.articles.models import (
+        Article, ArticleFavourites, ArticleLikes, ChildComment, Comments, Rating)
+    from authors.apps.notifications.models import Notifications
+    from authors.apps.profiles.models import Profile
+
+    follows = Profile.follows.through
+
+    def shape(name, model, columns, queryset, covered_by=()):
+        return QueryShape(name, model, columns, queryset, covered_by)
+
+    return [
+        shape('published articles feed', Article, ('published', 'created_at'),
+              lambda: Article.objects.filter(published=True).order_by('-created_at')),
+        shape("an author's articles", Article, ('author_id',),
+              lambda: Article.objects.filter(author_id=1)),
+        shape("an article's ratings", Rating, ('article_id_id',),
+              lambda: Rating.objects.filter(article_id=1).values('rating')),
+        shape("a user's rating of an article", Rating,
+              ('article_id_id', 'author_id'),
+              lambda: Rating.objects.filter(article_id=1, author_id=1)),
+        shape("a user's like of an article", ArticleLikes,
+              ('article_id', 'author_id'),
+              lambda: ArticleLikes.objects.filter(article_id=1, author_id=1)),
+        shape("a user's favourite of an article", ArticleFavourites,
+              ('article_id', 'author_id'),
+              lambda: ArticleFavourites.objects.filter(article_id=1, author_id=1)),
+        shape("an article's comments", Comments, ('article_id_id',),
+              lambda: Comments.objects.filter(article_id=1).order_by('created_at', 'id')),
+        shape('replies to comments', ChildComment, ('parent_id_id',),
+              lambda: ChildComment.objects.filter(parent_id__in=[1]).order_by('id')),
+        shape("a user's notifications", Notifications,
+              ('notification_owner_id', 'created_at'),
+              lambda: Notifications.objects.filter(
+                  notification_owner=1).order_by('-created_at', '-id')),
+        shape("a user's unread notifications", Notifications,
+              ('notification_owner_id', 'read_status'),
+              lambda: Notifications.objects.filter(
+                  notification_owner=1, read_status=False),
+              covered_by=('notifications_unread_owner_idx',)),
+        shape('read notifications past retention', Notifications,
+              ('read_status', 'updated_at'),
+              lambda: Notifications.objects.filter(
+                  read_status=True, updated_at__lt=timezone.now())),
+        shape("a profile's followers", follows, ('to_profile_id',),
+              lambda: follows.objects.filter(to_profile_id=1)),
+        shape("a profile's followees", follows, ('from_profile_id',),
+              lambda: follows.objects.filter(from_profile_id=1)),
+    ]
+
+
+def explain(queryset):
+    """ the lines of the database's query plan for a queryset """
+    sql, params = queryset.query.sql_with_params()
+    prefix = 'EXPLAIN QUERY PLAN ' if connection.vendor == 'sqlite' else 'EXPLAIN '
+
+    with connection.cursor() as cursor:
+        cursor.execute(prefix + sql, params)
+        return [str(row[-1]) for row in cursor.fetchall()]
+
+
+def table_indexes(table):
+    """ every index on a table except its primary key, by name """
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, table)
+
+    return {
+        name: constraint for name, constraint in constraints.items()
+        if not constraint['primary_key'] and (
+            constraint['index'] or constraint['unique'])
+    }
+
+
+def _serves(index_columns, columns):
+    # the leading columns of the index are the ones filtered on, in any order
+    return len(index_columns) >= len(columns) and (
+        set(index_columns[:len(columns)]) == set(columns))
+
+
+def _missing(shapes, indexes):
+    return [
+        shape for shape in shapes
+        if not set(shape.covered_by) & set(indexes) and not any(
+            _serves(index['columns'], shape.columns) for index in indexes.values())
+    ]
+
+
+def _unused(model, shapes, indexes, used):
+    foreign_keys = {
+        field.column for field in model._meta.fields if field.is_relation}
+    covered = {name for shape in shapes for name in shape.covered_by}
+
+    unused = []
+    for name, index in sorted(indexes.items()):
+        columns = index['columns']
+        if index['unique'] or name in used or name in covered:
+            continue
+        if len(columns) == 1 and columns[0] in foreign_keys:
+            continue
+        if not any(_serves(columns, shape.columns) for shape in shapes):
+            unused.append((model._meta.db_table, name, columns))
+    return unused
+
+
+Advice = namedtuple('Advice', 'plans missing unused')
+
+
+def advise(shapes=None):
+    """ compare the indexes on the queried tables with the queries
+
+    Returns the plan of each query shape, the shapes no index serves, and
+    the `(table, index, columns)` of the indexes no shape uses. Unique
+    indexes and single column indexes on foreign keys are never reported
+    as unused, those serve constraints, joins and cascading deletes.
+    """
+    shapes = query_shapes() if shapes is None else shapes
+
+    plans = {shape.name: explain(shape.queryset()) for shape in shapes}
+    used = {
+        name for lines in plans.values() for line in lines
+        for name in USED_INDEX.findall(line)
+    }
+
+    by_table = {}
+    for shape in shapes:
+        by_table.setdefault(shape.model._meta.db_table, []).append(shape)
+
+    missing, unused = [], []
+    for table, table_shapes in sorted(by_table.items()):
+        indexes = table_indexes(table)
+        missing.extend(_missing(table_shapes, indexes))
+        unused.extend(_unused(table_shapes[0].model, table_shapes, indexes, used))
+
+    # keep the missing queries in the order they were given
+    missing.sort(key=shapes.index)
+    return Advice(plans, missing, unused)
+
+
+def benchmark_writes(rows=200):
+    """ time creating and then updating `rows` rows in each indexed table
+
+    Every row is written with its own query, the way the API writes them,
+    inside a transaction that is rolled back at the end. Returns the rows
+    written per second, by table and operation.
+    """
+    from authors.apps.articles.models import (
+        Article, ArticleFavourites, ArticleLikes, ChildComment, Comments, Rating)
+    from authors.apps.authentication.models import User
+    from authors.apps.notifications.models import Notifications
+
+    results = {}
+
+    def timed(label, write, instances):
+        started = time.perf_counter()
+        for instance in instances:
+            write(instance)
+        elapsed = time.perf_counter() - started
+        results[label] = len(instances) / elapsed if elapsed else float('inf')
+
+    with transaction.atomic():
+        author = User.objects.create(
+            username='index-benchmark', email='index-benchmark@example.com')
+        article = Article.objects.create(
+            title='benchmark', slug='index-benchmark', body='benchmark',
+            description='benchmark', author=author)
+        comment = Comments.objects.create(
+            body='benchmark', article_id=article, author=author)
+
+        text = 'lorem ipsum dolor sit amet ' * 8
+        tables = [
+            ('articles', lambda number: Article(
+                title=text, slug='index-benchmark-{}'.format(number), body=text * 20,
+                description=text, author=author, published=True)),
+            ('ratings', lambda number: Rating(
+                rating=number % 5 + 1, review=text, article_id=article, author=author)),
+            ('comments', lambda number: Comments(
+                body=text, article_id=article, author=author)),
+            ('replies', lambda number: ChildComment(
+                body=text, article_id=article, parent_id=comment, author=author)),
+            ('likes', lambda number: ArticleLikes(
+                article=article, article_like=True, author=author)),
+            ('favourites', lambda number: ArticleFavourites(
+                article=article, article_favourite=True, author=author)),
+            ('notifications', lambda number: Notifications(
+                article_id=article, notification_title=text,
+                notification_body=text, notification_owner=author)),
+        ]
+
+        for table, make in tables:
+            instances = [make(number) for number in range(rows)]
+            timed((table, 'insert'), lambda instance: instance.save(), instances)
+            timed((table, 'update'), lambda instance: instance.save(), instances)
+
+        transaction.set_rollback(True)
+
+    return results
@@ -0,0 +1,103 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from ...bench import compare, run_benchmark, seed
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark every API route in-process against a freshly seeded "
+        "database and compare the results with a baseline. Email, DNS and "
+        "the social providers are replaced by local stand-ins."
+    )
+
+    # the checks import the URLconf, which must wait for the stand-ins
+    requires_system_checks = False
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iterations', type=int, default=30,
+            help='measured requests per endpoint')
+        parser.add_argument(
+            '--warmup', type=int, default=3,
+            help='unmeasured requests per endpoint made first')
+        parser.add_argument(
+            '--route', dest='only',
+            help='only benchmark the routes containing this text')
+        parser.add_argument(
+            '--users', type=int, default=20, help='users to seed')
+        parser.add_argument(
+            '--articles', type=int, default=50, help='articles to seed')
+        parser.add_argument(
+            '--output', help='write the results to this JSON file')
+        parser.add_argument(
+            '--baseline', help='compare the results with this JSON file')
+        parser.add_argument(
+            '--threshold', type=float, default=20,
+            help='percent p95 latency may grow over the baseline (default 20)')
+        parser.add_argument(
+            '--min-delta-ms', type=float, default=1.0,
+            help='ignore p95 growth smaller than this many milliseconds')
+        parser.add_argument(
+            '--upstream-delay-ms', type=float, default=0,
+            help='make SMTP, the MX lookup and the social providers this slow')
+        parser.add_argument(
+            '--keepdb', action='store_true',
+            help='keep the benchmark database between runs')
+
+    def handle(self, *args, **options):
+        if options['iterations'] <= 0 or options['warmup'] < 0:
+            raise CommandError("--iterations must be positive and --warmup not negative.")
+
+        baseline = None
+        if options['baseline']:
+            try:
+                with open(options['baseline']) as baseline_file:
+                    baseline = json.load(baseline_file)
+            except (OSError, ValueError) as error:
+                raise CommandError("Cannot read the baseline: {}".format(error))
+
+        # benchmark against a throwaway database, the same way tests run
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False,
+            keepdb=options['keepdb'])
+        try:
+            context = seed(options['users'], options['articles'])
+            results = run_benchmark(
+                context, options['iterations'], options['warmup'], options['only'],
+                options['upstream_delay_ms'] / 1000.0)
+        finally:
+            connection.creation.destroy_test_db(
+                old_name, verbosity=0, keepdb=options['keepdb'])
+
+        self.report(results)
+
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(results, output, indent=2, sort_keys=True)
+            self.stdout.write("Wrote {}.".format(options['output']))
+
+        if baseline is not None:
+            regressions = compare(
+                results, baseline, options['threshold'] / 100.0,
+                options['min_delta_ms'])
+            for endpoint, metric, before, after in regressions:
+                self.stdout.write(self.style.ERROR(
+                    "{} {}: {} -> {}".format(endpoint, metric, before, after)))
+            if regressions:
+                raise CommandError(
+                    "{} regression(s) against {}.".format(
+                        len(regressions), options['baseline']))
+            self.stdout.write(self.style.SUCCESS("No regressions."))
+
+    def report(self, results):
+        self.stdout.write("{:<68} {:>6} {:>9} {:>9} {:>9} {:>7} {:>8} {:>6}".format(
+            'endpoint', 'status', 'p50 ms', 'p95 ms', 'p99 ms', 'queries', 'bytes',
+            'cpu %'))
+        for endpoint, result in sorted(results['endpoints'].items()):
+            self.stdout.write(
+                "{:<68} {status:>6} {p50_ms:>9.2f} {p95_ms:>9.2f} {p99_ms:>9.2f} "
+                "{queries:>7} {bytes:>8} {cpu_percent:>6.1f}".format(endpoint, **result))
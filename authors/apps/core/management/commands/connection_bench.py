@@ -0,0 +1,50 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ...bench import benchmark_connections
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure how much of each request goes to opening a database "
+        "connection, with a new connection per request and with persistent "
+        "connections. Run it against the real database server, connection "
+        "setup over TLS is what it measures."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path', default='/api/articles/all/',
+            help='the GET route to request (default /api/articles/all/)')
+        parser.add_argument(
+            '--requests', type=int, default=50, help='requests made in each mode')
+        parser.add_argument(
+            '--database', default='default', help='the database alias to measure')
+        parser.add_argument(
+            '--token', help='send this token, for routes that need a user')
+        parser.add_argument(
+            '--output', help='write the results to this JSON file')
+
+    def handle(self, *args, **options):
+        if options['requests'] <= 0:
+            raise CommandError("--requests must be positive.")
+
+        headers = {}
+        if options['token']:
+            headers['HTTP_AUTHORIZATION'] = 'Token ' + options['token']
+
+        results = benchmark_connections(
+            options['path'], options['requests'], options['database'], headers)
+
+        self.stdout.write("{:<12} {:>11} {:>14} {:>9} {:>9}".format(
+            'mode', 'connections', 'connect ms/req', 'p50 ms', 'p95 ms'))
+        for mode in ('per request', 'persistent'):
+            self.stdout.write(
+                "{:<12} {connections:>11} {connect_ms_per_request:>14.3f} "
+                "{p50_ms:>9.3f} {p95_ms:>9.3f}".format(mode, **results[mode]))
+
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(results, output, indent=2, sort_keys=True)
+            self.stdout.write("Wrote {}.".format(options['output']))
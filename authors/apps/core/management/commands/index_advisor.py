@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from ...indexes import advise, benchmark_writes
+
+
+class Command(BaseCommand):
+    help = (
+        "EXPLAIN the queries the views run and report the indexes they are "
+        "missing and the indexes nothing uses."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--plans', action='store_true',
+            help='print the query plan of every query')
+        parser.add_argument(
+            '--write-benchmark', type=int, metavar='ROWS', default=0,
+            help='also time inserting and updating ROWS rows per table '
+                 '(rolled back afterwards)')
+
+    def report(self, advice):
+        if advice.missing:
+            self.stdout.write(self.style.WARNING("Missing indexes:"))
+            for shape in advice.missing:
+                self.stdout.write("  {} ({}) for {}".format(
+                    shape.model._meta.db_table, ", ".join(shape.columns), shape.name))
+        else:
+            self.stdout.write(self.style.SUCCESS("Every query is served by an index."))
+
+        if advice.unused:
+            self.stdout.write(self.style.WARNING("Unused indexes:"))
+            for table, name, columns in advice.unused:
+                self.stdout.write("  {} on {} ({})".format(name, table, ", ".join(columns)))
+        else:
+            self.stdout.write(self.style.SUCCESS("Every index is used by a query."))
+
+    def handle(self, *args, **options):
+        if options['write_benchmark'] < 0:
+            raise CommandError("--write-benchmark must be a positive number.")
+
+        advice = advise()
+
+        if options['plans']:
+            for name, lines in advice.plans.items():
+                self.stdout.write(name)
+                for line in lines:
+                    self.stdout.write("    {}".format(line))
+
+        self.report(advice)
+
+        if options['write_benchmark']:
+            self.stdout.write("Write throughput (rows/s):")
+            results = benchmark_writes(options['write_benchmark'])
+            for (table, operation), rate in sorted(results.items()):
+                self.stdout.write("  {:<14} {:<7} {:>10.0f}".format(table, operation, rate))
@@ -0,0 +1,67 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from ...seed import DatasetGenerator
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk load a synthetic dataset of users, follows, articles, tags, "
+        "ratings, likes, favourites, comments and notifications for scale "
+        "testing. Activity follows a power law: a few users write and a few "
+        "articles attract most of it."
+    )
+
+    sizes = (
+        ('users', 1000, 'users (each with a profile)'),
+        ('articles', 10000, 'articles, 90% of them published'),
+        ('follows', 20, 'follows made per user, on average'),
+        ('tags', 200, 'distinct tags, up to five per article'),
+        ('ratings', 20000, 'ratings'),
+        ('likes', 50000, 'likes and dislikes'),
+        ('favourites', 10000, 'favourites'),
+        ('comments', 30000, 'top level comments'),
+        ('replies', 15000, 'replies to comments'),
+        ('notifications', 50000, 'notifications, 70% of them read'),
+    )
+
+    def add_arguments(self, parser):
+        for name, default, help_text in self.sizes:
+            parser.add_argument(
+                '--{}'.format(name), type=int, default=default,
+                help='{} to generate (default {})'.format(help_text, default))
+        parser.add_argument(
+            '--alpha', type=float, default=1.1,
+            help='exponent of the power law, higher is more skewed (default 1.1)')
+        parser.add_argument(
+            '--days', type=int, default=365,
+            help='spread the creation times over this many days (default 365)')
+        parser.add_argument(
+            '--batch-size', type=int, default=5000,
+            help='rows inserted per query (default 5000)')
+        parser.add_argument(
+            '--seed', type=int, help='random seed, to generate the same dataset again')
+        parser.add_argument(
+            '--password', default='Seeded@2018', help='password of every seeded user')
+
+    def report_progress(self, table, count, elapsed):
+        self.stdout.write("  {:<14} {:>10} rows in {:.1f}s".format(table, count, elapsed))
+
+    def handle(self, *args, **options):
+        if options['users'] < 2:
+            raise CommandError("--users must be at least 2.")
+        if options['batch_size'] <= 0:
+            raise CommandError("--batch-size must be a positive number.")
+        negative = [name for name, _, _ in self.sizes if options[name] < 0]
+        if negative:
+            raise CommandError("--{} cannot be negative.".format(negative[0]))
+
+        names = [name for name, _, _ in self.sizes] + [
+            'alpha', 'days', 'batch_size', 'seed', 'password']
+        generator = DatasetGenerator(
+            progress=self.report_progress,
+            **{name: options[name] for name in names})
+
+        self.stdout.write("Seeding...")
+        counts = generator.generate()
+        self.stdout.write(self.style.SUCCESS(
+            "Seeded {} rows.".format(sum(counts.values()))))
@@ -0,0 +1,47 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ...startup import profile_imports
+
+
+class Command(BaseCommand):
+    help = (
+        "Report how long a worker takes to import the app, module by module. "
+        "The WSGI module and the URLconf are imported in a new interpreter "
+        "with the current settings."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--target', default='authors.wsgi', help='the module a worker imports first')
+        parser.add_argument(
+            '--no-urls', dest='urls', action='store_false',
+            help='leave out the URLconf, which is loaded on the first request')
+        parser.add_argument(
+            '--sort', choices=('cumulative', 'self'), default='cumulative',
+            help='order modules by time including their imports, or their own')
+        parser.add_argument(
+            '--limit', type=int, default=30, help='modules listed')
+        parser.add_argument(
+            '--output', help='write every module to this JSON file')
+
+    def handle(self, *args, **options):
+        try:
+            profile = profile_imports(options['target'], options['urls'])
+        except RuntimeError as error:
+            raise CommandError(str(error))
+
+        column = 2 if options['sort'] == 'cumulative' else 1
+        modules = sorted(profile['modules'], key=lambda module: module[column], reverse=True)
+
+        self.stdout.write("{:>10} {:>10}  {}".format('self ms', 'total ms', 'module'))
+        for name, own, cumulative in modules[:options['limit']]:
+            self.stdout.write("{:>10.1f} {:>10.1f}  {}".format(own * 1000, cumulative * 1000, name))
+        self.stdout.write("{} modules imported in {:.1f} ms.".format(
+            len(modules), profile['total'] * 1000))
+
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(profile, output, indent=2)
+            self.stdout.write("Wrote {}.".format(options['output']))
@@ -0,0 +1,233 @@
+import json
+import os
+import threading
+import time
+import uuid
+from collections import namedtuple
+
+from django.conf import settings
+
+# in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+SIZE_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100, 250, 1000)
+
+Metric = namedtuple('Metric', 'kind help buckets')
+
+METRICS = {
+    'http_requests_total': Metric(
+        'counter', 'Requests served, by route, method and status.', None),
+    'http_request_duration_seconds': Metric(
+        'histogram', 'Time taken to serve a request, by route and method.',
+        LATENCY_BUCKETS),
+    'db_queries_per_request': Metric(
+        'histogram', 'Database queries run by a request, by route.', SIZE_BUCKETS),
+    'db_query_duration_seconds': Metric(
+        'histogram', 'Time taken by each database query, by route.', QUERY_BUCKETS),
+    'db_connect_duration_seconds': Metric(
+        'histogram', 'Time taken to open a database connection, by database.',
+        LATENCY_BUCKETS),
+    'cache_requests_total': Metric(
+        'counter', 'Cache lookups, by cache and result (local_hit, shared_hit or miss).', None),
+    'email_send_duration_seconds': Metric(
+        'histogram', 'Time taken by Mailer.send.', LATENCY_BUCKETS),
+    'email_send_failures_total': Metric(
+        'counter', 'Calls to Mailer.send that raised.', None),
+    'notification_fanout_size': Metric(
+        'histogram', 'Notifications created for each published article.',
+        SIZE_BUCKETS),
+    'article_views_total': Metric(
+        'counter', 'Article reads counted, before they are written.', None),
+    'article_views_flushed_total': Metric(
+        'counter', 'Article reads written to the database.', None),
+    'article_views_dropped_total': Metric(
+        'counter', 'Article reads given up on after failed writes.', None),
+    'article_view_flushes_total': Metric(
+        'counter', 'Writes of the article reads counted by a process, by result (ok or failed).', None),
+    'article_view_flush_duration_seconds': Metric(
+        'histogram', 'Time taken to write the article reads counted by a process.',
+        LATENCY_BUCKETS),
+}
+
+
+def _key(name, labels):
+    return name, tuple(sorted((label, str(value)) for label, value in labels.items()))
+
+
+class Registry:
+    """
+    The metrics of this process.
+
+    Values are kept in memory and, when `METRICS_DIRECTORY` is set, written
+    to a file of their own in it at most every `METRICS_FLUSH_INTERVAL`
+    seconds. A scrape adds up the files of every process, so any gunicorn
+    worker can answer for all of them. Files of workers that have exited
+    keep counting, the directory should be emptied when the server is
+    restarted.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.pid = os.getpid()
+        self.filename = 'metrics-{}-{}.json'.format(self.pid, uuid.uuid4().hex[:8])
+        self.values = {}
+        self.flushed_at = time.monotonic()
+
+    def _check_fork(self):
+        # a worker forked from a process that already recorded metrics must
+        # not report the parent's values as its own
+        if os.getpid() != self.pid:
+            self._reset()
+
+    def inc(self, name, amount=1, **labels):
+        with self.lock:
+            self._check_fork()
+            key = _key(name, labels)
+            self.values[key] = self.values.get(key, 0) + amount
+        self._maybe_flush()
+
+    def observe(self, name, value, **labels):
+        buckets = METRICS[name].buckets
+        with self.lock:
+            self._check_fork()
+            key = _key(name, labels)
+            # a count per bucket, the last one for +Inf, then the sum
+            # and count
+            histogram = self.values.setdefault(key, [0] * (len(buckets) + 3))
+            index = next(
+                (position for position, bound in enumerate(buckets) if value <= bound),
+                len(buckets))
+            histogram[index] += 1
+            histogram[-2] += value
+            histogram[-1] += 1
+        self._maybe_flush()
+
+    def _directory(self):
+        return getattr(settings, 'METRICS_DIRECTORY', None)
+
+    def _maybe_flush(self):
+        interval = getattr(settings, 'METRICS_FLUSH_INTERVAL', 5)
+        if self._directory() and time.monotonic() - self.flushed_at >= interval:
+            self.flush()
+
+    def flush(self):
+        """ write this process's values to its file in `METRICS_DIRECTORY` """
+        directory = self._directory()
+        if not directory:
+            return
+        with self.lock:
+            self._check_fork()
+            rows = [[name, labels, value] for (name, labels), value in self.values.items()]
+            self.flushed_at = time.monotonic()
+
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, self.filename)
+        # readers never see a half written file
+        temporary = path + '.tmp'
+        with open(temporary, 'w') as output:
+            json.dump(rows, output)
+        os.replace(temporary, path)
+
+    def collect(self):
+        """ the values of every process, added up """
+        self.flush()
+        with self.lock:
+            totals = {key: _copy(value) for key, value in self.values.items()}
+
+        directory = self._directory()
+        if not directory or not os.path.isdir(directory):
+            return totals
+
+        for filename in os.listdir(directory):
+            if filename == self.filename or not filename.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(directory, filename)) as source:
+                    rows = json.load(source)
+            except (OSError, ValueError):
+                continue
+            for name, labels, value in rows:
+                if name in METRICS:
+                    _add(totals, (name, tuple(map(tuple, labels))), value)
+        return totals
+
+    def clear(self):
+        with self.lock:
+            self.values = {}
+
+
+def _copy(value):
+    return list(value) if isinstance(value, list) else value
+
+
+def _add(totals, key, value):
+    if key not in totals:
+        totals[key] = _copy(value)
+    elif isinstance(value, list):
+        totals[key] = [mine + theirs for mine, theirs in zip(totals[key], value)]
+    else:
+        totals[key] += value
+
+
+registry = Registry()
+inc = registry.inc
+observe = registry.observe
+
+
+def _escape(value):
+    return value.replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def _labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(
+        '{}="{}"'.format(label, _escape(value)) for label, value in pairs) + '}'
+
+
+def _number(value):
+    return repr(float(value))
+
+
+def render(values=None):
+    """ the metrics in the Prometheus text exposition format """
+    values = registry.collect() if values is None else values
+    lines = []
+    for name, metric in METRICS.items():
+        series = sorted(
+            (labels, value) for (metric_name, labels), value in values.items()
+            if metric_name == name)
+        lines.append('# HELP {} {}'.format(name, metric.help))
+        lines.append('# TYPE {} {}'.format(name, metric.kind))
+        for labels, value in series:
+            if metric.kind == 'counter':
+                lines.append('{}{} {}'.format(name, _labels(labels), _number(value)))
+                continue
+            cumulative = 0
+            bounds = [_number(bound) for bound in metric.buckets] + ['+Inf']
+            for bound, count in zip(bounds, value):
+                cumulative += count
+                lines.append('{}_bucket{} {}'.format(
+                    name, _labels(labels, [('le', bound)]), _number(cumulative)))
+            lines.append('{}_sum{} {}'.format(name, _labels(labels), _number(value[-2])))
+            lines.append('{}_count{} {}'.format(name, _labels(labels), _number(value[-1])))
+    return '\n'.join(lines) + '\n'
+
+
+def route_of(request):
+    """ the URL pattern a request matched, with its arguments named
+
+    `/api/articles/12/comment/` becomes `/api/articles/<article_id>/comment/`,
+    which keeps one series per route rather than one per URL.
+    """
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unmatched'
+
+    names = {str(value): '<{}>'.format(name) for name, value in match.kwargs.items()}
+    names.update({str(value): '<arg>' for value in match.args})
+    return '/'.join(names.get(part, part) for part in request.path.split('/'))
@@ -0,0 +1,99 @@
+import cProfile
+import os
+import random
+import re
+import uuid
+from time import perf_counter
+
+from django.conf import settings
+from django.utils import timezone
+
+from . import metrics
+from .timing import RequestTimer, execute_wrapper, install, set_timer
+
+
+class ServerTimingMiddleware:
+    """
+    Reports the database, serializer, renderer and total time of every
+    request in a `Server-Timing` header.
+
+    A share of the requests (`PROFILING_SAMPLE_RATE`) is also run under
+    cProfile and the stats are written to `PROFILING_DIRECTORY`. When
+    `PROFILING_ALLOW_HEADER` is on, a request can ask to be profiled with
+    an `X-Profile: 1` header. With both off, no profiler is ever started.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        install()
+
+    def should_profile(self, request):
+        if getattr(settings, 'PROFILING_ALLOW_HEADER', False) and \
+                request.META.get('HTTP_X_PROFILE') == '1':
+            return True
+        rate = getattr(settings, 'PROFILING_SAMPLE_RATE', 0)
+        return rate > 0 and random.random() < rate
+
+    def dump(self, profiler, request):
+        directory = settings.PROFILING_DIRECTORY
+        os.makedirs(directory, exist_ok=True)
+
+        path = re.sub(r'\W+', '-', request.path).strip('-')[:80] or 'root'
+        name = '{:%Y%m%d-%H%M%S}-{}-{}-{}.prof'.format(
+            timezone.now(), request.method, path, uuid.uuid4().hex[:8])
+        profiler.dump_stats(os.path.join(directory, name))
+
+    def __call__(self, request):
+        timer = RequestTimer()
+        profiler = cProfile.Profile() if self.should_profile(request) else None
+
+        set_timer(timer)
+        started = perf_counter()
+        try:
+            with execute_wrapper(timer):
+                if profiler is None:
+                    response = self.get_response(request)
+                else:
+                    response = profiler.runcall(self.get_response, request)
+        finally:
+            set_timer(None)
+
+        response['Server-Timing'] = timer.header(perf_counter() - started)
+        if profiler is not None:
+            self.dump(profiler, request)
+        return response
+
+
+class MetricsMiddleware:
+    """
+    Counts requests and records their latency and database queries, by
+    route, for the `/metrics` endpoint.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        durations = []
+
+        def record(execute, sql, params, many, context):
+            started = perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                durations.append(perf_counter() - started)
+
+        started = perf_counter()
+        with execute_wrapper(record):
+            response = self.get_response(request)
+        elapsed = perf_counter() - started
+
+        route = metrics.route_of(request)
+        metrics.inc('http_requests_total', route=route, method=request.method,
+                    status=response.status_code)
+        metrics.observe('http_request_duration_seconds', elapsed,
+                        route=route, method=request.method)
+        metrics.observe('db_queries_per_request', len(durations), route=route)
+        for duration in durations:
+            metrics.observe('db_query_duration_seconds', duration, route=route)
+        return response
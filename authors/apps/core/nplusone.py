@@ -0,0 +1,108 @@
+import logging
+import os
+import re
+import traceback
+from collections import Counter
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from .timing import execute_wrapper
+
+logger = logging.getLogger(__name__)
+
+# placeholders, quoted strings and numbers all become `?`, and lists of
+# them collapse so that `IN (?, ?)` and `IN (?, ?, ?)` share a shape
+_LITERALS = re.compile(r"%s|'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_LISTS = re.compile(r'\?(?:\s*,\s*\?)+')
+_SPACES = re.compile(r'\s+')
+
+# transaction housekeeping repeats on purpose
+_IGNORED = ('SAVEPOINT', 'RELEASE SAVEPOINT', 'ROLLBACK TO SAVEPOINT')
+
+_PROJECT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class NPlusOneError(AssertionError):
+    """ raised when a request runs the same query shape too many times """
+
+
+def fingerprint(sql):
+    """ the shape of a query, the same for every set of parameters """
+    shape = _LITERALS.sub('?', sql)
+    shape = _LISTS.sub('?', shape)
+    return _SPACES.sub(' ', shape).strip()
+
+
+def _project_stack():
+    # the frames of this project are the ones worth reading, the rest is
+    # Django and DRF calling into them
+    stack = traceback.extract_stack()[:-2]
+    frames = [frame for frame in stack if frame.filename.startswith(_PROJECT)]
+    return ''.join(traceback.format_list(frames or stack))
+
+
+class QueryShapeTracker:
+    """
+    A database execute wrapper that counts the queries of one request by
+    shape and remembers where each shape was first repeated.
+    """
+
+    def __init__(self, threshold):
+        self.threshold = threshold
+        self.counts = Counter()
+        self.first_repeats = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        if not sql.lstrip().upper().startswith(_IGNORED):
+            shape = fingerprint(sql)
+            self.counts[shape] += 1
+            if self.counts[shape] == 2:
+                self.first_repeats[shape] = _project_stack()
+        return execute(sql, params, many, context)
+
+    def offenders(self):
+        """ `(shape, count, stack of the first repeat)` of every repeated shape """
+        return [
+            (shape, count, self.first_repeats[shape])
+            for shape, count in self.counts.most_common()
+            if count > self.threshold
+        ]
+
+
+def describe(method, path, offenders):
+    return '\n\n'.join(
+        '{} {} ran this query {} times:\n    {}\nfirst repeated at:\n{}'.format(
+            method, path, count, shape, stack)
+        for shape, count, stack in offenders)
+
+
+class NPlusOneMiddleware:
+    """
+    Flags requests that run the same query shape more than
+    `NPLUSONE_THRESHOLD` times, the mark of a query made in a loop.
+
+    `NPLUSONE_MODE` is `warn` to log a warning, `raise` to raise
+    `NPlusOneError` (which fails the test that made the request), or None
+    to leave the middleware out.
+    """
+
+    def __init__(self, get_response):
+        self.mode = getattr(settings, 'NPLUSONE_MODE', None)
+        if self.mode not in ('warn', 'raise'):
+            raise MiddlewareNotUsed
+        self.threshold = getattr(settings, 'NPLUSONE_THRESHOLD', 5)
+        self.get_response = get_response
+
+    def __call__(self, request):
+        tracker = QueryShapeTracker(self.threshold)
+        with execute_wrapper(tracker):
+            response = self.get_response(request)
+
+        offenders = tracker.offenders()
+        if offenders:
+            message = describe(request.method, request.path, offenders)
+            if self.mode == 'raise':
+                raise NPlusOneError(message)
+            logger.warning(message)
+        return response
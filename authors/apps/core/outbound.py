@@ -0,0 +1,40 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
+_executor = None
+_lock = threading.Lock()
+
+
+def executor():
+    """ the thread pool of this process for calls to other services """
+    global _executor
+
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'OUTBOUND_MAX_WORKERS', 8),
+                thread_name_prefix='outbound')
+        return _executor
+
+
+def submit(function, *args, **kwargs):
+    """ start `function` on the outbound pool and return its future
+
+    For network calls that can run while the request does something else,
+    such as opening an SMTP connection during validation. They must not
+    use the database, its connections belong to the thread that opened
+    them.
+    """
+    return executor().submit(function, *args, **kwargs)
+
+
+def discard(future, cleanup):
+    """ give up on a call, passing its result to `cleanup` once it is ready """
+    def done(future):
+        if not future.cancelled() and future.exception() is None:
+            cleanup(future.result())
+
+    if not future.cancel():
+        future.add_done_callback(done)
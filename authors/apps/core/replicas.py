@@ -0,0 +1,179 @@
+import hashlib
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# seconds since the replica last applied a change from the primary, zero
+# on a server that is not replicating and on a replica that has applied
+# everything it received, which is the case of any replica while the
+# primary has nothing to write
+LAG_SQL = (
+    'SELECT CASE WHEN NOT pg_is_in_recovery() THEN 0 '
+    'WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 '
+    'ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END'
+)
+
+_local = threading.local()
+
+
+def replicas():
+    return getattr(settings, 'DATABASE_REPLICAS', [])
+
+
+def replica_lag(alias):
+    """ how far behind the primary a replica is, in seconds """
+    connection = connections[alias]
+    try:
+        with connection.cursor() as cursor:
+            if connection.vendor != 'postgresql':
+                cursor.execute('SELECT 1')
+                return 0.0
+            cursor.execute(LAG_SQL)
+            return float(cursor.fetchone()[0])
+    except DatabaseError:
+        # drop the broken connection, the next check opens a new one
+        connection.close()
+        raise
+
+
+class ReplicaHealth:
+    """
+    Remembers, for `REPLICA_HEALTH_INTERVAL` seconds, whether each replica
+    answered and was at most `REPLICA_MAX_LAG` seconds behind the primary.
+
+    Checks run inline, in the request that needs a replica, so replicas
+    should be given a short `connect_timeout` (see `REPLICA_CONNECT_TIMEOUT`)
+    for one that is down to be skipped without holding the request up.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.checked = {}
+
+    def is_healthy(self, alias):
+        interval = getattr(settings, 'REPLICA_HEALTH_INTERVAL', 5)
+        with self.lock:
+            checked_at, healthy = self.checked.get(alias, (None, False))
+            if checked_at is not None and time.monotonic() - checked_at < interval:
+                return healthy
+
+        try:
+            healthy = replica_lag(alias) <= getattr(settings, 'REPLICA_MAX_LAG', 10)
+        except DatabaseError:
+            healthy = False
+
+        with self.lock:
+            self.checked[alias] = (time.monotonic(), healthy)
+        return healthy
+
+    def reset(self):
+        with self.lock:
+            self.checked = {}
+
+
+health = ReplicaHealth()
+
+
+def _pin_key(request):
+    # tokens are unique to a user and long, so the digest of the header
+    # identifies the client without keeping the token itself
+    authorization = request.META.get('HTTP_AUTHORIZATION')
+    if not authorization:
+        return None
+    digest = hashlib.sha1(authorization.encode('utf-8')).hexdigest()
+    return 'replicas:pinned:{}'.format(digest)
+
+
+def _cookie():
+    return getattr(settings, 'REPLICA_PIN_COOKIE', 'primary_pinned')
+
+
+def is_pinned(request):
+    """ whether the client wrote recently enough to read from the primary """
+    if request.COOKIES.get(_cookie()):
+        return True
+    key = _pin_key(request)
+    return key is not None and cache.get(key) is not None
+
+
+def pin(request, response):
+    """ send the client's reads to the primary for `REPLICA_PIN_SECONDS` """
+    seconds = getattr(settings, 'REPLICA_PIN_SECONDS', 5)
+    response.set_cookie(_cookie(), '1', max_age=seconds, httponly=True)
+    key = _pin_key(request)
+    if key is not None:
+        cache.set(key, True, seconds)
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Lets the reads of GET, HEAD and OPTIONS requests go to a replica, and
+    pins a client to the primary for a few seconds after any other request
+    so that it reads what it just wrote.
+
+    Clients are recognised by their token, kept in the cache, and by a
+    cookie. Without a cache shared by the workers, a client sending no
+    cookies is only pinned on the worker that served its write.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        _local.use_replica = bool(replicas()) and \
+            request.method in SAFE_METHODS and not is_pinned(request)
+        _local.replica = None
+        try:
+            response = self.get_response(request)
+        finally:
+            _local.use_replica = False
+            _local.replica = None
+
+        if request.method not in SAFE_METHODS:
+            pin(request, response)
+        return response
+
+
+def choose_replica():
+    """ a healthy replica for this request's reads, or None
+
+    A request keeps reading from the replica it started with, so that it
+    does not see rows appear and disappear between replicas.
+    """
+    if _local.replica is None:
+        healthy = [alias for alias in replicas() if health.is_healthy(alias)]
+        _local.replica = random.choice(healthy) if healthy else DEFAULT_DB_ALIAS
+    return None if _local.replica == DEFAULT_DB_ALIAS else _local.replica
+
+
+class ReplicaRouter:
+    """
+    Sends writes to the primary, and reads to a replica when the
+    `ReplicaRoutingMiddleware` allows it. Reads outside of a request, such
+    as management commands, and reads inside a transaction always go to
+    the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        if not getattr(_local, 'use_replica', False):
+            return DEFAULT_DB_ALIAS
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return choose_replica() or DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, first, second, **hints):
+        # every database holds the same rows
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        # replicas receive their schema from the primary
+        return False if db in replicas() else None
@@ -0,0 +1,319 @@
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+
+import numpy as np
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.color import no_style
+from django.db import connection
+from django.db.models import Max
+from django.utils import timezone
+
+WORDS = (
+    'story writing author reader haven idea django python code review '
+    'design thought history science travel music food health sport culture '
+    'people market future learning teaching nature city data light world'
+).split()
+
+
+def power_law(size, alpha, rng):
+    """ Zipf-like probabilities over `size` items, in a random order
+
+    The most popular item is `2 ** alpha` times as likely as the second,
+    which makes a few users and articles account for most of the activity,
+    the way they do on a real site.
+    """
+    weights = 1.0 / np.arange(1, size + 1) ** alpha
+    rng.shuffle(weights)
+    return weights / weights.sum()
+
+
+def unique_pairs(first, second, modulus):
+    """ drop the repeated `(first, second)` pairs, `second` being below `modulus` """
+    keys = np.unique(first.astype(np.int64) * modulus + second)
+    return keys // modulus, keys % modulus
+
+
+@contextmanager
+def explicit_timestamps(*models):
+    """ let bulk_create keep the created and updated times it is given """
+    fields = [
+        field for model in models for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)
+    ]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class DatasetGenerator:
+    """
+    Bulk loads a synthetic, power-law shaped dataset.
+
+    Rows are written with `bulk_create` in batches and given their ids up
+    front, so that related rows can point at them without reading anything
+    back. Every user shares one password hash. The same `seed` always
+    generates the same dataset.
+    """
+
+    def __init__(self, users=1000, articles=10000, follows=20, tags=200,
+                 ratings=20000, likes=50000, favourites=10000, comments=30000,
+                 replies=15000, notifications=50000, alpha=1.1, days=365,
+                 batch_size=5000, seed=None, password='Seeded@2018',
+                 progress=None):
+        self.sizes = {
+            'users': users, 'articles': articles, 'tags': tags,
+            'ratings': ratings, 'likes': likes, 'favourites': favourites,
+            'comments': comments, 'replies': replies,
+            'notifications': notifications,
+        }
+        self.follows_per_user = follows
+        self.alpha = alpha
+        self.days = days
+        self.batch_size = batch_size
+        self.password = password
+        self.progress = progress
+        self.rng = np.random.RandomState(seed)
+        self.now = timezone.now()
+        self.counts = {}
+
+    def _report(self, table, count, started):
+        self.counts[table] = count
+        if self.progress is not None:
+            self.progress(table, count, time.monotonic() - started)
+
+    def _next_ids(self, model, count):
+        start = (model.objects.aggregate(top=Max('id'))['top'] or 0) + 1
+        return np.arange(start, start + count, dtype=np.int64)
+
+    def _times(self, count):
+        seconds = self.rng.uniform(0, self.days * 86400, count)
+        return [self.now - timedelta(seconds=float(offset)) for offset in seconds]
+
+    def _insert(self, model, table, count, build):
+        """ bulk insert `count` rows made by `build(start, stop)`, batch by batch """
+        started = time.monotonic()
+        for start in range(0, count, self.batch_size):
+            stop = min(start + self.batch_size, count)
+            # Django splits the batch further where the database needs it
+            model.objects.bulk_create(build(start, stop))
+        self._report(table, count, started)
+
+    def _text(self, words):
+        return ' '.join(self.rng.choice(WORDS, words))
+
+    def generate(self):
+        """ generate the whole dataset and return the rows made per table """
+        from authors.apps.articles.models import (
+            Article, ArticleFavourites, ArticleLikes, ChildComment, Comments, Rating)
+        from authors.apps.authentication.models import User
+        from authors.apps.notifications.counters import reconcile
+        from authors.apps.notifications.models import Notifications
+        from authors.apps.profiles.models import Profile
+
+        models = (
+            User, Profile, Article, Rating, ArticleLikes, ArticleFavourites,
+            Comments, ChildComment, Notifications)
+        with explicit_timestamps(*models):
+            self.users(User, Profile)
+            self.articles(Article)
+            self.tags(Article)
+            for table, model in (('ratings', Rating), ('likes', ArticleLikes),
+                                 ('favourites', ArticleFavourites)):
+                self.reactions(table, model)
+            self.comments(Comments, ChildComment)
+            self.notifications(Notifications)
+
+        # the ids were given explicitly, so sequences must catch up with them
+        with connection.cursor() as cursor:
+            for statement in connection.ops.sequence_reset_sql(no_style(), models):
+                cursor.execute(statement)
+
+        # notifications were inserted without signals, count them afresh
+        reconcile()
+        return self.counts
+
+    def users(self, User, Profile):
+        count = self.sizes['users']
+        self.user_ids = self._next_ids(User, count)
+        self.profile_ids = self._next_ids(Profile, count)
+        self.activity = power_law(count, self.alpha, self.rng)
+        joined = self._times(count)
+        password = make_password(self.password)
+
+        self._insert(User, 'users', count, lambda start, stop: [
+            User(id=int(self.user_ids[i]), username='seed_user_{}'.format(self.user_ids[i]),
+                 email='seed_user_{}@example.com'.format(self.user_ids[i]),
+                 password=password, is_verified=True,
+                 created_at=joined[i], updated_at=joined[i])
+            for i in range(start, stop)
+        ])
+
+        # popular profiles attract most follows
+        followers = self.rng.randint(0, count, count * self.follows_per_user)
+        followees = self.rng.choice(count, len(followers), p=self.activity)
+        keep = followers != followees
+        followers, followees = unique_pairs(followers[keep], followees[keep], count)
+        following_counts = np.bincount(followers, minlength=count)
+        follower_counts = np.bincount(followees, minlength=count)
+
+        self._insert(Profile, 'profiles', count, lambda start, stop: [
+            Profile(id=int(self.profile_ids[i]), user_id=int(self.user_ids[i]),
+                    bio=self._text(12), followers=int(follower_counts[i]),
+                    following=int(following_counts[i]),
+                    created_at=joined[i], updated_at=joined[i])
+            for i in range(start, stop)
+        ])
+
+        Follow = Profile.follows.through
+        self._insert(Follow, 'follows', len(followers), lambda start, stop: [
+            Follow(from_profile_id=int(self.profile_ids[followers[i]]),
+                   to_profile_id=int(self.profile_ids[followees[i]]))
+            for i in range(start, stop)
+        ])
+
+    def articles(self, Article):
+        count = self.sizes['articles']
+        self.article_ids = self._next_ids(Article, count)
+        self.popularity = power_law(count, self.alpha, self.rng) if count else None
+        authors = self.user_ids[self.rng.choice(len(self.user_ids), count, p=self.activity)]
+        published = self.rng.random_sample(count) < 0.9
+        written = self._times(count)
+        paragraphs = [self._text(60) for _ in range(20)]
+
+        def build(start, stop):
+            articles = [
+                Article(id=int(self.article_ids[i]),
+                        title='{} {}'.format(self._text(5), self.article_ids[i]),
+                        slug='seed-article-{}'.format(self.article_ids[i]),
+                        body='\n\n'.join(paragraphs[(i + part) % 20] for part in range(4)),
+                        description=paragraphs[i % 20][:200],
+                        published=bool(published[i]), author_id=int(authors[i]),
+                        created_at=written[i], updated_at=written[i])
+                for i in range(start, stop)
+            ]
+            # bulk inserts skip `save`, which keeps these
+            for article in articles:
+                article.update_text_fields()
+            return articles
+        self._insert(Article, 'articles', count, build)
+
+    def tags(self, Article):
+        from taggit.models import Tag, TaggedItem
+
+        count = self.sizes['tags']
+        if not count or not len(self.article_ids):
+            return
+
+        names = ['{}-{}'.format(WORDS[i % len(WORDS)], i) for i in range(count)]
+        existing = set(Tag.objects.filter(name__in=names).values_list('name', flat=True))
+        Tag.objects.bulk_create(
+            [Tag(name=name, slug=name) for name in names if name not in existing])
+        tag_ids = dict(Tag.objects.filter(name__in=names).values_list('name', 'id'))
+        tag_ids = np.array([tag_ids[name] for name in names])
+
+        # up to five tags an article, a few tags on most articles
+        per_article = self.rng.randint(0, 6, len(self.article_ids))
+        articles = np.repeat(np.arange(len(self.article_ids)), per_article)
+        tags = self.rng.choice(count, len(articles), p=power_law(count, self.alpha, self.rng))
+        articles, tags = unique_pairs(articles, tags, count)
+
+        content_type = ContentType.objects.get_for_model(Article)
+        self._insert(TaggedItem, 'tags', len(articles), lambda start, stop: [
+            TaggedItem(tag_id=int(tag_ids[tags[i]]), content_type_id=content_type.id,
+                       object_id=int(self.article_ids[articles[i]]))
+            for i in range(start, stop)
+        ])
+
+    def _interactions(self, count):
+        """ `count` distinct (article, user) pairs, popular articles first """
+        if not count or not len(self.article_ids):
+            return np.array([], int), np.array([], int), []
+        articles = self.rng.choice(len(self.article_ids), count, p=self.popularity)
+        users = self.rng.choice(len(self.user_ids), count, p=self.activity)
+        articles, users = unique_pairs(articles, users, len(self.user_ids))
+        return articles, users, self._times(len(articles))
+
+    def reactions(self, table, model):
+        articles, users, times = self._interactions(self.sizes[table])
+        values = self.rng.randint(1, 6, len(articles))
+
+        def build(start, stop):
+            rows = []
+            for i in range(start, stop):
+                article_id = int(self.article_ids[articles[i]])
+                author_id = int(self.user_ids[users[i]])
+                if table == 'ratings':
+                    rows.append(model(
+                        article_id_id=article_id, author_id=author_id,
+                        rating=int(values[i]), review=self._text(8),
+                        created_at=times[i], updated_at=times[i]))
+                elif table == 'likes':
+                    rows.append(model(
+                        article_id=article_id, author_id=author_id,
+                        article_like=bool(values[i] > 1),
+                        article_liked_at=times[i], like_updated_at=times[i]))
+                else:
+                    rows.append(model(
+                        article_id=article_id, author_id=author_id,
+                        article_favourite=True, article_favourited_at=times[i]))
+            return rows
+        self._insert(model, table, len(articles), build)
+
+    def comments(self, Comments, ChildComment):
+        count = self.sizes['comments']
+        if not count or not len(self.article_ids):
+            return
+        comment_ids = self._next_ids(Comments, count)
+        articles = self.rng.choice(len(self.article_ids), count, p=self.popularity)
+        authors = self.rng.choice(len(self.user_ids), count, p=self.activity)
+        times = self._times(count)
+
+        self._insert(Comments, 'comments', count, lambda start, stop: [
+            Comments(id=int(comment_ids[i]), body=self._text(20),
+                     article_id_id=int(self.article_ids[articles[i]]),
+                     author_id=int(self.user_ids[authors[i]]),
+                     created_at=times[i], updated_at=times[i])
+            for i in range(start, stop)
+        ])
+
+        # replies gather under a few popular comments
+        replies = self.sizes['replies']
+        parents = self.rng.choice(count, replies, p=power_law(count, self.alpha, self.rng))
+        repliers = self.rng.choice(len(self.user_ids), replies, p=self.activity)
+        reply_times = self._times(replies)
+        self._insert(ChildComment, 'replies', replies, lambda start, stop: [
+            ChildComment(body=self._text(15),
+                         article_id_id=int(self.article_ids[articles[parents[i]]]),
+                         parent_id_id=int(comment_ids[parents[i]]),
+                         author_id=int(self.user_ids[repliers[i]]),
+                         created_at=max(reply_times[i], times[parents[i]]),
+                         updated_at=max(reply_times[i], times[parents[i]]))
+            for i in range(start, stop)
+        ])
+
+    def notifications(self, Notifications):
+        count = self.sizes['notifications']
+        if not count or not len(self.article_ids):
+            return
+        articles = self.rng.choice(len(self.article_ids), count, p=self.popularity)
+        owners = self.rng.choice(len(self.user_ids), count, p=self.activity)
+        read = self.rng.random_sample(count) < 0.7
+        times = self._times(count)
+
+        self._insert(Notifications, 'notifications', count, lambda start, stop: [
+            Notifications(article_id_id=int(self.article_ids[articles[i]]),
+                          notification_title='A new article was published',
+                          notification_body=self._text(10),
+                          notification_owner_id=int(self.user_ids[owners[i]]),
+                          read_status=bool(read[i]),
+                          created_at=times[i], updated_at=times[i])
+            for i in range(start, stop)
+        ])
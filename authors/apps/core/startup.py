@@ -0,0 +1,73 @@
+"""
+Measures how long a worker takes to start, module by module.
+
+`profile_imports` imports the WSGI module, and the URLconf a worker loads
+on its first request, in a new interpreter. This module is also what that
+interpreter runs, so it imports nothing at the top that it would time.
+"""
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__)))))
+
+
+def _time_imports(target, urls=True):
+    """ import `target` in this interpreter, timing every module it loads """
+    import importlib
+    import _frozen_importlib as bootstrap
+
+    # the interpreter calls `_find_and_load` for every module that is not
+    # imported yet, the way `python -X importtime` times them
+    original = bootstrap._find_and_load
+    modules = []
+    children = []
+
+    def timed(name, import_):
+        children.append(0.0)
+        started = time.perf_counter()
+        try:
+            return original(name, import_)
+        finally:
+            elapsed = time.perf_counter() - started
+            nested = children.pop()
+            if children:
+                children[-1] += elapsed
+            modules.append((name, elapsed - nested, elapsed))
+
+    bootstrap._find_and_load = timed
+    started = time.perf_counter()
+    try:
+        importlib.import_module(target)
+        if urls:
+            from django.urls import get_resolver
+            get_resolver().url_patterns
+    finally:
+        bootstrap._find_and_load = original
+    return {'total': time.perf_counter() - started, 'modules': modules}
+
+
+def profile_imports(target='authors.wsgi', urls=True):
+    """ time the imports of a worker starting from `target`
+
+    Returns the seconds taken in all and, for each module imported, its
+    name, the seconds spent in its own code and the seconds including the
+    modules it imported. The settings are those of `DJANGO_SETTINGS_MODULE`.
+    """
+    command = [sys.executable, '-m', __name__, target]
+    if not urls:
+        command.append('--no-urls')
+    result = subprocess.run(
+        command, cwd=ROOT, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        universal_newlines=True)
+    if result.returncode:
+        raise RuntimeError("Importing {} failed:\n{}".format(target, result.stderr))
+    # whatever the imports print comes first
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+if __name__ == '__main__':
+    print(json.dumps(_time_imports(sys.argv[1], '--no-urls' not in sys.argv)))
@@ -0,0 +1,60 @@
+import smtplib
+
+from django.test import TestCase
+
+from authors.apps.email.email import Mailer
+from ..bench import (
+    LocalSMTP, compare, iter_routes, offline_services, percentile, run_benchmark,
+    seed)
+
+
+class TestBench(TestCase):
+    """ tests for the endpoint benchmark """
+
+    def test_percentile(self):
+        """ test if percentiles use the nearest rank """
+        values = list(range(1, 101))
+
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([3.0], 95), 3.0)
+
+    def test_routes(self):
+        """ test if every API route is found and the admin is left out """
+        routes = [route for route, pattern in iter_routes()]
+
+        self.assertIn('api/articles/<int:article_id>/comment/', routes)
+        self.assertIn('api/notifications/stream/', routes)
+        self.assertFalse(any(route.startswith('admin/') for route in routes))
+
+    def test_offline_services(self):
+        """ test if email is sent through the local stand-in """
+        with offline_services():
+            self.assertIs(smtplib.SMTP, LocalSMTP)
+            self.assertTrue(Mailer.verify_email_exists('nobody@nowhere.invalid'))
+            self.assertTrue(Mailer().send(
+                'nobody@example.com', 'subject', 'verify_email.html', {}))
+
+    def test_run_benchmark(self):
+        """ test if a run reports latency, queries and size per endpoint """
+        context = seed(users=3, articles=2)
+
+        results = run_benchmark(context, iterations=2, warmup=0, only='articles/all')
+
+        result = results['endpoints']['GET /api/articles/all/']
+        self.assertEqual(result['status'], 200)
+        self.assertGreater(result['queries'], 0)
+        self.assertGreater(result['bytes'], 0)
+        self.assertLessEqual(result['p50_ms'], result['p99_ms'])
+        self.assertEqual(len(results['endpoints']), 1)
+
+    def test_compare(self):
+        """ test if slower endpoints and extra queries are regressions """
+        def run(p95_ms, queries):
+            return {'endpoints': {'GET /api/user/': {'p95_ms': p95_ms, 'queries': queries}}}
+
+        self.assertEqual(compare(run(11, 2), run(10, 2)), [])
+        self.assertEqual(compare(run(10.5, 2), run(0.5, 2), min_delta_ms=20), [])
+        self.assertEqual(
+            compare(run(20, 3), run(10, 2)),
+            [('GET /api/user/', 'p95_ms', 10, 20), ('GET /api/user/', 'queries', 2, 3)])
@@ -0,0 +1,96 @@
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from ..cache import MISSING, LocalTier, Namespace, local
+
+LOCAL = {'BACKEND': 'default', 'LOCAL_SIZE': 2, 'LOCAL_TIMEOUT': 60}
+
+
+@override_settings(APP_CACHE=LOCAL)
+class TestCache(SimpleTestCase):
+    """ tests for the two tier cache """
+
+    def setUp(self):
+        cache.clear()
+        local.clear()
+        self.addCleanup(local.clear)
+        self.cache = Namespace('things')
+
+    def test_local_tier_is_bounded(self):
+        """ test if the least recently used value is dropped first """
+        tier = LocalTier()
+        tier.set('a', 1, 60)
+        tier.set('b', 2, 60)
+        tier.get('a')
+        tier.set('c', 3, 60)
+
+        self.assertEqual(tier.get('a'), 1)
+        self.assertIs(tier.get('b'), MISSING)
+        self.assertEqual(tier.get('c'), 3)
+
+    def test_local_tier_expires(self):
+        """ test if values are dropped once their timeout has passed """
+        tier = LocalTier()
+        tier.set('a', 1, 60)
+        with mock.patch('time.monotonic', return_value=time.monotonic() + 61):
+            self.assertIs(tier.get('a'), MISSING)
+
+    def test_tiers(self):
+        """ test if lookups try this process first, then the shared cache """
+        self.cache.set('one', 1)
+        self.assertEqual(self.cache.get('one'), 1)
+
+        local.clear()
+        self.assertEqual(self.cache.get_many(['one', 'two']), {'one': 1})
+        self.assertEqual(self.cache.get('one'), 1)
+        self.assertEqual(self.cache.stats, {'local_hit': 2, 'shared_hit': 1, 'miss': 1})
+
+    def test_get_or_set(self):
+        """ test if values are loaded once, then served from the cache """
+        load = mock.Mock(return_value={'title': 'cached'})
+
+        for _ in range(2):
+            self.assertEqual(self.cache.get_or_set('with spaces', load), {'title': 'cached'})
+        self.assertEqual(load.call_count, 1)
+
+    def test_get_many_or_load(self):
+        """ test if only the missing keys are loaded, all at once """
+        self.cache.set('one', 1)
+        load = mock.Mock(return_value={'two': 2})
+
+        values = self.cache.get_many_or_load(['one', 'two', 'three'], load)
+
+        self.assertEqual(values, {'one': 1, 'two': 2})
+        load.assert_called_once_with({'two', 'three'})
+        self.assertEqual(self.cache.get('two'), 2)
+
+    def test_delete(self):
+        """ test if a deleted value is gone from both tiers """
+        self.cache.set('one', 1)
+        self.cache.delete('one')
+        self.assertIsNone(self.cache.get('one'))
+
+    def test_invalidate(self):
+        """ test if bumping the version drops every value of the namespace """
+        other = Namespace('others')
+        self.cache.set_many({'one': 1, 'two': 2})
+        other.set('one', 1)
+
+        self.cache.invalidate()
+
+        self.assertEqual(self.cache.get_many(['one', 'two']), {})
+        self.assertEqual(other.get('one'), 1)
+
+    def test_invalidate_reaches_other_processes(self):
+        """ test if other processes see the new version once their copy expires """
+        self.cache.set('one', 1)
+        version = self.cache.version()
+        # another process bumps the version in the shared cache
+        cache.set(self.cache._version_key(), version + 1, None)
+
+        self.assertEqual(self.cache.get('one'), 1)
+        local.clear()
+        self.assertIsNone(self.cache.get('one'))
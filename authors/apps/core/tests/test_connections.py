@@ -0,0 +1,93 @@
+import os
+import shutil
+import tempfile
+import time
+import uuid
+from unittest import mock
+
+from django.db import OperationalError, connection
+from django.db.backends.sqlite3 import base as sqlite
+from django.test import SimpleTestCase, TestCase
+
+from ..bench import benchmark_connections
+from ..connections import PersistentConnectionMixin
+
+
+class DatabaseWrapper(PersistentConnectionMixin, sqlite.DatabaseWrapper):
+    pass
+
+
+class TestPersistentConnections(SimpleTestCase):
+    """ tests for bounded, health checked persistent connections """
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.name = os.path.join(directory, 'pool.sqlite3')
+        self.alias = 'pool-{}'.format(uuid.uuid4().hex)
+
+    def database(self, **pool):
+        wrapper = DatabaseWrapper({
+            'ENGINE': 'django.db.backends.sqlite3', 'NAME': self.name,
+            'CONN_MAX_AGE': 600, 'POOL': pool, 'OPTIONS': {}, 'AUTOCOMMIT': True,
+            'ATOMIC_REQUESTS': False, 'TIME_ZONE': None, 'USER': '', 'PASSWORD': '',
+            'HOST': '', 'PORT': '', 'TEST': {},
+        }, alias=self.alias)
+        self.addCleanup(wrapper.close)
+        return wrapper
+
+    def test_lifetime_jitter(self):
+        """ test if connections are recycled a little before CONN_MAX_AGE """
+        database = self.database(LIFETIME_JITTER=0.5)
+        started = time.time()
+        database.ensure_connection()
+
+        self.assertLessEqual(database.close_at, time.time() + 600)
+        self.assertGreaterEqual(database.close_at, started + 300)
+
+    def test_connection_limit(self):
+        """ test if a worker never opens more than MAX_CONNECTIONS at once """
+        first = self.database(MAX_CONNECTIONS=1, TIMEOUT=0.01)
+        second = self.database(MAX_CONNECTIONS=1, TIMEOUT=0.01)
+        first.ensure_connection()
+
+        with self.assertRaises(OperationalError):
+            second.ensure_connection()
+
+        first.close()
+        second.ensure_connection()
+        self.assertIsNotNone(second.connection)
+
+    def test_idle_connection_is_checked(self):
+        """ test if a connection left idle is pinged before it is reused """
+        database = self.database(MAX_CONNECTIONS=1, HEALTH_CHECK_AFTER=30)
+        database.ensure_connection()
+
+        with mock.patch.object(database, 'is_usable', return_value=False) as is_usable:
+            # just used, so trusted
+            database.close_if_unusable_or_obsolete()
+            self.assertFalse(is_usable.called)
+            self.assertIsNotNone(database.connection)
+
+            database.checked_at -= 60
+            database.close_if_unusable_or_obsolete()
+            self.assertTrue(is_usable.called)
+            self.assertIsNone(database.connection)
+
+        # the broken connection gave its slot back
+        self.database(MAX_CONNECTIONS=1, TIMEOUT=0.01).ensure_connection()
+
+
+class TestConnectionBenchmark(TestCase):
+    """ tests for the connection setup benchmark """
+
+    def test_benchmark(self):
+        """ test if both modes are measured and the settings restored """
+        max_age = connection.settings_dict['CONN_MAX_AGE']
+        results = benchmark_connections('/api/articles/all/', requests=3)
+
+        self.assertEqual(set(results), {'per request', 'persistent'})
+        for result in results.values():
+            self.assertEqual(
+                set(result), {'connections', 'connect_ms_per_request', 'p50_ms', 'p95_ms'})
+        self.assertEqual(connection.settings_dict['CONN_MAX_AGE'], max_age)
@@ -0,0 +1,58 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from authors.apps.articles.models import Article, Comments
+from ..indexes import QueryShape, advise, benchmark_writes
+
+
+class TestIndexAdvisor(TestCase):
+    """ tests for the index advisor """
+
+    def test_schema_serves_every_query(self):
+        """ test if the migrated schema has no missing or unused indexes """
+        advice = advise()
+
+        self.assertEqual(advice.missing, [])
+        self.assertEqual(advice.unused, [])
+        self.assertIn("a user's notifications", advice.plans)
+
+    def test_reports_missing_index(self):
+        """ test if a query no index leads with is reported as missing """
+        shape = QueryShape(
+            'comments by body', Comments, ('body',),
+            lambda: Comments.objects.filter(body='text'), ())
+
+        advice = advise([shape])
+
+        self.assertEqual(advice.missing, [shape])
+
+    def test_reports_unused_index(self):
+        """ test if indexes the given queries do not use are reported """
+        shape = QueryShape(
+            'articles by author', Article, ('author_id',),
+            lambda: Article.objects.filter(author_id=1), ())
+
+        advice = advise([shape])
+
+        self.assertIn(
+            ('articles_article', 'article_published_created_idx',
+             ['published', 'created_at']),
+            advice.unused)
+
+    def test_benchmark_rolls_back(self):
+        """ test if the write benchmark leaves no rows behind """
+        results = benchmark_writes(rows=3)
+
+        self.assertIn(('articles', 'insert'), results)
+        self.assertIn(('notifications', 'update'), results)
+        self.assertEqual(Article.objects.count(), 0)
+
+    def test_command(self):
+        """ test if the command prints its report """
+        out = StringIO()
+        call_command('index_advisor', '--plans', stdout=out)
+
+        self.assertIn("Every query is served by an index.", out.getvalue())
+        self.assertIn("Every index is used by a query.", out.getvalue())
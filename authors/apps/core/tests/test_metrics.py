@@ -0,0 +1,146 @@
+import re
+import shutil
+import smtplib
+import tempfile
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from authors.apps.articles.tests.base import BaseTest
+from authors.apps.email.email import Mailer
+from authors.apps.profiles.snapshots import get_profile_snapshots
+from .. import metrics
+
+
+def sample(text, name, **labels):
+    """ the value of one series in an exposition, or None """
+    wanted = {label: str(value) for label, value in labels.items()}
+    for line in text.splitlines():
+        match = re.match(r'(\w+)(?:\{(.*)\})? (\S+)$', line)
+        if match and match.group(1) == name and \
+                dict(re.findall(r'(\w+)="([^"]*)"', match.group(2) or '')) == wanted:
+            return float(match.group(3))
+    return None
+
+
+@override_settings(METRICS_TOKEN='scrape-secret')
+class TestMetrics(BaseTest):
+    """ tests for the metrics endpoint and what it records """
+
+    def setUp(self):
+        super(TestMetrics, self).setUp()
+        cache.clear()
+        metrics.registry.clear()
+
+    def scrape(self):
+        response = self.test_client.get('/metrics', HTTP_AUTHORIZATION='Bearer scrape-secret')
+        self.assertEqual(response.status_code, 200)
+        return response.content.decode()
+
+    def test_records_requests_by_route(self):
+        """ test if requests are counted and timed by route and status """
+        self.test_client.get('/api/articles/1/comment/')
+        self.test_client.get('/api/articles/2/comment/')
+        self.test_client.get('/api/no-such-page/')
+
+        text = self.scrape()
+        route = '/api/articles/<article_id>/comment/'
+        self.assertEqual(sample(
+            text, 'http_requests_total', route=route, method='GET', status='404'), 2.0)
+        self.assertEqual(sample(
+            text, 'http_requests_total', route='unmatched', method='GET', status='404'), 1.0)
+        self.assertEqual(sample(
+            text, 'http_request_duration_seconds_count', route=route, method='GET'), 2.0)
+        self.assertEqual(sample(
+            text, 'http_request_duration_seconds_bucket', route=route, method='GET',
+            le='+Inf'), 2.0)
+        self.assertGreater(sample(text, 'db_queries_per_request_sum', route=route), 0)
+        self.assertIn('# TYPE db_query_duration_seconds histogram', text)
+
+    def test_records_cache_lookups(self):
+        """ test if profile snapshot cache hits and misses are counted """
+        get_profile_snapshots(['Aurthurs'])
+        get_profile_snapshots(['Aurthurs'])
+
+        text = self.scrape()
+        self.assertEqual(sample(
+            text, 'cache_requests_total', cache='profile_snapshots', result='shared_hit'), 1.0)
+        self.assertEqual(sample(
+            text, 'cache_requests_total', cache='profile_snapshots', result='miss'), 1.0)
+
+    def test_records_email_failures(self):
+        """ test if emails that fail to send are counted and timed """
+        mailer = Mailer.__new__(Mailer)
+        with mock.patch.object(Mailer, '_send', side_effect=smtplib.SMTPException):
+            with self.assertRaises(smtplib.SMTPException):
+                mailer.send('bev@example.com', 'subject', 'verify_email.html', {})
+
+        text = self.scrape()
+        self.assertEqual(sample(text, 'email_send_failures_total'), 1.0)
+        self.assertEqual(sample(text, 'email_send_duration_seconds_count'), 1.0)
+
+    def test_token(self):
+        """ test if a configured token is required to scrape """
+        self.assertEqual(self.test_client.get('/metrics').status_code, 403)
+        self.assertEqual(self.test_client.get(
+            '/metrics', HTTP_AUTHORIZATION='Bearer wrong').status_code, 403)
+        self.scrape()
+
+    @override_settings(METRICS_TOKEN=None)
+    def test_no_token(self):
+        """ test if metrics are only served without a token while debugging """
+        self.assertEqual(self.test_client.get('/metrics').status_code, 403)
+        with self.settings(DEBUG=True):
+            self.assertEqual(self.test_client.get('/metrics').status_code, 200)
+
+
+class TestRegistry(TestCase):
+    """ tests for aggregating metrics across processes """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def test_histogram_buckets_are_cumulative(self):
+        """ test if histogram buckets count every value at or below them """
+        registry = metrics.Registry()
+        for size in (0, 3, 3, 2000):
+            registry.observe('notification_fanout_size', size)
+
+        text = metrics.render(registry.collect())
+        self.assertEqual(sample(text, 'notification_fanout_size_bucket', le='0.0'), 1.0)
+        self.assertEqual(sample(text, 'notification_fanout_size_bucket', le='2.0'), 1.0)
+        self.assertEqual(sample(text, 'notification_fanout_size_bucket', le='5.0'), 3.0)
+        self.assertEqual(sample(text, 'notification_fanout_size_bucket', le='1000.0'), 3.0)
+        self.assertEqual(sample(text, 'notification_fanout_size_bucket', le='+Inf'), 4.0)
+        self.assertEqual(sample(text, 'notification_fanout_size_sum'), 2006.0)
+
+    def test_adds_up_workers(self):
+        """ test if a scrape reports the values of every worker """
+        with override_settings(METRICS_DIRECTORY=self.directory):
+            first, second = metrics.Registry(), metrics.Registry()
+            first.inc('email_send_failures_total')
+            first.observe('notification_fanout_size', 3)
+            second.inc('email_send_failures_total', 2)
+            second.observe('notification_fanout_size', 4)
+            first.flush()
+
+            text = metrics.render(second.collect())
+        self.assertEqual(sample(text, 'email_send_failures_total'), 3.0)
+        self.assertEqual(sample(text, 'notification_fanout_size_count'), 2.0)
+        self.assertEqual(sample(text, 'notification_fanout_size_sum'), 7.0)
+
+    def test_forked_worker_starts_empty(self):
+        """ test if a forked worker does not report its parent's values """
+        registry = metrics.Registry()
+        registry.inc('email_send_failures_total', 5)
+        filename = registry.filename
+
+        # as if the registry had been inherited through a fork
+        registry.pid = -1
+        registry.inc('email_send_failures_total')
+
+        self.assertNotEqual(registry.filename, filename)
+        self.assertEqual(sample(
+            metrics.render(registry.collect()), 'email_send_failures_total'), 1.0)
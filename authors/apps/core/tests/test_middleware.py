@@ -0,0 +1,77 @@
+import os
+import re
+import shutil
+import tempfile
+
+from django.test import TestCase, override_settings
+
+from authors.apps.articles.tests.base import BaseTest
+from ..timing import RequestTimer
+
+
+class TestServerTiming(BaseTest):
+    """ tests for the Server-Timing middleware """
+
+    def setUp(self):
+        super(TestServerTiming, self).setUp()
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def timings(self, response):
+        return {
+            name: float(duration) for name, duration in re.findall(
+                r'(\w+);(?:desc="[^"]*";)?dur=([\d.]+)', response['Server-Timing'])
+        }
+
+    def test_reports_timings(self):
+        """ test if every response reports its db, serializer and render time """
+        response = self.test_client.get("/api/user/", **self.user_logged_in)
+
+        timings = self.timings(response)
+        self.assertEqual(
+            set(timings), {'db', 'serializer', 'render', 'total'})
+        self.assertGreater(timings['serializer'], 0)
+        self.assertGreater(timings['render'], 0)
+        self.assertGreaterEqual(timings['total'], timings['render'])
+        queries = re.search(r'db;desc="(\d+) queries"', response['Server-Timing'])
+        self.assertGreater(int(queries.group(1)), 0)
+
+    def test_no_profile_by_default(self):
+        """ test if requests are not profiled unless sampled or asked to """
+        with override_settings(PROFILING_DIRECTORY=self.directory):
+            self.test_client.get("/api/articles/all/", HTTP_X_PROFILE='1')
+
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def test_sampled_profile(self):
+        """ test if sampled requests dump a cProfile of themselves """
+        with override_settings(PROFILING_DIRECTORY=self.directory,
+                               PROFILING_SAMPLE_RATE=1):
+            self.test_client.get("/api/articles/all/")
+
+        files = os.listdir(self.directory)
+        self.assertEqual(len(files), 1)
+        self.assertIn('GET-api-articles-all', files[0])
+
+    def test_profile_header(self):
+        """ test if a request can ask to be profiled when that is allowed """
+        with override_settings(PROFILING_DIRECTORY=self.directory,
+                               PROFILING_ALLOW_HEADER=True):
+            self.test_client.get("/api/articles/all/")
+            self.test_client.get("/api/articles/all/", HTTP_X_PROFILE='1')
+
+        self.assertEqual(len(os.listdir(self.directory)), 1)
+
+
+class TestRequestTimer(TestCase):
+    """ tests for the request timer """
+
+    def test_header(self):
+        """ test if the header is in milliseconds """
+        timer = RequestTimer()
+        timer.db, timer.queries, timer.serializer = 0.0125, 3, 0.002
+
+        self.assertEqual(
+            timer.header(0.05),
+            'db;desc="3 queries";dur=12.50, serializer;dur=2.00, '
+            'render;dur=0.00, total;dur=50.00')
@@ -0,0 +1,83 @@
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+
+from authors.apps.authentication.models import User
+from ..nplusone import NPlusOneError, NPlusOneMiddleware, QueryShapeTracker, fingerprint
+
+
+def lookup_users_one_by_one(request):
+    for user_id in range(1, 6):
+        User.objects.filter(pk=user_id).first()
+    return HttpResponse()
+
+
+def lookup_users_at_once(request):
+    list(User.objects.filter(pk__in=range(1, 6)))
+    return HttpResponse()
+
+
+class TestNPlusOne(TestCase):
+    """ tests for the N+1 query detector """
+
+    def setUp(self):
+        self.request = RequestFactory().get('/api/articles/')
+
+    def test_fingerprint(self):
+        """ test if queries differing only in their values share a shape """
+        self.assertEqual(
+            fingerprint('SELECT * FROM "user" WHERE "id" = 1 AND "name" = \'it\'\'s\''),
+            fingerprint('SELECT *  FROM "user"\nWHERE "id" = 42 AND "name" = %s'))
+        self.assertEqual(
+            fingerprint('SELECT * FROM "user" WHERE "id" IN (%s, %s)'),
+            fingerprint('SELECT * FROM "user" WHERE "id" IN (%s, %s, %s)'))
+        self.assertNotEqual(
+            fingerprint('SELECT * FROM "user" WHERE "id" = 1'),
+            fingerprint('SELECT * FROM "article" WHERE "id" = 1'))
+
+    def test_tracker_reports_repeated_shapes(self):
+        """ test if shapes over the threshold are reported with where they repeated """
+        tracker = QueryShapeTracker(threshold=3)
+        execute = lambda *args: None  # noqa: E731
+        for user_id in range(4):
+            tracker(execute, 'SELECT * FROM "user" WHERE "id" = %s', [user_id], False, {})
+        tracker(execute, 'SELECT * FROM "article"', [], False, {})
+        tracker(execute, 'SAVEPOINT "s1"', [], False, {})
+        tracker(execute, 'SAVEPOINT "s2"', [], False, {})
+
+        offenders = tracker.offenders()
+        self.assertEqual(len(offenders), 1)
+        shape, count, stack = offenders[0]
+        self.assertEqual(shape, 'SELECT * FROM "user" WHERE "id" = ?')
+        self.assertEqual(count, 4)
+        self.assertIn('test_nplusone.py', stack)
+
+    @override_settings(NPLUSONE_MODE='raise', NPLUSONE_THRESHOLD=3)
+    def test_raises_on_queries_in_a_loop(self):
+        """ test if a request querying in a loop raises in raise mode """
+        middleware = NPlusOneMiddleware(lookup_users_one_by_one)
+        with self.assertRaises(NPlusOneError) as context:
+            middleware(self.request)
+        self.assertIn('GET /api/articles/ ran this query 5 times', str(context.exception))
+        self.assertIn('lookup_users_one_by_one', str(context.exception))
+
+    @override_settings(NPLUSONE_MODE='raise', NPLUSONE_THRESHOLD=3)
+    def test_allows_batched_queries(self):
+        """ test if a request loading rows in one query passes """
+        middleware = NPlusOneMiddleware(lookup_users_at_once)
+        self.assertEqual(middleware(self.request).status_code, 200)
+
+    @override_settings(NPLUSONE_MODE='warn', NPLUSONE_THRESHOLD=3)
+    def test_warns_on_queries_in_a_loop(self):
+        """ test if a request querying in a loop is logged in warn mode """
+        middleware = NPlusOneMiddleware(lookup_users_one_by_one)
+        with self.assertLogs('authors.apps.core.nplusone', 'WARNING') as logs:
+            response = middleware(self.request)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('ran this query 5 times', logs.output[0])
+
+    @override_settings(NPLUSONE_MODE=None)
+    def test_off_by_default(self):
+        """ test if the middleware leaves itself out when no mode is set """
+        with self.assertRaises(MiddlewareNotUsed):
+            NPlusOneMiddleware(lookup_users_one_by_one)
@@ -0,0 +1,85 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import DatabaseError
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from authors.apps.authentication.models import User
+from ..replicas import ReplicaRouter, ReplicaRoutingMiddleware, health
+
+router = ReplicaRouter()
+
+
+def read_database(request):
+    """ answer with the database the request's reads were routed to """
+    return HttpResponse(router.db_for_read(User))
+
+
+@override_settings(DATABASE_REPLICAS=['replica'], REPLICA_PIN_SECONDS=5)
+class TestReplicaRouting(SimpleTestCase):
+    """ tests for routing reads to replicas """
+
+    def setUp(self):
+        cache.clear()
+        health.reset()
+        self.factory = RequestFactory()
+        self.middleware = ReplicaRoutingMiddleware(read_database)
+        patcher = mock.patch('authors.apps.core.replicas.replica_lag', return_value=0.5)
+        self.replica_lag = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def read_from(self, request):
+        return self.middleware(request).content.decode()
+
+    def test_reads_go_to_replicas(self):
+        """ test if the reads of a GET request go to a replica """
+        self.assertEqual(self.read_from(self.factory.get('/api/articles/')), 'replica')
+
+    def test_other_requests_use_the_primary(self):
+        """ test if the reads of a request that may write go to the primary """
+        self.assertEqual(self.read_from(self.factory.post('/api/articles/')), 'default')
+
+    def test_writes_and_other_reads_use_the_primary(self):
+        """ test if writes and reads outside of a request go to the primary """
+        self.assertEqual(router.db_for_write(User), 'default')
+        self.assertEqual(router.db_for_read(User), 'default')
+
+    def test_pinned_after_writing(self):
+        """ test if a client that wrote reads from the primary for a while """
+        token = {'HTTP_AUTHORIZATION': 'Token written'}
+        response = self.middleware(self.factory.post('/api/articles/', **token))
+        self.assertEqual(response.cookies['primary_pinned']['max-age'], 5)
+
+        # by token, for clients that do not keep cookies
+        self.assertEqual(self.read_from(self.factory.get('/api/articles/', **token)), 'default')
+        self.assertEqual(self.read_from(self.factory.get(
+            '/api/articles/', HTTP_AUTHORIZATION='Token other')), 'replica')
+
+        # and by cookie
+        request = self.factory.get('/api/articles/')
+        request.COOKIES['primary_pinned'] = '1'
+        self.assertEqual(self.read_from(request), 'default')
+
+    @override_settings(REPLICA_MAX_LAG=10)
+    def test_lagging_replica_is_skipped(self):
+        """ test if a replica too far behind the primary is not read from """
+        self.replica_lag.return_value = 30
+        self.assertEqual(self.read_from(self.factory.get('/api/articles/')), 'default')
+
+    def test_unreachable_replica_is_skipped(self):
+        """ test if the primary answers when the replica cannot """
+        self.replica_lag.side_effect = DatabaseError
+        self.assertEqual(self.read_from(self.factory.get('/api/articles/')), 'default')
+
+    @override_settings(REPLICA_HEALTH_INTERVAL=60)
+    def test_health_is_checked_once_an_interval(self):
+        """ test if replica health is remembered between requests """
+        for _ in range(3):
+            self.read_from(self.factory.get('/api/articles/'))
+        self.assertEqual(self.replica_lag.call_count, 1)
+
+    def test_replicas_are_not_migrated(self):
+        """ test if migrations only run on the primary """
+        self.assertFalse(router.allow_migrate('replica', 'articles'))
+        self.assertIsNone(router.allow_migrate('default', 'articles'))
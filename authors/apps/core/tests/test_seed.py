@@ -0,0 +1,74 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import transaction
+from django.db.models import F
+from django.test import TestCase
+
+from authors.apps.articles.models import Article, ChildComment
+from authors.apps.authentication.models import User
+from authors.apps.notifications.models import Notifications, UnreadNotificationCount
+from authors.apps.profiles.models import Profile
+from ..seed import DatasetGenerator
+
+
+class TestSeed(TestCase):
+    """ tests for the synthetic dataset generator """
+
+    sizes = dict(
+        users=20, articles=30, follows=3, tags=5, ratings=40, likes=40,
+        favourites=20, comments=25, replies=15, notifications=30)
+
+    def generate(self, **options):
+        return DatasetGenerator(batch_size=7, **dict(self.sizes, **options)).generate()
+
+    def test_generates_related_rows(self):
+        """ test if every table is filled and the rows fit together """
+        counts = self.generate(seed=3)
+
+        self.assertEqual(User.objects.count(), 20)
+        self.assertEqual(Profile.objects.count(), 20)
+        self.assertEqual(Article.objects.count(), 30)
+        self.assertEqual(counts['replies'], ChildComment.objects.count())
+        self.assertFalse(ChildComment.objects.exclude(
+            article_id=F('parent_id__article_id')).exists())
+        self.assertFalse(Profile.follows.through.objects.filter(
+            from_profile=F('to_profile')).exists())
+
+        for profile in Profile.objects.all():
+            self.assertEqual(profile.followers, profile.followed_by.count())
+
+        # one password hash shared by everybody and working for all of them
+        self.assertEqual(User.objects.values('password').distinct().count(), 1)
+        self.assertTrue(User.objects.first().check_password('Seeded@2018'))
+
+    def test_counts_unread_notifications(self):
+        """ test if the unread counters match the notifications inserted """
+        self.generate(seed=3)
+
+        for counter in UnreadNotificationCount.objects.all():
+            self.assertEqual(counter.unread_count, Notifications.objects.filter(
+                notification_owner=counter.notification_owner_id,
+                read_status=False).count())
+
+    def test_same_seed_same_dataset(self):
+        """ test if a seed generates the same dataset every time """
+        def dataset():
+            with transaction.atomic():
+                self.generate(seed=11)
+                rows = list(Article.objects.order_by('id').values_list(
+                    'title', 'author__username', 'published'))
+                transaction.set_rollback(True)
+            return rows
+
+        self.assertEqual(dataset(), dataset())
+
+    def test_command(self):
+        """ test if the command reports what it seeded """
+        out = StringIO()
+        call_command(
+            'seed', '--users', '5', '--articles', '5', '--comments', '5',
+            '--replies', '2', '--notifications', '5', '--seed', '1', stdout=out)
+
+        self.assertIn("Seeded", out.getvalue())
+        self.assertEqual(Article.objects.count(), 5)
@@ -0,0 +1,32 @@
+import smtplib
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from authors.apps.email.email import Mailer
+from ..startup import profile_imports
+
+
+class TestStartup(SimpleTestCase):
+    """ tests for importing the app quickly and without other services """
+
+    def test_profile_imports(self):
+        """ test if a worker boots without SMTP and without the social clients """
+        # the new interpreter has no stand-in for SMTP, so a connection
+        # opened while importing would fail the import
+        profile = profile_imports()
+        names = [name for name, own, cumulative in profile['modules']]
+
+        self.assertIn('authors.urls', names)
+        self.assertIn('authors.apps.authentication.views', names)
+        self.assertNotIn('google.oauth2.id_token', names)
+        self.assertNotIn('facebook', names)
+        for name, own, cumulative in profile['modules']:
+            self.assertLessEqual(own, cumulative)
+        self.assertGreater(profile['total'], 0)
+
+    def test_mailer_connects_when_sending(self):
+        """ test if creating a Mailer leaves SMTP alone """
+        with mock.patch.object(smtplib, 'SMTP', side_effect=OSError) as smtp:
+            Mailer()
+        self.assertFalse(smtp.called)
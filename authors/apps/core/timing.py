@@ -0,0 +1,100 @@
+import functools
+import threading
+from contextlib import ExitStack, contextmanager
+from time import perf_counter
+
+from django.db import connections
+
+_local = threading.local()
+_installed = False
+
+
+class RequestTimer:
+    """
+    Collects where the time of one request goes.
+
+    It is installed as a database execute wrapper for the request, which
+    counts and times every query. Serializer and renderer time come from
+    the DRF methods wrapped by `install()`. Serializer time includes the
+    queries a serializer makes, so the parts can add up to more than the
+    total.
+    """
+
+    def __init__(self):
+        self.db = 0.0
+        self.queries = 0
+        self.serializer = 0.0
+        self.render = 0.0
+        self.measuring = False
+
+    def __call__(self, execute, sql, params, many, context):
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db += perf_counter() - started
+            self.queries += 1
+
+    def header(self, total):
+        """ the timings as a `Server-Timing` header value, in milliseconds """
+        return ', '.join([
+            'db;desc="{} queries";dur={:.2f}'.format(self.queries, self.db * 1000),
+            'serializer;dur={:.2f}'.format(self.serializer * 1000),
+            'render;dur={:.2f}'.format(self.render * 1000),
+            'total;dur={:.2f}'.format(total * 1000),
+        ])
+
+
+@contextmanager
+def execute_wrapper(wrapper):
+    """ install a database execute wrapper on every configured database """
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(wrapper))
+        yield
+
+
+def current_timer():
+    return getattr(_local, 'timer', None)
+
+
+def set_timer(timer):
+    _local.timer = timer
+
+
+def _timed(kind, function):
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        timer = current_timer()
+        # nested serializers are timed by the outermost one only
+        if timer is None or timer.measuring:
+            return function(*args, **kwargs)
+
+        timer.measuring = True
+        started = perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            setattr(timer, kind, getattr(timer, kind) + perf_counter() - started)
+            timer.measuring = False
+    return wrapper
+
+
+def install():
+    """ time DRF validation, serialization and rendering from now on
+
+    Outside of a timed request the wrappers only look up the thread's
+    timer, so they cost next to nothing.
+    """
+    global _installed
+    if _installed:
+        return
+
+    from rest_framework.response import Response
+    from rest_framework.serializers import BaseSerializer
+
+    BaseSerializer.is_valid = _timed('serializer', BaseSerializer.is_valid)
+    BaseSerializer.data = property(_timed('serializer', BaseSerializer.data.fget))
+    Response.rendered_content = property(
+        _timed('render', Response.rendered_content.fget))
+    _installed = True
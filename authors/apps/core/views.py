@@ -0,0 +1,25 @@
+import hmac
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+
+from . import metrics
+
+
+def metrics_view(request):
+    """ the metrics of every worker, for Prometheus to scrape
+
+    The scraper has to send `METRICS_TOKEN` as a bearer token. Without a
+    token configured, metrics are only served while `DEBUG` is on.
+    """
+    token = getattr(settings, 'METRICS_TOKEN', None)
+    if not token:
+        if not settings.DEBUG:
+            return HttpResponseForbidden()
+    else:
+        given = request.META.get('HTTP_AUTHORIZATION', '')
+        if not hmac.compare_digest(given.encode(), 'Bearer {}'.format(token).encode()):
+            return HttpResponseForbidden()
+
+    return HttpResponse(
+        metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -1,12 +1,15 @@
 import os
 import smtplib
 from datetime import datetime, timedelta
+from time import perf_counter
 from validate_email import validate_email
 from django.template import loader
 
 import jwt
 from django.conf import settings
 
+from authors.apps.core import metrics
+
 
 class TokenGenerator:
     """
@@ -50,20 +53,16 @@ class Mailer:
     sender_email = os.getenv('EMAIL_HOST_USER')
     sender_password = os.getenv('EMAIL_HOST_PASSWORD')
 
-    def __init__(self):
-        self._server = self.get_smtp_connection()
-
+    # a connection is only opened when an email is sent, so creating a
+    # Mailer (and importing the views that hold one) never waits on SMTP
     def get_smtp_connection(self):
-        server = smtplib.SMTP(self.sender_domain)
+        server = smtplib.SMTP(
+            self.sender_domain, timeout=getattr(settings, 'EMAIL_TIMEOUT', 10))
         server.ehlo()
         server.starttls()
         server.login(self.sender_email, self.sender_password)
         return server
 
-    @property
-    def server(self):
-        return self._server
-
     # https://stackoverflow.com/questions/8022530/python-check-for-valid-email-address/8022584
     # validate that the email address's domain is also available
     @staticmethod
@@ -78,8 +77,23 @@ class Mailer:
 
         return datetime.strftime(datetime.now(), "%Y")
 
+    def send(self, user_email, email_subject, template_name, context, server=None):
+        """ send an email, recording how long it took and whether it failed
+
+        `server` is an SMTP connection opened beforehand, which is closed
+        once the email is sent. A new connection is opened without it.
+        """
+        started = perf_counter()
+        try:
+            return self._send(user_email, email_subject, template_name, context, server)
+        except Exception:
+            metrics.inc('email_send_failures_total')
+            raise
+        finally:
+            metrics.observe('email_send_duration_seconds', perf_counter() - started)
+
     # https://github.com/abulojoshua1/ipt/blob/master/sendmail.py
-    def send(self, user_email, email_subject, template_name, context):
+    def _send(self, user_email, email_subject, template_name, context, server=None):
 
         # Add more values to render in the template
         context['copyright_year'] = self.get_copyright_year()
@@ -98,8 +112,11 @@ class Mailer:
         # body_of_email can be plaintext or html!
         content = headers + "\r\n\r\n" + template.render(context)
 
-        # Send an email if smtp server connection exists
-        if self.get_smtp_connection() is not False:
-            self.server.sendmail(self.sender_email, user_email, content)
-            return True
-        return False
+        # Send the email over a connection of its own
+        if server is None:
+            server = self.get_smtp_connection()
+        try:
+            server.sendmail(self.sender_email, user_email, content)
+        finally:
+            server.quit()
+        return True
@@ -2,4 +2,9 @@ from django.apps import AppConfig
 
 
 class NotificationsConfig(AppConfig):
-    name = 'notifications'
+    name = 'authors.apps.notifications'
+    label = 'notifications'
+    verbose_name = 'Notifications'
+
+    def ready(self):
+        import authors.apps.notifications.signals
@@ -0,0 +1,94 @@
+import queue
+import threading
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+class Subscription:
+    """ a single client's queue of notifications waiting to be streamed """
+
+    def __init__(self, user_id, maxsize):
+        self.user_id = user_id
+        self.queue = queue.Queue(maxsize=maxsize)
+
+    def get(self, timeout):
+        """ wait up to `timeout` seconds for a notification, or return None """
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class NotificationBroker:
+    """
+    Fans published notifications out to the clients connected to this
+    process.
+
+    The transport decides how a notification published in one worker
+    reaches the brokers of every other worker. It is only started once the
+    first client subscribes, so workers that never serve a stream never
+    hold a listening connection.
+    """
+
+    def __init__(self, transport, options=None, queue_size=100):
+        self.queue_size = queue_size
+        self._subscriptions = {}
+        self._lock = threading.Lock()
+        self._started = False
+        self.transport = import_string(transport)(
+            self.deliver, **(options or {}))
+
+    def subscribe(self, user_id):
+        subscription = Subscription(user_id, self.queue_size)
+        with self._lock:
+            if not self._started:
+                self.transport.start()
+                self._started = True
+            self._subscriptions.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.user_id, set())
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                self._subscriptions.pop(subscription.user_id, None)
+
+    def publish(self, user_id, payload):
+        """ send a notification to every client of `user_id` on any worker """
+        self.transport.send(user_id, payload)
+
+    def deliver(self, user_id, payload):
+        """ hand a notification to the clients of `user_id` in this process """
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(user_id, ()))
+
+        for subscription in subscriptions:
+            try:
+                subscription.queue.put_nowait(payload)
+            except queue.Full:
+                # a client that stopped reading should not hold up the rest,
+                # it catches up from the database when it reconnects
+                pass
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    """ return this process's broker, creating it from the settings once """
+    global _broker
+
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                config = getattr(settings, 'NOTIFICATIONS_BROKER', {})
+                _broker = NotificationBroker(
+                    config.get(
+                        'TRANSPORT',
+                        'authors.apps.notifications.transports.InProcessTransport'),
+                    config.get('OPTIONS'),
+                    config.get('QUEUE_SIZE', 100))
+    return _broker
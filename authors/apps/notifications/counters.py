@@ -0,0 +1,111 @@
+from django.db.models import Count, F
+from django.utils import timezone
+
+from authors.apps.core.cache import namespace
+from .models import Notifications, UnreadNotificationCount
+
+unread_counts = namespace(
+    'notifications_unread_count', 300, 'NOTIFICATIONS_UNREAD_COUNT_CACHE_TIMEOUT')
+
+
+def count_unread(user_id):
+    """ count a user's unread notifications straight from the notifications table
+
+    The query is served by the partial index on `notification_owner` for
+    unread rows, so it never touches notifications that have been read.
+    """
+    return Notifications.objects.filter(
+        notification_owner_id=user_id, read_status=False).count()
+
+
+def get_unread_count(user_id):
+    """ return the number of unread notifications a user has
+
+    The cache is checked first, then the stored counter. A user without a
+    counter row gets one seeded from the notifications table.
+    """
+    return unread_counts.get_or_set(user_id, lambda: _stored_count(user_id))
+
+
+def _stored_count(user_id):
+    counter = UnreadNotificationCount.objects.filter(
+        notification_owner_id=user_id).values('unread_count').first()
+    if counter is None:
+        return reconcile(user_id)
+    return counter['unread_count']
+
+
+def adjust_unread_count(user_id, delta):
+    """ add `delta` (which may be negative) to a user's unread counter
+
+    The change is applied with a single UPDATE so that concurrent requests
+    do not overwrite each other's increments. Users without a counter row
+    are left alone, their counter is seeded on the next read.
+    """
+    if not delta:
+        return
+
+    counters = UnreadNotificationCount.objects.filter(
+        notification_owner_id=user_id)
+    updated = counters.filter(unread_count__gte=-delta).update(
+        unread_count=F('unread_count') + delta, updated_at=timezone.now())
+
+    if not updated:
+        # the counter has drifted below zero, drop it so that the next read
+        # rebuilds it from the notifications table
+        counters.delete()
+
+    unread_counts.delete(user_id)
+
+
+def count_new_notifications(user_ids):
+    """ add one to the unread counters of `user_ids`, who each got a notification
+
+    One UPDATE and one cache eviction for all of them, users without a
+    counter row are left alone as in `adjust_unread_count`.
+    """
+    if not user_ids:
+        return
+    UnreadNotificationCount.objects.filter(notification_owner_id__in=user_ids).update(
+        unread_count=F('unread_count') + 1, updated_at=timezone.now())
+    unread_counts.delete_many(user_ids)
+
+
+def reconcile(user_id=None):
+    """ rebuild unread counters from the notifications table
+
+    Reconciles a single user when `user_id` is given and returns their
+    count, otherwise reconciles every user and returns the number of
+    counters that had drifted.
+    """
+    if user_id is not None:
+        unread_count = count_unread(user_id)
+        UnreadNotificationCount.objects.update_or_create(
+            notification_owner_id=user_id,
+            defaults={'unread_count': unread_count})
+        unread_counts.delete(user_id)
+        return unread_count
+
+    actual_counts = dict(
+        Notifications.objects.filter(read_status=False)
+        .values_list('notification_owner')
+        .annotate(total=Count('id'))
+        .order_by()
+    )
+    stored_counts = dict(
+        UnreadNotificationCount.objects.values_list(
+            'notification_owner_id', 'unread_count')
+    )
+
+    drifted = 0
+    for owner_id in set(actual_counts) | set(stored_counts):
+        unread_count = actual_counts.get(owner_id, 0)
+        if stored_counts.get(owner_id) == unread_count:
+            continue
+        UnreadNotificationCount.objects.update_or_create(
+            notification_owner_id=owner_id,
+            defaults={'unread_count': unread_count})
+        unread_counts.delete(owner_id)
+        drifted += 1
+
+    return drifted
@@ -0,0 +1,11 @@
+from rest_framework.exceptions import APIException
+
+
+class TooManyStreams(APIException):
+    status_code = 503
+    default_detail = 'too many notification streams are open, retry later'
+
+    def __init__(self, wait):
+        super(TooManyStreams, self).__init__()
+        # sent back as the Retry-After header by DRF's exception handler
+        self.wait = wait
@@ -0,0 +1,54 @@
+from django.db import transaction
+
+from .broker import get_broker
+from .counters import count_new_notifications
+from .models import Notifications
+from .signals import payload_of
+
+# owners written by each query, under SQLite's limit on parameters
+BATCH_SIZE = 500
+
+
+def notify_about_article(article, owner_ids):
+    """ give each of `owner_ids` an unread notification about `article`
+
+    Does what saving the notifications one at a time would do, counting
+    and publishing them, with a handful of queries whatever their number.
+    """
+    owner_ids = list(dict.fromkeys(int(owner_id) for owner_id in owner_ids))
+    if not owner_ids:
+        return []
+
+    with transaction.atomic():
+        notifications = Notifications.objects.bulk_create(
+            Notifications(
+                article_id=article, notification_title=article.title,
+                notification_body=article.body, notification_owner_id=owner_id)
+            for owner_id in owner_ids)
+
+        # only some databases set the primary keys of bulk created rows,
+        # elsewhere each owner's newest notification about the article is it
+        if any(notification.pk is None for notification in notifications):
+            ids = {}
+            for start in range(0, len(owner_ids), BATCH_SIZE):
+                ids.update(
+                    Notifications.objects.filter(
+                        article_id=article, notification_owner_id__in=owner_ids[start:start + BATCH_SIZE])
+                    .order_by('notification_owner_id', 'id').values_list('notification_owner_id', 'id'))
+            for notification in notifications:
+                notification.pk = ids[notification.notification_owner_id]
+
+        for start in range(0, len(owner_ids), BATCH_SIZE):
+            count_new_notifications(owner_ids[start:start + BATCH_SIZE])
+
+        payloads = [(notification.notification_owner_id, payload_of(notification))
+                    for notification in notifications]
+        # only announce notifications that other connections can actually read
+        transaction.on_commit(lambda: _publish(payloads))
+    return notifications
+
+
+def _publish(payloads):
+    broker = get_broker()
+    for owner_id, payload in payloads:
+        broker.publish(owner_id, payload)
@@ -0,0 +1,69 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from ...retention import RetentionPolicy, apply_policy, compact, purge_archive
+
+
+class Command(BaseCommand):
+    help = (
+        "Archive and delete old notifications according to the "
+        "NOTIFICATIONS_RETENTION_POLICIES setting, in bounded batches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='number of notifications removed per transaction')
+        parser.add_argument(
+            '--policy', action='append', dest='policies',
+            help='only apply the policy with this name (can be repeated)')
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='only report how many notifications each policy would remove')
+        parser.add_argument(
+            '--vacuum', action='store_true',
+            help='run VACUUM ANALYZE on the notification tables afterwards (Postgres only)')
+
+    def report_progress(self, name, batch, total):
+        self.stdout.write("  {}: removed {} (total {})".format(name, batch, total))
+
+    def handle(self, *args, **options):
+        if options['batch_size'] <= 0:
+            raise CommandError("--batch-size must be a positive number.")
+
+        try:
+            policies = RetentionPolicy.from_settings()
+        except (TypeError, ValueError) as error:
+            raise CommandError("Invalid retention policy: {}".format(error))
+
+        if options['policies']:
+            unknown = set(options['policies']) - {policy.name for policy in policies}
+            if unknown:
+                raise CommandError(
+                    "Unknown retention policies: {}".format(", ".join(sorted(unknown))))
+            policies = [
+                policy for policy in policies if policy.name in options['policies']]
+
+        verb = "would remove" if options['dry_run'] else "removed"
+        for policy in policies:
+            self.stdout.write("Applying {} ({} after {} days)...".format(
+                policy.name, policy.action, policy.older_than_days))
+            total = apply_policy(
+                policy, options['batch_size'], options['dry_run'],
+                self.report_progress)
+            self.stdout.write(self.style.SUCCESS(
+                "{} {} {} notification(s).".format(policy.name, verb, total)))
+
+        archive_days = getattr(settings, 'NOTIFICATIONS_ARCHIVE_RETENTION_DAYS', None)
+        if archive_days is not None and not options['policies']:
+            total = purge_archive(
+                archive_days, options['batch_size'], options['dry_run'],
+                self.report_progress)
+            self.stdout.write(self.style.SUCCESS(
+                "archive {} {} notification(s).".format(verb, total)))
+
+        if options['vacuum'] and not options['dry_run']:
+            if compact():
+                self.stdout.write("Vacuumed the notification tables.")
+            else:
+                self.stdout.write("Skipped VACUUM, the database is not Postgres.")
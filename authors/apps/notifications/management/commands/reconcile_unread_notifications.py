@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from ...counters import reconcile
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the per-user unread notification counters from the "
+        "notifications table. Run it periodically to repair any drift."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user', type=int, dest='user_id',
+            help='only reconcile the counter of the user with this id')
+
+    def handle(self, *args, **options):
+        user_id = options['user_id']
+
+        if user_id is not None:
+            unread_count = reconcile(user_id)
+            self.stdout.write(
+                "User {} has {} unread notification(s).".format(user_id, unread_count))
+            return
+
+        drifted = reconcile()
+        self.stdout.write(self.style.SUCCESS(
+            "Reconciled unread counters, {} had drifted.".format(drifted)))
@@ -0,0 +1,36 @@
+# Generated by Django 2.0.6 on 2026-10-18 22:16
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('notifications', '0002_auto_20180815_1530'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UnreadNotificationCount',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('unread_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('notification_owner', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='unread_notifications', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        # Django 2.0 cannot express partial indexes on a model, so the index
+        # that serves unread counts and reconciliation is created by hand.
+        # Only unread rows are indexed, read notifications cost nothing here.
+        migrations.RunSQL(
+            sql=[
+                'CREATE INDEX notifications_unread_owner_idx '
+                'ON notifications_notifications (notification_owner_id) '
+                'WHERE NOT read_status'
+            ],
+            reverse_sql=['DROP INDEX notifications_unread_owner_idx'],
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 2.0.6 on 2026-10-18 22:23
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0003_unreadnotificationcount'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedNotification',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('article_id', models.IntegerField()),
+                ('notification_owner_id', models.IntegerField(db_index=True)),
+                ('notification_title', models.CharField(max_length=255)),
+                ('read_status', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='notifications',
+            name='notification_body',
+            field=models.CharField(max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='notifications',
+            name='notification_owner',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='notifications',
+            name='notification_title',
+            field=models.CharField(max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='notifications',
+            name='read_status',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddIndex(
+            model_name='notifications',
+            index=models.Index(fields=['notification_owner', '-created_at', '-id'], name='notif_owner_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notifications',
+            index=models.Index(fields=['read_status', 'updated_at'], name='notif_read_updated_idx'),
+        ),
+        # SQLite rebuilds the table for the field changes above and drops the
+        # hand-made partial index with it, so make sure it still exists
+        migrations.RunSQL(
+            sql=[
+                'CREATE INDEX IF NOT EXISTS notifications_unread_owner_idx '
+                'ON notifications_notifications (notification_owner_id) '
+                'WHERE NOT read_status'
+            ],
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
@@ -10,16 +10,18 @@ class Notifications(models.Model):
     article_id = models.ForeignKey(Article, on_delete=models.CASCADE)
 
     # this holds the title of the notification
-    notification_title = models.CharField(db_index=True, max_length=255)
+    notification_title = models.CharField(max_length=255)
 
     # this hold the body of the notification
-    notification_body = models.CharField(db_index=True, max_length=255)
+    notification_body = models.CharField(max_length=255)
 
     # this holds the id of the person this notification is for
-    notification_owner = models.ForeignKey(User, on_delete=models.CASCADE)
+    # lookups by owner are served by the composite indexes below
+    notification_owner = models.ForeignKey(
+        User, on_delete=models.CASCADE, db_index=False)
 
     # marks a notification as read or not read
-    read_status = models.BooleanField(db_index=True, default=False)
+    read_status = models.BooleanField(default=False)
 
     # time stamp of when the notification was created
     created_at = models.DateTimeField(auto_now_add=True)
@@ -28,3 +30,63 @@ class Notifications(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
 
     objects = models.Manager()
+
+    class Meta:
+        # only index what is queried: a user's notifications newest first and
+        # the retention job's scan for old read notifications. Unread
+        # notifications per user have a partial index of their own.
+        indexes = [
+            models.Index(
+                fields=['notification_owner', '-created_at', '-id'],
+                name='notif_owner_created_idx'),
+            models.Index(
+                fields=['read_status', 'updated_at'],
+                name='notif_read_updated_idx'),
+        ]
+
+
+class ArchivedNotification(models.Model):
+    """
+    A compact copy of a notification removed by the retention job.
+
+    Archived rows keep the original id and only what is needed to show a
+    user their notification history. They hold plain ids instead of foreign
+    keys and carry a single secondary index, so archiving costs as little
+    as possible to write.
+    """
+    # the id the notification had before it was archived
+    id = models.IntegerField(primary_key=True)
+
+    # id of the article the notification was about
+    article_id = models.IntegerField()
+
+    # id of the user the notification was for
+    notification_owner_id = models.IntegerField(db_index=True)
+
+    # the title of the notification, the body is the article's content
+    notification_title = models.CharField(max_length=255)
+
+    # whether the notification had been read when it was archived
+    read_status = models.BooleanField(default=False)
+
+    # time stamp of when the original notification was created
+    created_at = models.DateTimeField()
+
+    # time stamp of when the notification was archived
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    objects = models.Manager()
+
+
+class UnreadNotificationCount(models.Model):
+    # the user whose unread notifications are being counted
+    notification_owner = models.OneToOneField(
+        User, on_delete=models.CASCADE, related_name='unread_notifications')
+
+    # number of notifications the user has not read yet
+    unread_count = models.PositiveIntegerField(default=0)
+
+    # time stamp of when the counter was last changed or reconciled
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = models.Manager()
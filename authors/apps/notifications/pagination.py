@@ -0,0 +1,85 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+
+
+class NotificationCursorPagination(BasePagination):
+    """
+    Cursor pagination over notifications, newest first.
+
+    Pages are ordered by `(created_at, id)` so that notifications created in
+    the same instant still have a stable position. The cursor is the
+    position of the last notification on the previous page, which means
+    fetching any page is a single index range scan no matter how deep the
+    client has scrolled, unlike offset pagination. The queryset is expected
+    to yield `.values()` rows that include `id` and `created_at`.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'limit'
+    max_page_size = 100
+    ordering = ('-created_at', '-id')
+    invalid_cursor_message = 'The notifications cursor is invalid.'
+
+    def get_page_size(self, request):
+        page_size = settings.REST_FRAMEWORK.get('PAGE_SIZE', 10)
+        try:
+            requested = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return page_size
+
+        if requested <= 0:
+            return page_size
+        return min(requested, self.max_page_size)
+
+    def encode_cursor(self, created_at, pk):
+        position = '{}|{}'.format(created_at.isoformat(), pk)
+        return urlsafe_b64encode(position.encode('utf-8')).decode('ascii')
+
+    def decode_cursor(self, cursor):
+        try:
+            position = urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8')
+            created_at, pk = position.rsplit('|', 1)
+            created_at = parse_datetime(created_at)
+            pk = int(pk)
+        except (TypeError, ValueError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+        if created_at is None:
+            raise NotFound(self.invalid_cursor_message)
+        return created_at, pk
+
+    def paginate_queryset(self, queryset, request, view=None):
+        page_size = self.get_page_size(request)
+        queryset = queryset.order_by(*self.ordering)
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            created_at, pk = self.decode_cursor(cursor)
+            queryset = queryset.filter(
+                Q(created_at__lt=created_at) |
+                Q(created_at=created_at, id__lt=pk)
+            )
+
+        # fetch one extra row to find out if there is a next page
+        results = list(queryset[:page_size + 1])
+
+        self.next_cursor = None
+        if len(results) > page_size:
+            results = results[:page_size]
+            last = results[-1]
+            self.next_cursor = self.encode_cursor(
+                last['created_at'], last['id'])
+
+        return results
+
+    def get_paginated_response(self, data):
+        return Response({
+            'notifications': data,
+            'next': self.next_cursor
+        })
@@ -1,6 +1,6 @@
 import json
 
-from rest_framework.renderers import JSONRenderer
+from rest_framework.renderers import BaseRenderer, JSONRenderer
 
 
 class NotificationsJSONRenderer(JSONRenderer):
@@ -17,3 +17,14 @@ class NotificationsJSONRenderer(JSONRenderer):
         return json.dumps({
             "message": data
         })
+
+
+class EventStreamRenderer(BaseRenderer):
+    media_type = 'text/event-stream'
+    format = 'event-stream'
+    charset = 'utf-8'
+
+    def render(self, data, media_type=None, renderer_context=None):
+        # successful streams bypass renderers entirely, so anything rendered
+        # here is an error that has to be sent as a server-sent event
+        return "event: error\ndata: {}\n\n".format(json.dumps(data))
@@ -0,0 +1,135 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import ArchivedNotification, Notifications
+
+
+class RetentionPolicy:
+    """
+    Describes which notifications to remove and what to do with them.
+
+    Read notifications are aged from when they were read (`updated_at`),
+    every other notification from when it was created. `action` is either
+    `archive`, which copies the rows into the archive table before deleting
+    them, or `delete`.
+    """
+    actions = ('archive', 'delete')
+
+    def __init__(self, name, older_than_days, action='delete', read_status=None):
+        if action not in self.actions:
+            raise ValueError(
+                "Retention policy {} has an unknown action {}.".format(name, action))
+
+        self.name = name
+        self.older_than_days = older_than_days
+        self.action = action
+        self.read_status = read_status
+
+    @classmethod
+    def from_settings(cls):
+        return [
+            cls(**policy)
+            for policy in getattr(settings, 'NOTIFICATIONS_RETENTION_POLICIES', [])
+        ]
+
+    def queryset(self, now=None):
+        cutoff = (now or timezone.now()) - timedelta(days=self.older_than_days)
+
+        if self.read_status is True:
+            return Notifications.objects.filter(
+                read_status=True, updated_at__lt=cutoff)
+
+        notifications = Notifications.objects.filter(created_at__lt=cutoff)
+        if self.read_status is False:
+            notifications = notifications.filter(read_status=False)
+        return notifications
+
+
+def _archive(batch):
+    ArchivedNotification.objects.bulk_create([
+        ArchivedNotification(
+            id=notification['id'],
+            article_id=notification['article_id'],
+            notification_owner_id=notification['notification_owner'],
+            notification_title=notification['notification_title'],
+            read_status=notification['read_status'],
+            created_at=notification['created_at'])
+        for notification in batch.values(
+            'id', 'article_id', 'notification_owner', 'notification_title',
+            'read_status', 'created_at')
+    ])
+
+
+def apply_policy(policy, batch_size=1000, dry_run=False, progress=None, now=None):
+    """ apply a retention policy in batches and return the rows it removed
+
+    Every batch is archived and deleted in its own short transaction, so
+    the job never holds locks on more than `batch_size` rows and can be
+    stopped and resumed at any point. `progress` is called with the policy
+    name, the size of the batch and the running total after each batch.
+    """
+    candidates = policy.queryset(now)
+    if dry_run:
+        return candidates.count()
+
+    total = 0
+    while True:
+        ids = list(
+            candidates.order_by('id').values_list('id', flat=True)[:batch_size])
+        if not ids:
+            break
+
+        with transaction.atomic():
+            batch = Notifications.objects.filter(id__in=ids)
+            if policy.action == 'archive':
+                _archive(batch)
+            batch.delete()
+
+        total += len(ids)
+        if progress is not None:
+            progress(policy.name, len(ids), total)
+
+    return total
+
+
+def purge_archive(older_than_days, batch_size=1000, dry_run=False,
+                  progress=None, now=None):
+    """ delete archived notifications older than `older_than_days` in batches """
+    cutoff = (now or timezone.now()) - timedelta(days=older_than_days)
+    candidates = ArchivedNotification.objects.filter(archived_at__lt=cutoff)
+    if dry_run:
+        return candidates.count()
+
+    total = 0
+    while True:
+        ids = list(
+            candidates.order_by('id').values_list('id', flat=True)[:batch_size])
+        if not ids:
+            break
+
+        ArchivedNotification.objects.filter(id__in=ids).delete()
+        total += len(ids)
+        if progress is not None:
+            progress('archive', len(ids), total)
+
+    return total
+
+
+def compact():
+    """ give the space freed by the retention job back to Postgres
+
+    VACUUM cannot run inside a transaction and only exists on Postgres, so
+    this is a no-op on any other database.
+    """
+    if connection.vendor != 'postgresql':
+        return False
+
+    with connection.cursor() as cursor:
+        for table in (Notifications._meta.db_table,
+                      ArchivedNotification._meta.db_table):
+            cursor.execute('VACUUM ANALYZE {}'.format(
+                connection.ops.quote_name(table)))
+    return True
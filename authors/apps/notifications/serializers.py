@@ -1,7 +1,10 @@
 from django.contrib.auth import authenticate
 
+from django.utils import timezone
+
 from rest_framework import serializers
 
+from .counters import adjust_unread_count
 from .models import (
     Notifications
 )
@@ -32,10 +35,14 @@ class NotificationsAPIViewSerializer(serializers.Serializer):
         return data
 
     def update_read_status(self, notification_id_list):
-        for _ in notification_id_list:
-            instance = Notifications.objects.get(pk=_)
-            setattr(instance, "read_status", True)
-            instance.save()
+        user_id = self.validated_data['user_id']
+
+        # mark all the notifications as read in one query and take the ones
+        # that actually changed off the user's unread counter
+        marked = Notifications.objects.filter(
+            pk__in=notification_id_list, notification_owner=user_id,
+            read_status=False).update(read_status=True, updated_at=timezone.now())
+        adjust_unread_count(user_id, -marked)
 
 
 class GetNotificationsAPIViewSerializer(serializers.ModelSerializer):
@@ -0,0 +1,46 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .broker import get_broker
+from .counters import adjust_unread_count
+from .models import Notifications
+
+
+def payload_of(notification):
+    """ what the event streams of a notification's owner are sent """
+    return {
+        "id": notification.id,
+        "article_id": notification.article_id_id,
+        "notification_title": notification.notification_title,
+        "notification_body": notification.notification_body,
+        "notification_owner": notification.notification_owner_id,
+        "read_status": notification.read_status,
+        "created_at": notification.created_at.isoformat(),
+    }
+
+
+@receiver(post_save, sender=Notifications)
+def count_new_notification(sender, instance, created, *args, **kwargs):
+    """ add every new unread notification to its owner's unread counter """
+    if created and not instance.read_status:
+        adjust_unread_count(instance.notification_owner_id, 1)
+
+
+@receiver(post_save, sender=Notifications)
+def publish_new_notification(sender, instance, created, *args, **kwargs):
+    """ push every new notification to its owner's open event streams """
+    if not created:
+        return
+
+    payload = payload_of(instance)
+    # only announce notifications that other connections can actually read
+    transaction.on_commit(
+        lambda: get_broker().publish(instance.notification_owner_id, payload))
+
+
+@receiver(post_delete, sender=Notifications)
+def uncount_deleted_notification(sender, instance, *args, **kwargs):
+    """ remove deleted unread notifications from the unread counter """
+    if not instance.read_status:
+        adjust_unread_count(instance.notification_owner_id, -1)
@@ -1,13 +1,29 @@
+from django.core.cache import cache
+from django.core.management import call_command
+from django.utils import timezone
 from django.test import Client
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from authors.apps.authentication.models import User
-from ..models import Notifications
+from ...articles.models import Article
+from ..broker import NotificationBroker
+from ..fanout import notify_about_article
+from ..models import ArchivedNotification, Notifications, UnreadNotificationCount
+from ..retention import RetentionPolicy, apply_policy
+from ..views import stream_slots
 from ...articles.tests.tests_views import BaseTest
 from ...profiles.tests.test_views import TestProfileViews
 import json
+import tempfile
+from datetime import timedelta
+from io import StringIO
 
 
 class TestNotifications(BaseTest):
+    def setUp(self):
+        # unread counts are cached per user id and ids repeat between tests
+        cache.clear()
+        super(TestNotifications, self).setUp()
+
     def test_fetch_notification(self):
         response = self.user_2_logged_in
 
@@ -57,3 +73,252 @@ class TestNotifications(BaseTest):
         self.assertEqual(response.status_code, 400)
         self.assertEqual(response.json()['errors']['error'], [
                          'The [8, 9] Id(s) do to exist.'])
+
+    def unread_count(self):
+        """ fetch the unread notification count of the second test user """
+        token = self.user_2_logged_in.json()['user']['token']
+        headers = {'HTTP_AUTHORIZATION': 'Token ' + token}
+
+        response = self.test_client.get(
+            "/api/notifications/unread_count/", **headers)
+        self.assertEqual(response.status_code, 200)
+        return response.json()['message']['unread_count']
+
+    def test_fetch_unread_count(self):
+        """ test if a user can get the number of unread notifications """
+        self.assertEqual(self.unread_count(), 1)
+
+    def test_unread_count_requires_authentication(self):
+        """ test if the unread count is hidden from anonymous users """
+        response = self.test_client.get("/api/notifications/unread_count/")
+        self.assertEqual(response.status_code, 401)
+
+    def test_unread_count_after_new_notification(self):
+        """ test if a new notification is added to the unread count """
+        self.assertEqual(self.unread_count(), 1)
+
+        Notifications.objects.create(
+            article_id=Article.objects.get(pk=1), notification_title="Title",
+            notification_body="body", notification_owner=User.objects.get(pk=2))
+
+        self.assertEqual(self.unread_count(), 2)
+
+    def test_unread_count_after_marking_as_read(self):
+        """ test if notifications marked as read leave the unread count """
+        self.assertEqual(self.unread_count(), 1)
+
+        token = self.user_2_logged_in.json()['user']['token']
+        headers = {'HTTP_AUTHORIZATION': 'Token ' + token}
+        self.test_client.put(
+            "/api/notifications/", **headers,
+            data=json.dumps(self.mark_as_read), content_type='application/json')
+
+        self.assertEqual(self.unread_count(), 0)
+
+    def test_reconcile_unread_counters(self):
+        """ test if the reconcile command repairs a drifted counter """
+        self.assertEqual(self.unread_count(), 1)
+        UnreadNotificationCount.objects.filter(
+            notification_owner_id=2).update(unread_count=7)
+
+        call_command('reconcile_unread_notifications', stdout=StringIO())
+
+        self.assertEqual(UnreadNotificationCount.objects.get(
+            notification_owner_id=2).unread_count, 1)
+
+    def test_notify_followers_in_bulk(self):
+        """ test if an article's followers are notified with a bounded number of queries """
+        followers = [
+            User.objects.create_user(
+                'follower{}'.format(number), 'follower{}@example.com'.format(number), 'jakejake@20AA')
+            for number in range(20)]
+        self.assertEqual(self.unread_count(), 1)
+        article = Article.objects.get(pk=1)
+
+        with self.assertNumQueries(5):
+            notifications = notify_about_article(article, [2] + [user.pk for user in followers])
+
+        self.assertEqual(len(notifications), 21)
+        self.assertEqual(
+            sorted(notification.pk for notification in notifications),
+            sorted(Notifications.objects.filter(article_id=article).exclude(pk=1).values_list('pk', flat=True)))
+        self.assertEqual(self.unread_count(), 2)
+
+    def create_notifications(self, number):
+        """ create a number of extra notifications for the second test user """
+        for _ in range(number):
+            Notifications.objects.create(
+                article_id=Article.objects.get(pk=1), notification_title="Title",
+                notification_body="body", notification_owner=User.objects.get(pk=2))
+
+    def test_notifications_are_paginated_by_cursor(self):
+        """ test if notifications are returned a page at a time, newest first """
+        self.create_notifications(11)
+        token = self.user_2_logged_in.json()['user']['token']
+        headers = {'HTTP_AUTHORIZATION': 'Token ' + token}
+
+        response = self.test_client.get("/api/notifications/", **headers)
+        first_page = response.json()['message']
+        self.assertEqual(len(first_page['notifications']), 10)
+        self.assertEqual(first_page['notifications'][0]['id'], 12)
+        self.assertIsNotNone(first_page['next'])
+
+        response = self.test_client.get(
+            "/api/notifications/", {'cursor': first_page['next']}, **headers)
+        second_page = response.json()['message']
+        self.assertEqual(
+            [notification['id'] for notification in second_page['notifications']], [2, 1])
+        self.assertIsNone(second_page['next'])
+
+    def test_notifications_page_size(self):
+        """ test if a client can choose how many notifications a page holds """
+        self.create_notifications(3)
+        token = self.user_2_logged_in.json()['user']['token']
+        headers = {'HTTP_AUTHORIZATION': 'Token ' + token}
+
+        response = self.test_client.get(
+            "/api/notifications/", {'limit': 2}, **headers)
+        self.assertEqual(len(response.json()['message']['notifications']), 2)
+
+    def test_notifications_invalid_cursor(self):
+        """ test if a malformed cursor is rejected """
+        token = self.user_2_logged_in.json()['user']['token']
+        headers = {'HTTP_AUTHORIZATION': 'Token ' + token}
+
+        response = self.test_client.get(
+            "/api/notifications/", {'cursor': 'not-a-cursor'}, **headers)
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(NOTIFICATIONS_STREAM_TIMEOUT=0.2, NOTIFICATIONS_STREAM_HEARTBEAT=0.1)
+    def test_stream_replays_missed_notifications(self):
+        """ test if a reconnecting stream receives the notifications it missed """
+        token = self.user_2_logged_in.json()['user']['token']
+        headers = {'HTTP_AUTHORIZATION': 'Token ' + token, 'HTTP_LAST_EVENT_ID': '0'}
+
+        response = self.test_client.get("/api/notifications/stream/", **headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+
+        events = b"".join(response.streaming_content).decode('utf-8')
+        self.assertIn("id: 1\nevent: notification\n", events)
+        self.assertIn(": keep-alive", events)
+
+    @override_settings(NOTIFICATIONS_STREAM_TIMEOUT=0.2, NOTIFICATIONS_STREAM_HEARTBEAT=0.1,
+                       NOTIFICATIONS_STREAM_MAX_PER_WORKER=1, NOTIFICATIONS_STREAM_RETRY_AFTER=5)
+    def test_stream_limit(self):
+        """ test if streams past a worker's limit are told to retry, until one closes """
+        token = self.user_2_logged_in.json()['user']['token']
+        headers = {'HTTP_AUTHORIZATION': 'Token ' + token, 'HTTP_ACCEPT': 'text/event-stream'}
+
+        response = self.test_client.get("/api/notifications/stream/", **headers)
+        self.assertEqual(response.status_code, 200)
+
+        refused = self.test_client.get("/api/notifications/stream/", **headers)
+        self.assertEqual(refused.status_code, 503)
+        self.assertEqual(refused['Retry-After'], '5')
+
+        b"".join(response.streaming_content)
+        self.assertEqual(stream_slots.open, 0)
+        response = self.test_client.get("/api/notifications/stream/", **headers)
+        self.assertEqual(response.status_code, 200)
+        response.close()
+
+    def test_stream_requires_authentication(self):
+        """ test if anonymous users cannot open a notifications stream """
+        response = self.test_client.get(
+            "/api/notifications/stream/", HTTP_ACCEPT='text/event-stream')
+        self.assertEqual(response.status_code, 401)
+        self.assertTrue(response.content.startswith(b"event: error"))
+
+
+class TestNotificationBroker(TestCase):
+    def test_in_process_delivery(self):
+        """ test if a published notification reaches the owner's subscribers """
+        broker = NotificationBroker(
+            'authors.apps.notifications.transports.InProcessTransport')
+        subscription = broker.subscribe(2)
+        other_user = broker.subscribe(3)
+
+        broker.publish(2, {"id": 1})
+
+        self.assertEqual(subscription.get(timeout=1), {"id": 1})
+        self.assertIsNone(other_user.get(timeout=0.01))
+
+    def test_unix_socket_delivery(self):
+        """ test if notifications travel between brokers over unix sockets """
+        with tempfile.TemporaryDirectory() as path:
+            listener = NotificationBroker(
+                'authors.apps.notifications.transports.UnixSocketTransport',
+                {'path': path})
+            publisher = NotificationBroker(
+                'authors.apps.notifications.transports.UnixSocketTransport',
+                {'path': path})
+            subscription = listener.subscribe(2)
+
+            publisher.publish(2, {"id": 1})
+
+            self.assertEqual(subscription.get(timeout=2), {"id": 1})
+            listener.transport.stop()
+
+
+class TestNotificationRetention(BaseTest):
+    def setUp(self):
+        cache.clear()
+        super(TestNotificationRetention, self).setUp()
+
+        # a notification read 60 days ago and one created a year and a half ago
+        a_while_ago = timezone.now() - timedelta(days=60)
+        Notifications.objects.filter(pk=1).update(
+            read_status=True, updated_at=a_while_ago)
+        self.stale = Notifications.objects.create(
+            article_id=Article.objects.get(pk=1), notification_title="Old",
+            notification_body="body", notification_owner=User.objects.get(pk=2))
+        Notifications.objects.filter(pk=self.stale.pk).update(
+            created_at=timezone.now() - timedelta(days=540))
+
+    def test_archive_read_notifications(self):
+        """ test if old read notifications are moved to the archive """
+        policy = RetentionPolicy('archive-read', 30, 'archive', read_status=True)
+        progress = []
+
+        removed = apply_policy(policy, batch_size=1, progress=lambda *args: progress.append(args))
+
+        self.assertEqual(removed, 1)
+        self.assertEqual(progress, [('archive-read', 1, 1)])
+        self.assertFalse(Notifications.objects.filter(pk=1).exists())
+        self.assertEqual(ArchivedNotification.objects.get(pk=1).notification_title, "Title")
+        self.assertTrue(Notifications.objects.filter(pk=self.stale.pk).exists())
+
+    def test_delete_stale_notifications_updates_unread_count(self):
+        """ test if deleting unread notifications keeps the unread counter right """
+        counter = UnreadNotificationCount.objects.create(
+            notification_owner_id=2, unread_count=1)
+
+        removed = apply_policy(RetentionPolicy('delete-stale', 365))
+
+        self.assertEqual(removed, 1)
+        self.assertFalse(ArchivedNotification.objects.exists())
+        counter.refresh_from_db()
+        self.assertEqual(counter.unread_count, 0)
+
+    def test_invalid_policy_action(self):
+        """ test if a policy with an unknown action is rejected """
+        with self.assertRaises(ValueError):
+            RetentionPolicy('broken', 30, 'shred')
+
+    def test_prune_command_dry_run(self):
+        """ test if a dry run reports without removing anything """
+        out = StringIO()
+        call_command('prune_notifications', '--dry-run', stdout=out)
+
+        self.assertIn("archive-read would remove 1 notification(s).", out.getvalue())
+        self.assertIn("delete-stale would remove 1 notification(s).", out.getvalue())
+        self.assertEqual(Notifications.objects.count(), 2)
+
+    def test_prune_command(self):
+        """ test if the prune command applies every configured policy """
+        out = StringIO()
+        call_command('prune_notifications', '--batch-size', '10', stdout=out)
+
+        self.assertEqual(Notifications.objects.count(), 0)
+        self.assertEqual(ArchivedNotification.objects.count(), 1)
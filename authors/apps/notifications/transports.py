@@ -0,0 +1,209 @@
+"""
+Transports carry published notifications between worker processes.
+
+Every transport is given a `deliver(user_id, payload)` callable by the
+broker. `send` must eventually call `deliver` in every process that has
+subscribers, including the one that published the notification.
+"""
+import json
+import logging
+import os
+import select
+import socket
+import threading
+import time
+import uuid
+
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+
+class BaseTransport:
+    """ the interface every broker transport implements """
+
+    def __init__(self, deliver, **options):
+        self.deliver = deliver
+        self.options = options
+
+    def start(self):
+        """ start listening for messages published by other processes """
+
+    def stop(self):
+        """ stop listening and release any resources held """
+
+    def send(self, user_id, payload):
+        raise NotImplementedError
+
+    @staticmethod
+    def encode(user_id, payload):
+        return json.dumps({'user_id': user_id, 'payload': payload})
+
+    def receive(self, message):
+        """ hand a message sent by any process to the local broker """
+        try:
+            message = json.loads(message)
+            self.deliver(message['user_id'], message['payload'])
+        except (ValueError, KeyError, TypeError):
+            logger.warning("Dropped a malformed notification message.")
+
+
+class InProcessTransport(BaseTransport):
+    """
+    Delivers notifications inside the publishing process only.
+
+    This is enough for a single worker and for tests.
+    """
+
+    def send(self, user_id, payload):
+        self.deliver(user_id, payload)
+
+
+class UnixSocketTransport(BaseTransport):
+    """
+    Fans notifications out to the workers on one host over unix datagram
+    sockets.
+
+    Each listening worker binds a socket inside a shared directory, and a
+    publisher sends one datagram to every socket it finds there. It is a
+    local stand-in for a real message bus that needs no external service.
+    """
+
+    def __init__(self, deliver, path='/tmp/ah-notifications', **options):
+        super(UnixSocketTransport, self).__init__(deliver, **options)
+        self.path = path
+        self._socket = None
+        self._address = None
+
+    def start(self):
+        os.makedirs(self.path, exist_ok=True)
+        self._address = os.path.join(
+            self.path, '{}-{}.sock'.format(os.getpid(), uuid.uuid4().hex[:8]))
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._socket.bind(self._address)
+
+        listener = threading.Thread(
+            target=self._listen, name='notifications-socket-listener')
+        listener.daemon = True
+        listener.start()
+
+    def stop(self):
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+        if self._address and os.path.exists(self._address):
+            os.unlink(self._address)
+
+    def _listen(self):
+        while self._socket is not None:
+            try:
+                message = self._socket.recv(65536)
+            except OSError:
+                return
+            self.receive(message.decode('utf-8'))
+
+    def send(self, user_id, payload):
+        message = self.encode(user_id, payload).encode('utf-8')
+
+        try:
+            addresses = os.listdir(self.path)
+        except FileNotFoundError:
+            return
+
+        sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        try:
+            for name in addresses:
+                address = os.path.join(self.path, name)
+                try:
+                    sender.sendto(message, address)
+                except (ConnectionRefusedError, FileNotFoundError):
+                    # the worker that owned this socket has gone away
+                    self._remove_stale(address)
+                except OSError:
+                    logger.warning(
+                        "Could not send a notification to %s.", address)
+        finally:
+            sender.close()
+
+    @staticmethod
+    def _remove_stale(address):
+        try:
+            os.unlink(address)
+        except OSError:
+            pass
+
+
+class PostgresTransport(BaseTransport):
+    """
+    Fans notifications out through Postgres LISTEN/NOTIFY.
+
+    Publishing is a `pg_notify` on the request's own connection, so it is
+    only seen by listeners once the surrounding transaction commits. Each
+    worker keeps one extra connection that LISTENs on the channel.
+    """
+
+    def __init__(self, deliver, channel='notifications', poll_interval=5,
+                 **options):
+        super(PostgresTransport, self).__init__(deliver, **options)
+        self.channel = channel
+        self.poll_interval = poll_interval
+        self._running = False
+
+    def start(self):
+        self._running = True
+        listener = threading.Thread(
+            target=self._listen_forever, name='notifications-pg-listener')
+        listener.daemon = True
+        listener.start()
+
+    def stop(self):
+        self._running = False
+
+    def send(self, user_id, payload):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT pg_notify(%s, %s)',
+                [self.channel, self.encode(user_id, payload)])
+
+    def _connect(self):
+        import psycopg2
+        import psycopg2.extensions
+
+        params = connection.get_connection_params()
+        listen_connection = psycopg2.connect(**params)
+        listen_connection.set_isolation_level(
+            psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+        with listen_connection.cursor() as cursor:
+            cursor.execute('LISTEN "{}"'.format(self.channel))
+        return listen_connection
+
+    def _listen_forever(self):
+        backoff = 1
+        while self._running:
+            try:
+                listen_connection = self._connect()
+            except Exception:
+                logger.exception("Could not LISTEN for notifications.")
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 60)
+                continue
+
+            backoff = 1
+            try:
+                self._listen(listen_connection)
+            except Exception:
+                logger.exception("Lost the notifications LISTEN connection.")
+            finally:
+                listen_connection.close()
+
+    def _listen(self, listen_connection):
+        while self._running:
+            readable, _, _ = select.select(
+                [listen_connection], [], [], self.poll_interval)
+            if not readable:
+                continue
+
+            listen_connection.poll()
+            while listen_connection.notifies:
+                notify = listen_connection.notifies.pop(0)
+                self.receive(notify.payload)
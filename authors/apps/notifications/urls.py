@@ -1,9 +1,11 @@
 from django.urls import path
 
 from .views import (
-    NotificationsAPIView
+    NotificationsAPIView, UnreadNotificationsCountAPIView, NotificationsStreamAPIView
 )
 
 urlpatterns = [
     path('notifications/', NotificationsAPIView.as_view()),
+    path('notifications/unread_count/', UnreadNotificationsCountAPIView.as_view()),
+    path('notifications/stream/', NotificationsStreamAPIView.as_view()),
 ]
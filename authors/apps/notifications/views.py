@@ -1,3 +1,10 @@
+import json
+import threading
+import time
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+
 from rest_framework import status
 from rest_framework.generics import (
     RetrieveUpdateAPIView, CreateAPIView,
@@ -8,10 +15,14 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from ..authentication.backends import JWTAuthentication
 from ..authentication.models import User
+from .broker import get_broker
+from .counters import get_unread_count
+from .exceptions import TooManyStreams
 from .models import Notifications
+from .pagination import NotificationCursorPagination
 
 from .renderers import (
-    NotificationsJSONRenderer
+    NotificationsJSONRenderer, EventStreamRenderer
 )
 
 from .serializers import (
@@ -46,7 +57,7 @@ class NotificationsAPIView(RetrieveUpdateAPIView):
 
     def get(self, request):
         """
-        retrieve all notifications of a user
+        retrieve a page of a user's notifications, newest first
         """
         # decode users authentication token
         user_data = JWTAuthentication().authenticate(request)
@@ -54,11 +65,161 @@ class NotificationsAPIView(RetrieveUpdateAPIView):
         # get user notifications details from the Notifications table in the database
         notifications = Notifications.objects.filter(notification_owner=user_data[1]).values(
             "id", "article_id", "notification_title", "notification_body",
-            "notification_owner", "read_status"
+            "notification_owner", "read_status", "created_at"
         )
 
+        paginator = NotificationCursorPagination()
+        page = paginator.paginate_queryset(notifications, request, view=self)
+
         # create a list of notifications
         # the action below is done by use of list comprehension
-        list_of_notifications = [i for i in notifications]
+        list_of_notifications = [
+            dict(notification, created_at=notification["created_at"].isoformat())
+            for notification in page
+        ]
+
+        return paginator.get_paginated_response(list_of_notifications)
+
+
+class StreamSlots(object):
+    """ the notification streams this worker holds open, up to a limit """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.open = 0
+
+    def acquire(self, limit):
+        with self.lock:
+            if self.open >= limit:
+                return False
+            self.open += 1
+            return True
+
+    def release(self):
+        with self.lock:
+            self.open -= 1
+
+
+stream_slots = StreamSlots()
+
+
+class EventStream(object):
+    """ the events of a stream, giving back its slot once the response is closed
+
+    The response closes whatever it streams, even when the client left
+    before a single event was sent.
+    """
+
+    def __init__(self, events):
+        self.events = events
+        self.closed = False
+
+    def __iter__(self):
+        return self.events
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.events.close()
+            stream_slots.release()
+
+
+class NotificationsStreamAPIView(APIView):
+    """
+    Stream a user's new notifications as server-sent events.
+
+    A client keeps one connection open instead of polling. Every stream
+    ends after `NOTIFICATIONS_STREAM_TIMEOUT` seconds so that workers are
+    recycled, and clients resume from the `Last-Event-ID` header they send
+    when reconnecting, which replays anything they missed in between.
+    Streams hold their worker thread for as long as they are open, so
+    only `NOTIFICATIONS_STREAM_MAX_PER_WORKER` are opened at once, leaving
+    threads for other requests. Clients past it are answered 503 and told
+    when to retry.
+    """
+    permission_classes = (IsAuthenticated,)
+    renderer_classes = (NotificationsJSONRenderer, EventStreamRenderer)
+    replay_limit = 100
+
+    def get(self, request):
+        user_id = request.user.id
+        last_event_id = request.META.get(
+            'HTTP_LAST_EVENT_ID', request.query_params.get('last_event_id'))
+
+        if not stream_slots.acquire(getattr(settings, 'NOTIFICATIONS_STREAM_MAX_PER_WORKER', 2)):
+            raise TooManyStreams(getattr(settings, 'NOTIFICATIONS_STREAM_RETRY_AFTER', 5))
+
+        response = StreamingHttpResponse(
+            EventStream(self.event_stream(user_id, last_event_id)),
+            content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        # stop nginx from buffering events before they reach the client
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    def missed_notifications(self, user_id, last_event_id):
+        try:
+            last_event_id = int(last_event_id)
+        except (TypeError, ValueError):
+            return []
+
+        notifications = Notifications.objects.filter(
+            notification_owner=user_id, id__gt=last_event_id
+        ).order_by("id").values(
+            "id", "article_id", "notification_title", "notification_body",
+            "notification_owner", "read_status", "created_at"
+        )[:self.replay_limit]
+
+        return [
+            dict(notification, created_at=notification["created_at"].isoformat())
+            for notification in notifications
+        ]
+
+    @staticmethod
+    def format_event(notification):
+        return "id: {}\nevent: notification\ndata: {}\n\n".format(
+            notification["id"], json.dumps(notification))
+
+    def event_stream(self, user_id, last_event_id):
+        heartbeat = getattr(settings, 'NOTIFICATIONS_STREAM_HEARTBEAT', 15)
+        timeout = getattr(settings, 'NOTIFICATIONS_STREAM_TIMEOUT', 300)
+
+        # subscribe before replaying so nothing published in between is lost
+        broker = get_broker()
+        subscription = broker.subscribe(user_id)
+        try:
+            yield "retry: 5000\n\n"
+
+            last_sent = 0
+            for notification in self.missed_notifications(user_id, last_event_id):
+                last_sent = notification["id"]
+                yield self.format_event(notification)
+
+            deadline = time.monotonic() + timeout
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+
+                notification = subscription.get(min(heartbeat, remaining))
+                if notification is None:
+                    # comments keep proxies from closing an idle connection
+                    yield ": keep-alive\n\n"
+                elif notification["id"] > last_sent:
+                    last_sent = notification["id"]
+                    yield self.format_event(notification)
+        finally:
+            broker.unsubscribe(subscription)
+
+
+class UnreadNotificationsCountAPIView(APIView):
+    permission_classes = (IsAuthenticated,)
+    renderer_classes = (NotificationsJSONRenderer,)
+
+    def get(self, request):
+        """
+        retrieve the number of notifications a user has not read
+        """
+        unread_count = get_unread_count(request.user.id)
 
-        return Response({"notifications": list_of_notifications}, status=status.HTTP_200_OK)
+        return Response({"unread_count": unread_count}, status=status.HTTP_200_OK)
@@ -0,0 +1,13 @@
+from django.apps import AppConfig
+
+
+class ProfilesAppConfig(AppConfig):
+    name = 'authors.apps.profiles'
+    label = 'profiles'
+    verbose_name = 'Profiles'
+
+    def ready(self):
+        import authors.apps.profiles.signals
+
+
+default_app_config = 'authors.apps.profiles.ProfilesAppConfig'
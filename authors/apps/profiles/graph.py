@@ -0,0 +1,251 @@
+import functools
+import threading
+import time
+from collections import defaultdict
+
+import numpy as np
+
+from django.conf import settings
+
+from .models import Profile
+
+
+def _compress(sources, targets, size):
+    """ build CSR offsets and neighbours for edges sorted by (source, target) """
+    counts = np.bincount(sources, minlength=size)
+    offsets = np.zeros(size + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    return offsets, targets.astype(np.int32)
+
+
+def _locked(method):
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+class FollowGraph:
+    """
+    An in-memory index of who follows whom, stored as compressed sparse
+    rows.
+
+    The followees of profile `p` are `following[following_offsets[p]:
+    following_offsets[p + 1]]`, sorted, and the same goes for followers.
+    Rows are addressed by profile id directly, so answering a question
+    about a profile is an array slice plus a binary search, with no
+    hashing or database round trip.
+
+    CSR arrays are expensive to change in place, so follows and unfollows
+    made after the build are kept aside, per profile, and applied to the
+    rows a lookup touches. The arrays are rebuilt once more than
+    `max_pending` edges are waiting.
+
+    The graph is shared by a worker's threads, so lookups hold the same
+    lock as the changes that update the pending edges and rebuild the
+    arrays under them.
+    """
+
+    def __init__(self, edges=(), max_pending=1000):
+        self._lock = threading.RLock()
+        self.max_pending = max_pending
+        self.built_at = time.monotonic()
+        self._reset_pending()
+        self._build(np.array(list(edges), dtype=np.int64).reshape(-1, 2))
+
+    def _reset_pending(self):
+        self._added = set()
+        self._removed = set()
+        # the same pending edges, keyed by the profile whose row they change
+        self._pending = {
+            (outgoing, change): defaultdict(set)
+            for outgoing in (True, False) for change in ('added', 'removed')
+        }
+
+    @classmethod
+    def from_database(cls, max_pending=1000):
+        edges = Profile.follows.through.objects.values_list(
+            'from_profile_id', 'to_profile_id')
+        return cls(edges.iterator(), max_pending)
+
+    def _build(self, edges):
+        self.size = int(edges.max()) + 1 if len(edges) else 0
+
+        # sort by follower then followee for the outgoing rows
+        order = np.lexsort((edges[:, 1], edges[:, 0]))
+        self.following_offsets, self.following = _compress(
+            edges[order, 0], edges[order, 1], self.size)
+
+        # and by followee then follower for the incoming rows
+        order = np.lexsort((edges[:, 0], edges[:, 1]))
+        self.followers_offsets, self.followers = _compress(
+            edges[order, 1], edges[order, 0], self.size)
+
+    def _row(self, offsets, neighbours, profile_id):
+        if profile_id < 0 or profile_id >= self.size:
+            return neighbours[:0]
+        return neighbours[offsets[profile_id]:offsets[profile_id + 1]]
+
+    @_locked
+    def edges(self):
+        """ every (follower, followee) pair currently in the graph """
+        followers = np.repeat(
+            np.arange(self.size, dtype=np.int64), np.diff(self.following_offsets))
+        base = set(zip(followers.tolist(), self.following.tolist()))
+        return (base - self._removed) | self._added
+
+    @_locked
+    def compact(self):
+        """ fold the pending follows and unfollows back into the arrays """
+        edges = np.array(sorted(self.edges()), dtype=np.int64).reshape(-1, 2)
+        self._reset_pending()
+        self._build(edges)
+
+    def _track(self, change, follower_id, followee_id, pending):
+        edges = self._added if change == 'added' else self._removed
+        rows = (
+            self._pending[(True, change)][follower_id],
+            self._pending[(False, change)][followee_id],
+        )
+        if pending:
+            edges.add((follower_id, followee_id))
+            rows[0].add(followee_id)
+            rows[1].add(follower_id)
+        else:
+            edges.discard((follower_id, followee_id))
+            rows[0].discard(followee_id)
+            rows[1].discard(follower_id)
+
+    @_locked
+    def add(self, follower_id, followee_id):
+        self._track('removed', follower_id, followee_id, False)
+        if not self._in_arrays(follower_id, followee_id):
+            self._track('added', follower_id, followee_id, True)
+        self._maybe_compact()
+
+    @_locked
+    def remove(self, follower_id, followee_id):
+        self._track('added', follower_id, followee_id, False)
+        if self._in_arrays(follower_id, followee_id):
+            self._track('removed', follower_id, followee_id, True)
+        self._maybe_compact()
+
+    def _maybe_compact(self):
+        if len(self._added) + len(self._removed) > self.max_pending:
+            self.compact()
+
+    def _in_arrays(self, follower_id, followee_id):
+        row = self._row(self.following_offsets, self.following, follower_id)
+        position = np.searchsorted(row, followee_id)
+        return position < len(row) and row[position] == followee_id
+
+    def _merge(self, row, profile_id, outgoing):
+        """ apply pending changes to one row of the arrays """
+        if not self._added and not self._removed:
+            return row
+
+        removed = list(self._pending[(outgoing, 'removed')].get(profile_id, ()))
+        added = list(self._pending[(outgoing, 'added')].get(profile_id, ()))
+        if removed:
+            row = np.setdiff1d(row, removed, assume_unique=True)
+        if added:
+            row = np.union1d(row, added)
+        return row.astype(np.int32)
+
+    @_locked
+    def follows(self, follower_id, followee_id):
+        """ whether `follower_id` follows `followee_id` """
+        edge = (follower_id, followee_id)
+        if edge in self._added:
+            return True
+        if edge in self._removed:
+            return False
+        return bool(self._in_arrays(follower_id, followee_id))
+
+    @_locked
+    def followees_of(self, profile_id):
+        """ sorted ids of the profiles `profile_id` follows """
+        row = self._row(self.following_offsets, self.following, profile_id)
+        return self._merge(row, profile_id, outgoing=True)
+
+    @_locked
+    def followers_of(self, profile_id):
+        """ sorted ids of the profiles following `profile_id` """
+        row = self._row(self.followers_offsets, self.followers, profile_id)
+        return self._merge(row, profile_id, outgoing=False)
+
+    @_locked
+    def mutual_follows(self, profile_id):
+        """ ids of the profiles that `profile_id` follows and that follow back """
+        return np.intersect1d(
+            self.followees_of(profile_id), self.followers_of(profile_id),
+            assume_unique=True)
+
+    @_locked
+    def suggestions(self, profile_id, limit=10):
+        """ profiles followed by the people `profile_id` follows
+
+        Returns `(profile_id, mutual_connections)` pairs, best first, where
+        mutual connections is how many of the people `profile_id` follows
+        also follow the suggestion. Profiles already followed and the
+        profile itself are never suggested.
+        """
+        followees = self.followees_of(profile_id)
+        if not len(followees):
+            return []
+
+        second_degree = np.concatenate(
+            [self.followees_of(int(followee)) for followee in followees])
+        if not len(second_degree):
+            return []
+
+        candidates, counts = np.unique(second_degree, return_counts=True)
+        keep = ~np.isin(candidates, followees) & (candidates != profile_id)
+        candidates, counts = candidates[keep], counts[keep]
+
+        # most shared connections first, lowest profile id breaks ties
+        order = np.lexsort((candidates, -counts))[:limit]
+        return list(zip(candidates[order].tolist(), counts[order].tolist()))
+
+
+_graph = None
+_graph_lock = threading.RLock()
+
+
+def get_follow_graph():
+    """ return this process's follow graph, building it when missing or stale
+
+    Follows made by this worker are applied to the graph as they happen.
+    Those made by other workers show up once the graph is older than
+    `PROFILES_FOLLOW_GRAPH_MAX_AGE` seconds and gets rebuilt.
+    """
+    global _graph
+
+    max_age = getattr(settings, 'PROFILES_FOLLOW_GRAPH_MAX_AGE', 300)
+    with _graph_lock:
+        if _graph is None or time.monotonic() - _graph.built_at > max_age:
+            _graph = FollowGraph.from_database()
+        return _graph
+
+
+def record_follow(follower_id, followee_ids):
+    with _graph_lock:
+        if _graph is not None:
+            for followee_id in followee_ids:
+                _graph.add(follower_id, followee_id)
+
+
+def record_unfollow(follower_id, followee_ids):
+    with _graph_lock:
+        if _graph is not None:
+            for followee_id in followee_ids:
+                _graph.remove(follower_id, followee_id)
+
+
+def reset_follow_graph():
+    """ drop the graph so that it is rebuilt from the database on next use """
+    global _graph
+
+    with _graph_lock:
+        _graph = None
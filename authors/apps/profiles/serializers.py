@@ -22,5 +22,17 @@ class ProfileSerializer(serializers.ModelSerializer):
         return ''
 
 
+class ProfileSnapshotSerializer(serializers.Serializer):
+    """ serializes a cached profile snapshot the same way as a profile """
+    username = serializers.CharField()
+    bio = serializers.CharField()
+    image = serializers.SerializerMethodField()
+    followers = serializers.IntegerField()
+    following = serializers.IntegerField()
+
+    def get_image(self, obj):
+        return obj['image'] or ''
+
+
 class RetriveFollowersSerializer(serializers.ModelSerializer):
     pass
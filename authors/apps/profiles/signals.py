@@ -0,0 +1,65 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from authors.apps.authentication.models import User
+
+from .graph import record_follow, record_unfollow, reset_follow_graph
+from .models import Profile
+from .snapshots import invalidate_profile_snapshot
+
+
+@receiver(m2m_changed, sender=Profile.follows.through)
+def update_follow_graph(sender, instance, action, reverse, pk_set, *args, **kwargs):
+    """ keep this worker's follow graph in step with follows and unfollows """
+    if action == 'post_clear':
+        reset_follow_graph()
+        return
+
+    if action not in ('post_add', 'post_remove'):
+        return
+
+    record = record_follow if action == 'post_add' else record_unfollow
+    if reverse:
+        # `instance` was followed by every profile in `pk_set`
+        for follower_id in pk_set:
+            record(follower_id, [instance.pk])
+    else:
+        record(instance.pk, pk_set)
+
+
+@receiver(pre_save, sender=User)
+def remember_previous_username(sender, instance, *args, **kwargs):
+    """ note the username a user had before a save that may rename them """
+    instance._previous_username = None
+    if instance.pk:
+        instance._previous_username = User.objects.filter(
+            pk=instance.pk).values_list('username', flat=True).first()
+
+
+@receiver(pre_save, sender=Profile)
+def remember_previous_profile(sender, instance, *args, **kwargs):
+    """ note the bio and image a profile had before a save that may change them """
+    instance._previous_profile = None
+    if instance.pk:
+        instance._previous_profile = Profile.objects.filter(
+            pk=instance.pk).values_list('bio', 'image').first()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_snapshot(sender, instance, *args, **kwargs):
+    """ drop cached profiles of a changed user, under old and new username """
+    invalidate_profile_snapshot(
+        instance.username, getattr(instance, '_previous_username', None))
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+def invalidate_profile(sender, instance, *args, **kwargs):
+    """ drop the cached snapshot of a profile whenever it changes """
+    try:
+        username = instance.user.username
+    except User.DoesNotExist:
+        # the user went first, their own signal has dropped the snapshot
+        return
+    invalidate_profile_snapshot(username)
@@ -0,0 +1,50 @@
+from authors.apps.core.cache import namespace
+from .models import Profile
+
+# the profile fields kept in a snapshot, as named by `.values()`
+SNAPSHOT_FIELDS = (
+    'id', 'user_id', 'user__username', 'bio', 'image', 'followers', 'following'
+)
+
+
+snapshots = namespace('profile_snapshots', 600, 'PROFILES_SNAPSHOT_CACHE_TIMEOUT')
+
+
+def _to_snapshot(row):
+    snapshot = dict(row)
+    snapshot['username'] = snapshot.pop('user__username')
+    return snapshot
+
+
+def get_profile_snapshots(usernames):
+    """ resolve many usernames to profile snapshots at once
+
+    Returns a dictionary of username to snapshot. Snapshots found in the
+    cache cost one round trip for all of them, the rest are loaded with a
+    single query and cached. Usernames without a profile are left out.
+    """
+    usernames = set(usernames)
+    if not usernames:
+        return {}
+    return snapshots.get_many_or_load(usernames, _load_snapshots)
+
+
+def _load_snapshots(usernames):
+    return {
+        row['user__username']: _to_snapshot(row)
+        for row in Profile.objects.filter(
+            user__username__in=usernames).values(*SNAPSHOT_FIELDS)
+    }
+
+
+def get_profile_snapshot(username):
+    """ return the snapshot of `username`'s profile, or None if there is none
+
+    A snapshot is a dictionary with the profile `id`, `user_id`,
+    `username`, `bio`, `image`, `followers` and `following`.
+    """
+    return get_profile_snapshots([username]).get(username)
+
+
+def invalidate_profile_snapshot(*usernames):
+    snapshots.delete_many([username for username in usernames if username])
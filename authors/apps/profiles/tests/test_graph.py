@@ -0,0 +1,76 @@
+import threading
+
+from django.test import TestCase
+
+from ..graph import FollowGraph
+
+
+class TestFollowGraph(TestCase):
+    """ class to test the in-memory follow graph """
+
+    def setUp(self):
+        # 1 follows 2 and 3, 2 follows 1 and 4, 3 follows 4 and 5
+        self.graph = FollowGraph(
+            [(1, 2), (1, 3), (2, 1), (2, 4), (3, 4), (3, 5)])
+
+    def test_follows(self):
+        """ test if the graph knows who follows whom """
+        self.assertTrue(self.graph.follows(1, 2))
+        self.assertFalse(self.graph.follows(2, 3))
+        self.assertFalse(self.graph.follows(42, 1))
+
+    def test_followers_and_followees(self):
+        """ test if both directions of a profile's follows are returned """
+        self.assertEqual(self.graph.followees_of(1).tolist(), [2, 3])
+        self.assertEqual(self.graph.followers_of(4).tolist(), [2, 3])
+        self.assertEqual(self.graph.followers_of(42).tolist(), [])
+
+    def test_mutual_follows(self):
+        """ test if only profiles that follow back are mutual """
+        self.assertEqual(self.graph.mutual_follows(1).tolist(), [2])
+
+    def test_suggestions(self):
+        """ test if suggestions are ranked by shared connections """
+        self.assertEqual(self.graph.suggestions(1), [(4, 2), (5, 1)])
+        self.assertEqual(self.graph.suggestions(1, limit=1), [(4, 2)])
+        self.assertEqual(self.graph.suggestions(5), [])
+
+    def test_incremental_updates(self):
+        """ test if follows and unfollows apply without a rebuild """
+        self.graph.add(4, 1)
+        self.graph.remove(1, 3)
+
+        self.assertTrue(self.graph.follows(4, 1))
+        self.assertFalse(self.graph.follows(1, 3))
+        self.assertEqual(self.graph.followees_of(1).tolist(), [2])
+        self.assertEqual(self.graph.followers_of(1).tolist(), [2, 4])
+
+    def test_compaction(self):
+        """ test if pending changes fold back into the arrays """
+        graph = FollowGraph([(1, 2)], max_pending=1)
+        graph.add(2, 3)
+        graph.add(7, 1)
+
+        self.assertFalse(graph._added)
+        self.assertEqual(graph.size, 8)
+        self.assertTrue(graph.follows(7, 1))
+        self.assertEqual(graph.followers_of(1).tolist(), [7])
+
+    def test_concurrent_changes(self):
+        """ test if lookups made while other threads follow and unfollow stay consistent """
+        graph = FollowGraph([(1, 2)], max_pending=5)
+
+        def churn():
+            for followee in range(3, 200):
+                graph.add(1, followee)
+                graph.remove(1, followee)
+
+        threads = [threading.Thread(target=churn) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        while any(thread.is_alive() for thread in threads):
+            self.assertIn(2, graph.followees_of(1).tolist())
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(graph.followees_of(1).tolist(), [2])
@@ -0,0 +1,65 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from authors.apps.authentication.models import User
+from ..snapshots import get_profile_snapshot, get_profile_snapshots
+
+
+class TestProfileSnapshots(TestCase):
+    """ class to test the username to profile snapshot cache """
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            'testing12', 'boomboom@gmail.com', 'testuserpass')
+        self.other = User.objects.create_user(
+            'popularguy', 'popular.guy@gmail.com', 'testuserpass')
+
+    def test_snapshot_of_a_profile(self):
+        """ test if a snapshot holds the profile's fields and ids """
+        snapshot = get_profile_snapshot('testing12')
+
+        self.assertEqual(snapshot['id'], self.user.profile.id)
+        self.assertEqual(snapshot['user_id'], self.user.id)
+        self.assertEqual(snapshot['username'], 'testing12')
+        self.assertEqual(snapshot['followers'], 0)
+
+    def test_snapshot_of_missing_profile(self):
+        """ test if unknown usernames have no snapshot """
+        self.assertIsNone(get_profile_snapshot('nobody'))
+
+    def test_snapshots_are_cached(self):
+        """ test if a cached snapshot is served without a query """
+        get_profile_snapshot('testing12')
+
+        with self.assertNumQueries(0):
+            get_profile_snapshot('testing12')
+
+    def test_multi_get(self):
+        """ test if many usernames resolve with at most one query """
+        get_profile_snapshot('testing12')
+
+        with self.assertNumQueries(1):
+            snapshots = get_profile_snapshots(['testing12', 'popularguy', 'nobody'])
+
+        self.assertEqual(set(snapshots), {'testing12', 'popularguy'})
+
+    def test_profile_update_invalidates(self):
+        """ test if saving a profile drops its snapshot """
+        get_profile_snapshot('testing12')
+
+        profile = self.user.profile
+        profile.bio = 'I like to skateboard'
+        profile.save()
+
+        self.assertEqual(get_profile_snapshot('testing12')['bio'], 'I like to skateboard')
+
+    def test_rename_invalidates(self):
+        """ test if renaming a user drops the snapshot under the old name """
+        get_profile_snapshot('testing12')
+
+        self.user.username = 'renamed12'
+        self.user.save()
+
+        self.assertIsNone(get_profile_snapshot('testing12'))
+        self.assertEqual(get_profile_snapshot('renamed12')['user_id'], self.user.id)
@@ -3,6 +3,7 @@ from django.test import TestCase, Client
 import json
 
 from authors.apps.authentication.models import User
+from authors.apps.profiles.graph import reset_follow_graph
 from authors.apps.profiles.models import Profile
 
 
@@ -147,3 +148,42 @@ class TestProfileViews(TestCase):
             "/api/profiles/{}/follow/".format(self.followee_username), **headers, content_type='application/json')
         print(response.json())
         self.assertEqual(response.status_code, 400)
+
+    def test_follow_suggestions(self):
+        """ test if people followed by followees are suggested """
+        reset_follow_graph()
+        suggested = User.objects.create_user(
+            'suggested', 'suggested@gmail.com', self.password)
+        self.follow_a_user()
+        Profile.objects.get(user__username=self.followee_username).follow(
+            suggested.profile)
+
+        headers = {
+            'HTTP_AUTHORIZATION': 'Token ' + self.token
+        }
+        response = self.test_client.get(
+            "/api/profiles/{}/suggestions/".format(self.username), **headers)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['profile']['suggestions'], [{
+            'username': 'suggested', 'bio': '', 'image': '', 'mutual_connections': 1
+        }])
+
+    def test_suggestions_limit(self):
+        """ test if a suggestions limit below one is rejected """
+        headers = {
+            'HTTP_AUTHORIZATION': 'Token ' + self.token
+        }
+        for limit in ('0', '-1', 'ten'):
+            response = self.test_client.get(
+                "/api/profiles/{}/suggestions/".format(self.username), {'limit': limit}, **headers)
+            self.assertEqual(response.status_code, 400)
+
+    def test_suggestions_for_non_existant_profile(self):
+        """ test for attempt to get suggestions for a profile not in the db """
+        headers = {
+            'HTTP_AUTHORIZATION': 'Token ' + self.token
+        }
+        response = self.test_client.get(
+            "/api/profiles/{}/suggestions/".format("non_existant_person"), **headers)
+        self.assertEqual(response.status_code, 400)
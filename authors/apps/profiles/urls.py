@@ -1,9 +1,13 @@
 from django.urls import path
 
-from .views import ProfileRetrieveAPIView, ProfileFollowingAPIView, RetrieveFollowersAPIView
+from .views import (
+    ProfileRetrieveAPIView, ProfileFollowingAPIView, RetrieveFollowersAPIView,
+    ProfileSuggestionsAPIView
+)
 
 urlpatterns = [
     path('profiles/<username>/', ProfileRetrieveAPIView.as_view()),
     path('profiles/<username>/follow/', ProfileFollowingAPIView.as_view()),
-    path('profiles/<username>/followers/', RetrieveFollowersAPIView.as_view())
+    path('profiles/<username>/followers/', RetrieveFollowersAPIView.as_view()),
+    path('profiles/<username>/suggestions/', ProfileSuggestionsAPIView.as_view())
 ]
@@ -4,9 +4,13 @@ from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from .graph import get_follow_graph
 from .models import Profile
 from .renderers import ProfileJSONRenderer
-from .serializers import ProfileSerializer, RetriveFollowersSerializer
+from .serializers import (
+    ProfileSerializer, ProfileSnapshotSerializer, RetriveFollowersSerializer
+)
+from .snapshots import get_profile_snapshot
 from .exceptions import ProfileDoesNotExist
 
 
@@ -20,14 +24,13 @@ class ProfileRetrieveAPIView(RetrieveAPIView):
 
     def retrieve(self, request, username, *args, **kwargs):
         """ function to retrieve a requested profile """
-        try:
-            profile = Profile.objects.select_related('user').get(
-                user__username=username
-            )
-        except Profile.DoesNotExist:
+        # profiles are served from the snapshot cache, which is invalidated
+        # whenever the user or their profile changes
+        profile = get_profile_snapshot(username)
+        if profile is None:
             raise ProfileDoesNotExist
 
-        serializer = self.serializer_class(profile)
+        serializer = ProfileSnapshotSerializer(profile)
 
         return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -42,14 +45,21 @@ class ProfileFollowingAPIView(APIView):
     renderer_classes = (ProfileJSONRenderer,)
     serializer_class = ProfileSerializer
 
-    def post(self, request, username=None):
-        follower = self.request.user.profile
+    def get_followee(self, username):
+        """ resolve the username through the snapshot cache, then load by id """
+        snapshot = get_profile_snapshot(username)
+        if snapshot is None:
+            raise ProfileDoesNotExist
 
         try:
-            followee = Profile.objects.get(user__username=username)
+            return Profile.objects.get(pk=snapshot['id'])
         except Profile.DoesNotExist:
             raise ProfileDoesNotExist
 
+    def post(self, request, username=None):
+        follower = self.request.user.profile
+        followee = self.get_followee(username)
+
         if follower.pk is followee.pk:
             raise serializers.ValidationError('You can not follow yourself.')
 
@@ -73,11 +83,7 @@ class ProfileFollowingAPIView(APIView):
 
     def delete(self, request, username=None):
         follower = self.request.user.profile
-
-        try:
-            followee = Profile.objects.get(user__username=username)
-        except Profile.DoesNotExist:
-            raise ProfileDoesNotExist
+        followee = self.get_followee(username)
 
         if not follower.is_following(followee):
             raise serializers.ValidationError("You do not follow this user")
@@ -109,21 +115,63 @@ class RetrieveFollowersAPIView(RetrieveAPIView):
     serializer_class = RetriveFollowersSerializer
 
     def retrieve(self, request, username, *args, **kwargs):
-        list_of_followers = []
-
-        try:
-            profile = Profile.objects.select_related('user').get(
-                user__username=username
-            )
-        except Profile.DoesNotExist:
+        profile = get_profile_snapshot(username)
+        if profile is None:
             raise ProfileDoesNotExist
 
-        user_followers = Profile.follows.through.objects.filter(
-            to_profile_id=profile.id)
-        for a_follower in user_followers:
-            list_of_followers.append(
-                str(Profile.objects.get(id=a_follower.from_profile_id)))
+        # fetch every follower's username with one join
+        list_of_followers = list(Profile.follows.through.objects.filter(
+            to_profile_id=profile['id']).order_by('id').values_list(
+                'from_profile__user__username', flat=True))
         res = {
             "followers": list_of_followers
         }
         return Response(res, status=status.HTTP_200_OK)
+
+
+class ProfileSuggestionsAPIView(RetrieveAPIView):
+    """
+    Suggest profiles to follow: the people followed by the people this
+    profile follows, ranked by how many of them are shared.
+    The follow graph is answered from memory, only the suggested
+    profiles themselves are read from the database.
+    """
+    permission_classes = (IsAuthenticated,)
+    renderer_classes = (ProfileJSONRenderer,)
+    max_suggestions = 50
+
+    def retrieve(self, request, username, *args, **kwargs):
+        profile = get_profile_snapshot(username)
+        if profile is None:
+            raise ProfileDoesNotExist
+        profile_id = profile['id']
+
+        try:
+            limit = min(int(request.query_params.get('limit', 10)), self.max_suggestions)
+        except ValueError:
+            raise serializers.ValidationError('The limit must be a number.')
+        if limit < 1:
+            raise serializers.ValidationError('The limit must be at least 1.')
+
+        suggestions = get_follow_graph().suggestions(profile_id, limit)
+
+        profiles = {
+            profile['id']: profile
+            for profile in Profile.objects.filter(
+                id__in=[suggested for suggested, _ in suggestions]
+            ).values('id', 'user__username', 'bio', 'image')
+        }
+
+        res = {
+            "suggestions": [
+                {
+                    "username": profiles[suggested]['user__username'],
+                    "bio": profiles[suggested]['bio'],
+                    "image": profiles[suggested]['image'],
+                    "mutual_connections": mutual_connections
+                }
+                for suggested, mutual_connections in suggestions
+                if suggested in profiles
+            ]
+        }
+        return Response(res, status=status.HTTP_200_OK)
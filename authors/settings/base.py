@@ -8,6 +8,7 @@ https://docs.djangoproject.com/en/1.11/ref/settings/
 """
 
 import os
+import tempfile
 import dj_database_url
 
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
@@ -26,8 +27,9 @@ APPEND_SLASH = True
 
 # Application definition
 
+# the admin and django_extensions are only installed by the dev settings,
+# workers elsewhere do not pay for importing them
 INSTALLED_APPS = [
-    'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
     'django.contrib.sessions',
@@ -35,7 +37,6 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
 
     'corsheaders',
-    'django_extensions',
     'rest_framework',
 
     'authors.apps.authentication',
@@ -51,6 +52,12 @@ INSTALLED_APPS = [
 TEST_RUNNER = 'django_nose.NoseTestSuiteRunner'
 
 MIDDLEWARE = [
+    # first, so that its total covers every other middleware
+    'authors.apps.core.middleware.ServerTimingMiddleware',
+    'authors.apps.core.middleware.MetricsMiddleware',
+    'authors.apps.core.replicas.ReplicaRoutingMiddleware',
+    # off unless NPLUSONE_MODE is set, see the dev and test settings
+    'authors.apps.core.nplusone.NPlusOneMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -144,3 +151,149 @@ REST_FRAMEWORK = {
 # sent using console based django builtin backend.
 EMAIL_BACKEND = "djmail.backends.default.EmailBackend"
 DJMAIL_REAL_BACKEND = "django.core.mail.backends.console.EmailBackend"
+
+# number of seconds a user's unread notification count is kept in the cache
+# before it is read again from the counter table
+NOTIFICATIONS_UNREAD_COUNT_CACHE_TIMEOUT = 300
+
+# Server-sent notification streams. The transport carries notifications
+# published by one worker to the streams held open by every other worker;
+# use `transports.PostgresTransport` (LISTEN/NOTIFY) when running several
+# workers against Postgres, or `transports.UnixSocketTransport` on one host.
+NOTIFICATIONS_BROKER = {
+    'TRANSPORT': 'authors.apps.notifications.transports.InProcessTransport',
+    'OPTIONS': {},
+}
+
+# seconds between keep-alive comments and before a stream is closed so the
+# client reconnects (and resumes from its last event id)
+NOTIFICATIONS_STREAM_HEARTBEAT = 15
+NOTIFICATIONS_STREAM_TIMEOUT = 300
+
+# streams each worker holds open at once, kept below its threads (see
+# gunicorn.conf.py) so that it still serves other requests; clients past
+# it are told to retry after NOTIFICATIONS_STREAM_RETRY_AFTER seconds
+NOTIFICATIONS_STREAM_MAX_PER_WORKER = 2
+NOTIFICATIONS_STREAM_RETRY_AFTER = 5
+
+# Retention policies applied by `manage.py prune_notifications`. Read
+# notifications are aged from when they were read, anything else from when
+# it was created. `action` is `archive` or `delete`.
+NOTIFICATIONS_RETENTION_POLICIES = [
+    {'name': 'archive-read', 'read_status': True,
+     'older_than_days': 30, 'action': 'archive'},
+    {'name': 'delete-stale', 'older_than_days': 365, 'action': 'delete'},
+]
+
+# archived notifications are deleted for good after this many days
+NOTIFICATIONS_ARCHIVE_RETENTION_DAYS = 730
+
+# seconds before a worker rebuilds its in-memory follow graph, picking up
+# follows made through other workers
+PROFILES_FOLLOW_GRAPH_MAX_AGE = 300
+
+# seconds a username to profile snapshot stays cached, snapshots are also
+# dropped as soon as the user or the profile is saved
+PROFILES_SNAPSHOT_CACHE_TIMEOUT = 600
+
+# number of replies returned with each top level comment when listing an
+# article's comments, the rest are loaded through the replies endpoint
+COMMENT_REPLIES_PREVIEW = 3
+
+# Request profiling. Every response carries a Server-Timing header; this
+# share of the requests (0 to 1) is also profiled with cProfile and the
+# stats are written to PROFILING_DIRECTORY. PROFILING_ALLOW_HEADER lets a
+# client ask for a profile with an `X-Profile: 1` header, never turn it on
+# where the API is public.
+PROFILING_SAMPLE_RATE = float(os.getenv('PROFILING_SAMPLE_RATE', 0))
+PROFILING_ALLOW_HEADER = False
+PROFILING_DIRECTORY = os.getenv(
+    'PROFILING_DIRECTORY', os.path.join(tempfile.gettempdir(), 'authors-profiles'))
+
+# N+1 query detection: requests running the same query shape more than
+# NPLUSONE_THRESHOLD times are logged (`warn`) or fail (`raise`).
+NPLUSONE_MODE = None
+NPLUSONE_THRESHOLD = 5
+
+# Metrics served at /metrics. With several workers, point METRICS_DIRECTORY
+# at a directory they share (and empty it on restart) so that any of them
+# can report for all; without it every worker reports only its own.
+# Scrapers send METRICS_TOKEN as a bearer token; without one the metrics
+# are only served with DEBUG on.
+METRICS_DIRECTORY = os.getenv('METRICS_DIRECTORY')
+METRICS_FLUSH_INTERVAL = 5
+METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+
+# Read replicas, the aliases in DATABASES that GET requests may read from.
+# A client is kept on the primary for REPLICA_PIN_SECONDS after any other
+# request, and replicas more than REPLICA_MAX_LAG seconds behind are
+# skipped, their health being checked every REPLICA_HEALTH_INTERVAL seconds.
+# Checks run inside requests, so connecting to a replica gives up after
+# REPLICA_CONNECT_TIMEOUT seconds.
+DATABASE_ROUTERS = ['authors.apps.core.replicas.ReplicaRouter']
+DATABASE_REPLICAS = []
+REPLICA_PIN_SECONDS = 5
+REPLICA_MAX_LAG = 10
+REPLICA_HEALTH_INTERVAL = 5
+REPLICA_CONNECT_TIMEOUT = 2
+
+# Calls to other services: the threads a worker may use to run them next to
+# its request, and the seconds to wait on SMTP and the social providers.
+OUTBOUND_MAX_WORKERS = 8
+EMAIL_TIMEOUT = 10
+SOCIAL_AUTH_TIMEOUT = 10
+
+# The shared cache, and authors.apps.core.cache in front of it: each process
+# also keeps up to LOCAL_SIZE values for at most LOCAL_TIMEOUT seconds, so a
+# value changed by another process may be served stale for that long.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+}
+APP_CACHE = {
+    'BACKEND': 'default',
+    'LOCAL_SIZE': 1024,
+    'LOCAL_TIMEOUT': 5,
+}
+
+# seconds the payload of a published article stays cached, it is also
+# dropped as soon as the article, its tags or its author change
+ARTICLES_CACHE_TIMEOUT = 600
+
+# seconds a slug stays resolved to its article in the cache, and seconds
+# clients and proxies may keep an article fetched by id or slug
+ARTICLES_SLUG_CACHE_TIMEOUT = 3600
+ARTICLES_MAX_AGE = 60
+
+# every this many revisions of an article's text, a revision keeps the whole
+# text rather than the changes, bounding the rows read to rebuild a version
+ARTICLE_REVISION_SNAPSHOT_INTERVAL = 20
+
+# rows of an NDJSON article import validated and written together
+ARTICLES_IMPORT_CHUNK_SIZE = 1000
+
+# Trending articles. Likes, favourites, ratings and comments add these
+# points to their article's score (a rating its stars above or below
+# three times `rating`), and points halve every half-life, in hours.
+# `manage.py refresh_trending` ranks this many articles overall and for
+# each tag, run it every few minutes.
+ARTICLES_TRENDING_WEIGHTS = {'like': 1, 'dislike': -1, 'favourite': 2, 'comment': 1, 'rating': 0.5}
+ARTICLES_TRENDING_HALF_LIFE = 24
+ARTICLES_TRENDING_SIZE = 100
+
+# Article reads are counted in memory by each worker and written by a
+# thread of its own every this many seconds, or once this many are waiting.
+# A worker that crashes loses those not written yet. Reads that fail to be
+# written are retried for up to this many articles. None leaves writing
+# them to whoever calls `counters.view_counter.flush()`.
+ARTICLES_VIEW_FLUSH_INTERVAL = 5
+ARTICLES_VIEW_FLUSH_EVENTS = 100
+ARTICLES_VIEW_MAX_PENDING = 10000
+
+# `manage.py rollup_engagement` adds up the likes, favourites, ratings and
+# comments of articles by day, leaving those of the last this many seconds
+# for its next run. Run it every few minutes. Authors may read at most this
+# many days of analytics at once.
+ARTICLES_ROLLUP_LAG = 60
+ARTICLES_ANALYTICS_MAX_DAYS = 366
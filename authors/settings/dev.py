@@ -5,16 +5,25 @@ from authors.settings.base import *
 DEBUG = True
 SENDING_MAIL = True
 
+INSTALLED_APPS = ['django.contrib.admin'] + INSTALLED_APPS + ['django_extensions']
+
+# let requests ask for a cProfile dump with an `X-Profile: 1` header
+PROFILING_ALLOW_HEADER = True
+
+# log requests that run a query in a loop
+NPLUSONE_MODE = 'warn'
+
 # Database
 # https://docs.djangoproject.com/en/1.11/ref/settings/#databases
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql_psycopg2',
+        'ENGINE': 'authors.apps.core.backends.postgresql',
         'NAME': os.getenv('DB_NAME'),
         'USER': os.getenv('DB_USER'),
         'PASSWORD': os.getenv('DB_PASSWORD'),
         'HOST': 'localhost',
         'PORT': '',
+        'CONN_MAX_AGE': 600,
     }
 }
@@ -12,4 +12,39 @@ DEBUG = os.getenv('DEBUG_MODE')
 # https://devcenter.heroku.com/articles/python-concurrency-and-database-connections
 # https://stackoverflow.com/questions/27985368/heroku-databases-is-not-defined
 DATABASES = {'default': dj_database_url.config(
+    engine='authors.apps.core.backends.postgresql',
     conn_max_age=600, ssl_require=True)}
+
+# replicas are given as a comma separated list of database urls
+for number, url in enumerate(filter(None, os.getenv('DATABASE_REPLICA_URLS', '').split(','))):
+    DATABASES['replica_{}'.format(number)] = dj_database_url.parse(
+        url.strip(), engine='authors.apps.core.backends.postgresql',
+        conn_max_age=600, ssl_require=True)
+    DATABASES['replica_{}'.format(number)]['OPTIONS']['connect_timeout'] = REPLICA_CONNECT_TIMEOUT
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+
+# connections are kept for CONN_MAX_AGE seconds, see
+# authors.apps.core.connections for the options. Each gunicorn thread holds
+# at most one connection to each database.
+for database in DATABASES.values():
+    database['POOL'] = {
+        'MAX_CONNECTIONS': int(os.getenv('DB_MAX_CONNECTIONS_PER_WORKER', 4)),
+        'HEALTH_CHECK_AFTER': 30,
+        'LIFETIME_JITTER': 0.1,
+    }
+
+# gunicorn runs several workers, so streams learn about notifications
+# created by other workers through Postgres LISTEN/NOTIFY
+NOTIFICATIONS_BROKER = {
+    'TRANSPORT': 'authors.apps.notifications.transports.PostgresTransport',
+    'OPTIONS': {'channel': 'notifications'},
+}
+
+# the workers of a dyno share their cache through files
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv('CACHE_DIRECTORY', '/tmp/authors-cache'),
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+}
@@ -6,6 +6,18 @@ DEBUG = True
 
 SENDING_MAIL = False
 
+# fail tests whose requests run a query in a loop
+NPLUSONE_MODE = 'raise'
+NPLUSONE_THRESHOLD = 3
+
+# tests clear the shared cache between them, which a process's own copies
+# would outlive
+APP_CACHE = dict(APP_CACHE, LOCAL_SIZE=0)
+
+# article reads are only written when tests flush them, never by a thread
+# of their own outside the test's transaction
+ARTICLES_VIEW_FLUSH_INTERVAL = None
+
 # Database
 # https://docs.djangoproject.com/en/1.11/ref/settings/#databases
 
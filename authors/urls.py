@@ -13,12 +13,12 @@ Including another URLconf
     1. Import the include() function: from django.conf.urls import url, include
     2. Add a URL to urlpatterns:  url(r'^blog/', include('blog.urls'))
 """
+from django.apps import apps
 from django.urls import include, path
-from django.contrib import admin
 
-urlpatterns = [
-    path('admin/', admin.site.urls),
+from authors.apps.core.views import metrics_view
 
+urlpatterns = [
     path('api/', include('authors.apps.authentication.urls')),
 
     path('api/', include('authors.apps.articles.urls')),
@@ -26,4 +26,12 @@ urlpatterns = [
     path('api/', include('authors.apps.profiles.urls')),
 
     path('api/', include('authors.apps.notifications.urls')),
+
+    path('metrics', metrics_view),
 ]
+
+# the admin is only installed by the dev settings
+if apps.is_installed('django.contrib.admin'):
+    from django.contrib import admin
+
+    urlpatterns.append(path('admin/', admin.site.urls))
@@ -0,0 +1,10 @@
+import os
+
+# Registration, password resets and social logins spend most of their time
+# waiting on SMTP, DNS and the social providers. Threaded workers keep
+# serving other requests while a thread waits; each thread holds at most
+# one connection to each database (see DB_MAX_CONNECTIONS_PER_WORKER).
+worker_class = 'gthread'
+workers = int(os.getenv('WEB_CONCURRENCY', 2))
+threads = int(os.getenv('GUNICORN_THREADS', 4))
+timeout = 30